@@ -0,0 +1,236 @@
+import time
+import uuid
+import queue
+import threading
+from collections import OrderedDict
+from Simulation.SimulationManager import SimulationManager
+from Simulation.WorkerPool import TaskCancelled
+
+# Estados posibles de un trabajo en segundo plano
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class BatchJob:
+    """
+    Trabajo asíncrono que ejecuta un experimento por lotes y registra su progreso.
+    """
+
+    def __init__(self, job_id, config, iterations, strategy, options=None):
+        """
+        Crea un trabajo en estado 'queued'.
+
+        Parámetros:
+            job_id (str): Identificador único del trabajo
+            config (dict): Copia de la configuración de simulación vigente al crear el trabajo
+            iterations (int): Número de simulaciones a ejecutar (el máximo con paro secuencial)
+            strategy (str): Estrategia a utilizar ('random' o 'intelligent')
+            options (dict): Argumentos adicionales del lote (engine, base_seed y, con paro secuencial,
+                            win_rate_width, score_width y confidence)
+        """
+        self.id = job_id
+        self.config = config
+        self.iterations = iterations
+        self.strategy = strategy
+        self.options = dict(options or {})
+        self.status = JOB_QUEUED
+        self.completed = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def is_finished(self):
+        """
+        Indica si el trabajo ya terminó (con éxito o con error).
+
+        Retorna:
+            bool: True si el estado es 'done' o 'failed'
+        """
+        return self.status in (JOB_DONE, JOB_FAILED)
+
+    def to_dict(self):
+        """
+        Resume el estado y progreso del trabajo (sin incluir el resultado).
+
+        Retorna:
+            dict: Estado, progreso y marcas de tiempo del trabajo
+        """
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "strategy": self.strategy,
+            "iterations": self.iterations,
+            "options": self.options,
+            "progress": {
+                "completed": self.completed,
+                "total": self.iterations,
+                "percent": round(100 * self.completed / self.iterations, 1) if self.iterations else 100.0
+            },
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error
+        }
+
+
+class JobManager:
+    """
+    Administra los trabajos por lotes que se ejecutan en segundo plano sobre el pool de simulación.
+    Los trabajos se ejecutan en orden de llegada desde hilos propios, de modo que las peticiones
+    HTTP regresan inmediatamente y el servidor sigue atendiendo otros endpoints.
+    """
+
+    def __init__(self, pool, max_concurrent_jobs=1, max_finished_jobs=100):
+        """
+        Inicializa el administrador de trabajos.
+
+        Parámetros:
+            pool (WorkerPool): Pool persistente en el que se ejecutan los lotes
+            max_concurrent_jobs (int): Trabajos que pueden ejecutarse al mismo tiempo
+            max_finished_jobs (int): Trabajos terminados que se conservan antes de descartar los más antiguos
+        """
+        # Al apagar se activa el evento: el lote en curso lanza TaskCancelled y los encolados se descartan
+        self._cancel = threading.Event()
+        self.manager = SimulationManager(pool=pool, cancel_event=self._cancel)
+        self.max_finished_jobs = max_finished_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        # Hilos daemon (no un ThreadPoolExecutor): el intérprete no los espera al salir, así que
+        # shutdown (registrado con atexit) alcanza a cancelar el trabajo en curso
+        self._pending = queue.Queue()
+        self._threads = [threading.Thread(target=self._serve, name=f"batch-job-{i}", daemon=True)
+                         for i in range(max_concurrent_jobs)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, config, iterations, strategy, options=None):
+        """
+        Registra un nuevo trabajo y lo encola para ejecutarse en segundo plano.
+
+        Parámetros:
+            config (dict): Configuración de simulación (se copia para aislarla de cambios posteriores)
+            iterations (int): Número de simulaciones a ejecutar (el máximo con paro secuencial)
+            strategy (str): Estrategia a utilizar ('random' o 'intelligent')
+            options (dict): Argumentos adicionales del lote; con 'win_rate_width' se ejecuta con paro
+                            secuencial (run_sequential_batch) y sin él con run_batch_experiment
+
+        Retorna:
+            BatchJob: Trabajo creado
+        """
+        job = BatchJob(uuid.uuid4().hex, dict(config), iterations, strategy, options)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._discard_old_jobs()
+        self._pending.put(job)
+        return job
+
+    def get(self, job_id):
+        """
+        Busca un trabajo por su identificador.
+
+        Parámetros:
+            job_id (str): Identificador del trabajo
+
+        Retorna:
+            BatchJob | None: El trabajo, o None si no existe (o ya fue descartado)
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _serve(self):
+        """
+        Ciclo de cada hilo de trabajos: ejecuta los trabajos encolados, uno a la vez, hasta recibir None.
+        """
+        while True:
+            job = self._pending.get()
+            if job is None:
+                return
+            self._run_job(job)
+
+    def _run_job(self, job):
+        """
+        Ejecuta el lote de un trabajo actualizando su estado y progreso.
+
+        Parámetros:
+            job (BatchJob): Trabajo a ejecutar
+        """
+        if self._cancel.is_set():
+            self._cancel_job(job)
+            return
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+
+        def on_progress(completed, total):
+            job.completed = completed
+
+        try:
+            cfg = job.config
+            if "win_rate_width" in job.options:
+                # El progreso se reporta contra el máximo; el trabajo puede terminar antes
+                job.result = self.manager.run_sequential_batch(
+                    cfg["grid_width"], cfg["grid_height"],
+                    cfg["agents"], cfg["max_energy"],
+                    strategy_name=job.strategy,
+                    max_iterations=job.iterations,
+                    progress_callback=on_progress,
+                    **job.options
+                )
+            else:
+                job.result = self.manager.run_batch_experiment(
+                    cfg["grid_width"], cfg["grid_height"],
+                    cfg["agents"], cfg["max_energy"],
+                    iterations=job.iterations,
+                    strategy_name=job.strategy,
+                    progress_callback=on_progress,
+                    **job.options
+                )
+            job.status = JOB_DONE
+        except TaskCancelled:
+            self._cancel_job(job)
+        except Exception as e:
+            job.error = str(e)
+            job.status = JOB_FAILED
+            print(f"❌ Trabajo {job.id} falló: {e}")
+        finally:
+            job.finished_at = time.time()
+
+    @staticmethod
+    def _cancel_job(job):
+        """
+        Marca como fallido un trabajo interrumpido (o no iniciado) por el apagado del servidor.
+
+        Parámetros:
+            job (BatchJob): Trabajo cancelado
+        """
+        job.error = "Cancelado por el apagado del servidor"
+        job.status = JOB_FAILED
+        job.finished_at = time.time()
+
+    def _discard_old_jobs(self):
+        """
+        Descarta los trabajos terminados más antiguos cuando se excede el límite configurado.
+        Debe llamarse con el candado tomado.
+        """
+        finished = [job_id for job_id, job in self._jobs.items() if job.is_finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def shutdown(self):
+        """
+        Cancela el trabajo en curso y los encolados, y detiene los hilos sin esperar a que terminen.
+        """
+        self._cancel.set()
+        while True:
+            try:
+                job = self._pending.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                self._cancel_job(job)
+        for _ in self._threads:
+            self._pending.put(None)
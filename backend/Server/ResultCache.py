@@ -0,0 +1,245 @@
+import os
+import json
+import gzip
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from Simulation.AuxFunctions import map_fingerprint
+
+# Entradas que se conservan en memoria (los replays completos pesan varios MB cada uno)
+DEFAULT_MAX_ENTRIES = 32
+
+# Directorio del nivel en disco (ignorado por git)
+DEFAULT_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".cache", "results"))
+
+# Huella del código de simulación, calculada una sola vez por proceso
+_ENGINE_VERSION = None
+
+
+def engine_version():
+    """
+    Calcula la huella SHA-256 del código del paquete Simulation (nombre y contenido de cada módulo).
+    Cualquier cambio en el código que produce las partidas cambia la huella e invalida los resultados guardados.
+
+    Retorna:
+        str: Huella hexadecimal
+    """
+    global _ENGINE_VERSION
+    if _ENGINE_VERSION is None:
+        package_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Simulation"))
+        digest = hashlib.sha256()
+        for name in sorted(os.listdir(package_dir)):
+            if name.endswith(".py"):
+                digest.update(name.encode())
+                with open(os.path.join(package_dir, name), mode="rb") as f:
+                    digest.update(f.read())
+        _ENGINE_VERSION = digest.hexdigest()
+    return _ENGINE_VERSION
+
+
+class _PendingResult:
+    """
+    Cálculo en curso de una llave de la caché, compartido por los hilos que la piden al mismo tiempo.
+    """
+
+    def __init__(self, boost_event=None):
+        """
+        Registra un cálculo en curso.
+
+        Parámetros:
+            boost_event (threading.Event): Evento que sube la prioridad del cálculo cuando alguien lo espera
+                                           (None si ya corre con prioridad normal)
+        """
+        self.done = threading.Event()
+        self.boost_event = boost_event
+
+
+class ResultCache:
+    """
+    Caché de resultados de simulación en dos niveles: un LRU en memoria de tamaño acotado y archivos JSON
+    comprimidos con gzip en disco que sobreviven a reinicios del servidor.
+    Las llaves incluyen la huella del mapa y la del código, así que editar cualquiera de los dos las invalida.
+    Solo deben guardarse resultados deterministas (mismos parámetros y semillas -> mismo resultado).
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, directory=DEFAULT_CACHE_DIR):
+        """
+        Inicializa la caché.
+
+        Parámetros:
+            max_entries (int): Entradas que se conservan en memoria antes de descartar la menos usada
+            directory (str): Directorio del nivel en disco (None para usar solo memoria)
+        """
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, kind, params):
+        """
+        Construye la llave canónica de un resultado.
+
+        Parámetros:
+            kind (str): Tipo de resultado (p. ej. 'best_replay' o 'batch')
+            params (dict): Parámetros que determinan el resultado (configuración, estrategia, semillas, ...)
+
+        Retorna:
+            str: Huella hexadecimal de los parámetros, el mapa y el código de simulación
+        """
+        payload = {
+            "kind": kind,
+            "params": params,
+            "map": map_fingerprint(),
+            "engine": engine_version()
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def _path(self, key):
+        """
+        Obtiene la ruta del archivo en disco de una llave.
+
+        Parámetros:
+            key (str): Llave del resultado
+
+        Retorna:
+            str: Ruta del archivo .json.gz
+        """
+        return os.path.join(self.directory, f"{key}.json.gz")
+
+    def get(self, key):
+        """
+        Busca un resultado, primero en memoria y luego en disco (lo que se lee de disco pasa a memoria).
+
+        Parámetros:
+            key (str): Llave del resultado
+
+        Retorna:
+            dict | None: Resultado guardado, o None si no existe
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = None
+        if self.directory is not None:
+            try:
+                with gzip.open(self._path(key), mode="rt", encoding="utf-8") as f:
+                    value = json.load(f)
+            except (OSError, ValueError):
+                # Archivo inexistente, incompleto o corrupto: se trata como ausente
+                value = None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        """
+        Guarda un resultado en memoria y en disco. El archivo se escribe en uno temporal y se renombra,
+        para que una lectura concurrente nunca vea un archivo a medio escribir.
+
+        Parámetros:
+            key (str): Llave del resultado
+            value (dict): Resultado serializable a JSON
+        """
+        with self._lock:
+            self._remember(key, value)
+
+        if self.directory is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as raw, gzip.open(raw, mode="wt", encoding="utf-8") as f:
+                    json.dump(value, f)
+                os.replace(tmp_path, self._path(key))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el resultado en disco: {e}")
+
+    def get_or_compute(self, key, compute, boost_event=None):
+        """
+        Regresa el resultado guardado de una llave o lo calcula y lo guarda. Si otro hilo ya está calculando
+        la misma llave (p. ej. el precálculo en segundo plano), espera ese resultado en lugar de repetir el
+        cálculo, subiéndole la prioridad con su boost_event; si ese cálculo falla o se cancela, lo calcula él.
+
+        Parámetros:
+            key (str): Llave del resultado
+            compute (function): Función sin argumentos que calcula el resultado (None para no guardar nada)
+            boost_event (threading.Event): Evento que los hilos que esperen este cálculo activan para subirle
+                                           la prioridad (None si ya corre con prioridad normal)
+
+        Retorna:
+            tuple: (resultado, True si se obtuvo de la caché o de otro hilo y False si se calculó aquí)
+        """
+        while True:
+            value = self.get(key)
+            if value is not None:
+                return value, True
+
+            with self._lock:
+                pending = self._pending.get(key)
+                owner = pending is None
+                if owner:
+                    pending = self._pending[key] = _PendingResult(boost_event)
+
+            if not owner:
+                if pending.boost_event is not None:
+                    pending.boost_event.set()
+                pending.done.wait()
+                continue
+
+            try:
+                value = compute()
+                if value is not None:
+                    self.put(key, value)
+                return value, False
+            finally:
+                with self._lock:
+                    del self._pending[key]
+                pending.done.set()
+
+    def _remember(self, key, value):
+        """
+        Inserta un resultado en el LRU en memoria descartando los menos usados (requiere el lock).
+
+        Parámetros:
+            key (str): Llave del resultado
+            value (dict): Resultado
+        """
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Reporta el uso de la caché para monitoreo.
+
+        Retorna:
+            dict: Entradas en memoria, aciertos en memoria y en disco, y fallos
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "directory": self.directory
+            }
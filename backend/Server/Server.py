@@ -1,9 +1,36 @@
-from flask import Flask, request, jsonify
+import atexit
+from flask import Flask, Response, request, jsonify
+from werkzeug.serving import is_running_from_reloader
 from Simulation.Simulation import Simulation
-from Simulation.SimulationManager import SimulationManager
+from Simulation.SimulationManager import (SimulationManager, DEFAULT_KEEP_RATIO, DEFAULT_CONFIDENCE,
+                                          DEFAULT_MAX_ITERATIONS, BATCH_ENGINES, MAX_KEEP_RATIO)
+from Simulation.WorkerPool import WorkerPool, DEFAULT_MAX_TASKS_PER_CHILD
+from Simulation.ReplayBinary import pack_replay, REPLAY_MIMETYPE
+from Server.JobManager import JobManager, JOB_FAILED
+from Server.ResultCache import ResultCache, DEFAULT_CACHE_DIR
+from Server.WarmupManager import WarmupManager
 from Simulation.AuxFunctions import formatMap
 import json
 
+# Estrategias de despliegue soportadas por las simulaciones
+STRATEGIES = ("random", "intelligent")
+
+# Búsquedas de la mejor simulación: 'exhaustive' juega todas las partidas completas;
+# 'halving' descarta por mitades sucesivas las de peor puntaje parcial;
+# 'anytime' juega semillas hasta agotar un presupuesto de tiempo (budget_ms)
+SEARCH_MODES = ("exhaustive", "halving", "anytime")
+DEFAULT_SEARCH = "halving"
+DEFAULT_BEST_ITERATIONS = 1000
+# Máximo de semillas que un cliente puede pedir en una búsqueda (cada una es al menos una partida en el pool)
+MAX_BEST_ITERATIONS = 10000
+
+# Semilla de la primera partida de búsquedas y lotes cuando el cliente no envía base_seed: con rangos de
+# semillas deterministas, peticiones idénticas producen el mismo resultado y pueden servirse desde la caché
+DEFAULT_BASE_SEED = 0
+
+# Simulaciones de un lote cuando el cliente no envía iterations (sin paro secuencial)
+DEFAULT_BATCH_ITERATIONS = 10
+
 # Configuración por defecto utilizada
 DEFAULT_CONFIG = {
     "grid_width": 8,
@@ -18,16 +45,39 @@ class Server:
     Proporciona endpoints REST para configurar y ejecutar simulaciones con diferentes estrategias.
     """
     
-    def __init__(self, port=8585):
+    def __init__(self, port=8585, processes=None, max_tasks_per_child=DEFAULT_MAX_TASKS_PER_CHILD,
+                 cache_dir=DEFAULT_CACHE_DIR):
         """
         Inicializa el servidor Flask y configura los parámetros básicos.
         
         Parámetros:
             port (int): Puerto en el que se ejecutará el servidor (valor por defecto: 8585)
+            processes (int): Número de workers del pool de simulación (por defecto, todos los núcleos)
+            max_tasks_per_child (int): Tareas tras las cuales se recicla cada worker del pool
+            cache_dir (str): Directorio de la caché de resultados en disco (None para usar solo memoria)
         """
         self.port = port
         self.app = Flask("FireRescueServer")
         self.simulation_config = DEFAULT_CONFIG.copy()
+
+        # Pool de procesos persistente compartido por todas las peticiones de simulación
+        self.worker_pool = WorkerPool(processes=processes, max_tasks_per_child=max_tasks_per_child)
+        self.manager = SimulationManager(pool=self.worker_pool)
+        # Al salir, los trabajos y el precálculo ya se cancelaron (sus atexit corren antes): las tareas que
+        # sigan en el pool son descartables, así que se termina en lugar de esperar a que se vacíe
+        atexit.register(self.worker_pool.shutdown, wait=False)
+
+        # Trabajos por lotes asíncronos (se cancelan antes de apagar el pool que utilizan)
+        self.jobs = JobManager(self.worker_pool)
+        atexit.register(self.jobs.shutdown)
+
+        # Caché de mejores replays y estadísticas de lotes (memoria + disco)
+        self.results = ResultCache(directory=cache_dir)
+
+        # Precálculo en segundo plano de los mejores replays tras cada /init (se cancela antes de apagar el pool)
+        self.warmup = WarmupManager(self.worker_pool, self._warm_best_simulation, STRATEGIES)
+        atexit.register(self.warmup.shutdown)
+
         self.configure_routes()
 
     def configure_routes(self):
@@ -37,25 +87,55 @@ class Server:
         """
         self.app.add_url_rule('/init', view_func=self.init_params, methods=['POST'])
         self.app.add_url_rule('/getMap', view_func=self.get_map_data, methods=['GET'])
+        self.app.add_url_rule('/health', view_func=self.get_health, methods=['GET'])
         
         # Endpoints para ejecutar simulaciones individuales con estrategias específicas
         self.app.add_url_rule('/simulation/random', view_func=self.run_single_simulation_random, methods=['POST'])
         self.app.add_url_rule('/simulation/intelligent', view_func=self.run_single_simulation_intelligent, methods=['POST'])
+
+        # Endpoint que transmite los frames de una simulación mientras se calcula (NDJSON)
+        self.app.add_url_rule('/simulation/stream', view_func=self.stream_simulation, methods=['POST'])
         
         # Endpoint para ejecutar experimentos con múltiples simulaciones en paralelo
         self.app.add_url_rule('/run_batch', view_func=self.run_batch_experiment, methods=['POST'])
 
+        # Endpoints para ejecutar experimentos en segundo plano y consultar su progreso/resultado
+        self.app.add_url_rule('/jobs', view_func=self.create_batch_job, methods=['POST'])
+        self.app.add_url_rule('/jobs/<job_id>', view_func=self.get_batch_job, methods=['GET'])
+        self.app.add_url_rule('/jobs/<job_id>/result', view_func=self.get_batch_job_result, methods=['GET'])
+
     def run(self):
         """
         Inicia el servidor Flask en el puerto configurado.
         """
         print(f"Servidor iniciado en http://localhost:{self.port}")
+
+        # Con debug=True Flask relanza el script en un proceso hijo que es quien atiende las peticiones;
+        # el pool se crea solo en ese proceso (en cualquier otro caso se crea con la primera simulación)
+        if is_running_from_reloader():
+            self.worker_pool.start()
+
         self.app.run(port=self.port, debug=True)
 
+    def get_health(self):
+        """
+        Reporta el estado del servidor y del pool de workers de simulación.
+        
+        Retorna:
+            JSON con el estado del pool (workers vivos, tareas procesadas, tiempo activo), el uso de la caché
+            y el estado del precálculo en segundo plano.
+            Código 503 si el pool está iniciado pero no tiene workers vivos.
+        """
+        pool_health = self.worker_pool.health()
+        status_code = 503 if pool_health["status"] == "degraded" else 200
+        return jsonify({"status": pool_health["status"], "pool": pool_health,
+                        "cache": self.results.stats(), "warmup": self.warmup.status()}), status_code
+
     def init_params(self):
         """
         Configura los parámetros de simulación mediante una petición POST.
         Si no se envían datos, carga la configuración por defecto.
+        En ambos casos inicia en segundo plano el precálculo de los mejores replays de la nueva configuración.
         
         Retorna:
             JSON con mensaje de confirmación y la configuración actual aplicada.
@@ -64,6 +144,7 @@ class Server:
         data = request.json
         if not data:
             self.simulation_config = DEFAULT_CONFIG.copy()
+            self.warmup.schedule(self.simulation_config)
             return jsonify({"msg": "Default config loaded", "config": self.simulation_config})
         
         try:
@@ -73,6 +154,7 @@ class Server:
             self.simulation_config["random_fires"] = data.get("num_fires", None) 
             self.simulation_config["random_pois"] = data.get("num_pois", None)
             
+            self.warmup.schedule(self.simulation_config)
             return jsonify({"msg": "Config updated", "config": self.simulation_config})
         except Exception as e:
             return jsonify({"error": str(e)}), 400
@@ -97,67 +179,281 @@ class Server:
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
-    def _run_best_simulation(self, strategy_name, iterations=1000):
+    def _run_best_simulation(self, strategy_name, iterations=DEFAULT_BEST_ITERATIONS, search=DEFAULT_SEARCH,
+                             keep_ratio=DEFAULT_KEEP_RATIO, budget_seconds=None, base_seed=DEFAULT_BASE_SEED,
+                             config=None, manager=None):
         """
         Ejecuta múltiples simulaciones en paralelo y selecciona la mejor según el puntaje obtenido.
+        Los workers solo reportan métricas; el replay de la mejor corrida se regenera a partir de su semilla.
+        En 'exhaustive' y 'anytime' las partidas que ya no pueden superar a la mejor terminada se abandonan (poda
+        por umbral compartido); 'halving' no poda para que su resultado sea determinista y pueda guardarse.
+        Los resultados de 'halving' y 'exhaustive' se guardan en la caché de resultados y cada llave se calcula
+        una sola vez aunque la pidan a la vez una petición y el precálculo; 'anytime' depende del tiempo
+        disponible y siempre se recalcula.
         Este método es auxiliar y no se expone directamente como endpoint.
         
         Parámetros:
             strategy_name (str): Nombre de la estrategia a utilizar ('random' o 'intelligent')
-            iterations (int): Número de simulaciones a ejecutar para encontrar la mejor (valor por defecto: 1000)
+            iterations (int): Número de semillas a evaluar para encontrar la mejor (valor por defecto: 1000)
+            search (str): 'halving' para descartar por mitades sucesivas las partidas con peor puntaje parcial
+                          o 'exhaustive' para jugar todas hasta el final
+            keep_ratio (float): Fracción de partidas que sobrevive cada etapa de 'halving'
+            budget_seconds (float): Presupuesto de tiempo de 'anytime' (iterations es entonces el máximo
+                                    de semillas, o None para no limitarlas)
+            base_seed (int): Semilla de la primera partida (se evalúan semillas consecutivas)
+            config (dict): Configuración de simulación (por defecto, la vigente)
+            manager (SimulationManager): Gestor que ejecuta la búsqueda (por defecto, el interactivo)
         
         Retorna:
-            dict: Datos de reproducción (replay_data) de la simulación con mejor puntaje.
+            dict: Datos de reproducción (replay_data) de la simulación con mejor puntaje, con frames completos
+                  y 'games_evaluated' con el número de partidas jugadas en la búsqueda.
                   En caso de no ejecutarse ninguna simulación, retorna diccionario con error.
         """
-        manager = SimulationManager()
-        
-        # Ejecuta el lote completo de simulaciones en paralelo para optimizar el tiempo de respuesta
-        experiment_data = manager.run_batch_experiment(
-            self.simulation_config['grid_width'], 
-            self.simulation_config['grid_height'], 
-            self.simulation_config['agents'], 
-            self.simulation_config["max_energy"], 
-            iterations=iterations,
-            strategy_name=strategy_name
-        )
+        cfg = dict(config if config is not None else self.simulation_config)
+        manager = manager or self.manager
+
+        def run_search():
+            return self._search_best_simulation(strategy_name, iterations, search, keep_ratio, budget_seconds,
+                                                base_seed, cfg, manager)
+
+        if search == "anytime":
+            replay_data = run_search()
+        else:
+            # Una sola búsqueda por llave: si el precálculo (u otra petición) ya la está calculando, se espera
+            # su resultado y se le sube la prioridad en lugar de repetirla
+            cache_key = self.results.key("best_replay", {
+                "config": cfg,
+                "strategy": strategy_name,
+                "search": search,
+                "iterations": iterations,
+                "keep_ratio": keep_ratio if search == "halving" else None,
+                "base_seed": base_seed
+            })
+            replay_data, cached = self.results.get_or_compute(cache_key, run_search, boost_event=manager.boost_event)
+            if cached:
+                print(f"♻️ Mejor simulación ({strategy_name}, {search}) servida desde la caché")
+
+        if replay_data is None:
+            return {"error": "No simulations ran"}
+        return replay_data
+
+    def _search_best_simulation(self, strategy_name, iterations, search, keep_ratio, budget_seconds, base_seed,
+                                cfg, manager):
+        """
+        Ejecuta la búsqueda de la mejor simulación (sin caché) y regenera su replay.
+        Este método es auxiliar de _run_best_simulation, que documenta los parámetros.
+
+        Retorna:
+            dict: Datos de reproducción de la mejor simulación con 'games_evaluated', o None si no se
+                  ejecutó ninguna
+        """
+        # Ejecuta las simulaciones en el pool persistente para optimizar el tiempo de respuesta
+        if search == "anytime":
+            experiment_data = manager.run_anytime_search(
+                cfg['grid_width'], cfg['grid_height'], cfg['agents'], cfg["max_energy"],
+                strategy_name=strategy_name,
+                budget_seconds=budget_seconds,
+                max_games=iterations,
+                base_seed=base_seed,
+                replay_top=1
+            )
+        elif search == "halving":
+            experiment_data = manager.run_successive_halving(
+                cfg['grid_width'], cfg['grid_height'], cfg['agents'], cfg["max_energy"],
+                iterations=iterations,
+                strategy_name=strategy_name,
+                keep_ratio=keep_ratio,
+                base_seed=base_seed,
+                replay_top=1
+            )
+        else:
+            experiment_data = manager.run_batch_experiment(
+                cfg['grid_width'], cfg['grid_height'], cfg['agents'], cfg["max_energy"],
+                iterations=iterations,
+                strategy_name=strategy_name,
+                base_seed=base_seed,
+                replay_top=1,
+                prune=True
+            )
         
         # Obtiene la lista ordenada descendentemente por puntaje
         ranked_runs = experiment_data["sorted_runs"]
         
         if not ranked_runs:
-            return {"error": "No simulations ran"}
+            return None
 
         best_run = ranked_runs[0]
+        games_pruned = experiment_data.get("games_pruned", 0)
+        games_evaluated = experiment_data.get("games_evaluated", len(ranked_runs) + games_pruned)
         
-        print(f"Mejor simulación encontrada ({strategy_name}): Score {best_run['score']} - ID {best_run['id']}")
+        print(f"Mejor simulación encontrada ({strategy_name}, {search}, {games_evaluated} partidas, "
+              f"{games_pruned} abandonadas): "
+              f"Score {best_run['score']} - ID {best_run['id']} - Semilla {best_run['seed']}")
         
-        return best_run["replay_data"]
+        replay_data = best_run["replay_data"]
+        replay_data["games_evaluated"] = games_evaluated
+        return replay_data
+
+    def _warm_best_simulation(self, strategy_name, config, manager):
+        """
+        Precalcula la mejor simulación con los parámetros por defecto de /simulation/* (la misma llave de
+        caché que una petición sin body). Si ya está en la caché o la está calculando una petición, no la repite.
+
+        Parámetros:
+            strategy_name (str): Nombre de la estrategia ('random' o 'intelligent')
+            config (dict): Configuración de simulación a precalcular
+            manager (SimulationManager): Gestor en segundo plano (prioridad baja y cancelable)
+        """
+        self._run_best_simulation(strategy_name, config=config, manager=manager)
+
+    def _best_search_params(self):
+        """
+        Lee del body de la petición los parámetros opcionales de la búsqueda de la mejor simulación.
+        
+        Parámetros esperados en request.json (todos opcionales):
+            iterations (int): Número de semillas a evaluar, hasta 10000 (valor por defecto: 1000; con budget_ms,
+                              máximo opcional)
+            search (str): 'halving' (valor por defecto), 'exhaustive' o 'anytime'
+            keep_ratio (float): Fracción que sobrevive cada etapa de 'halving', mayor a 0 y hasta 0.5
+                                (valor por defecto: 0.25)
+            budget_ms (float): Presupuesto de tiempo en milisegundos; implica search='anytime'
+            base_seed (int): Semilla de la primera partida evaluada (valor por defecto: 0)
+        
+        Retorna:
+            dict: Argumentos para _run_best_simulation
+        """
+        data = request.get_json(silent=True) or {}
+        budget_ms = data.get("budget_ms")
+        search = data.get("search", "anytime" if budget_ms is not None else DEFAULT_SEARCH)
+        if search not in SEARCH_MODES:
+            raise ValueError(f"Búsqueda desconocida: {search}")
+        if search == "anytime":
+            if budget_ms is None:
+                raise ValueError("La búsqueda 'anytime' requiere budget_ms")
+            budget_ms = float(budget_ms)
+            if budget_ms <= 0:
+                raise ValueError("budget_ms debe ser mayor a 0")
+            # Con presupuesto de tiempo, iterations solo limita las semillas si se envía
+            iterations = data.get("iterations")
+        else:
+            iterations = data.get("iterations", DEFAULT_BEST_ITERATIONS)
+        if iterations is not None:
+            iterations = int(iterations)
+            if not 0 < iterations <= MAX_BEST_ITERATIONS:
+                raise ValueError(f"iterations debe ser mayor a 0 y a lo más {MAX_BEST_ITERATIONS}")
+        keep_ratio = float(data.get("keep_ratio", DEFAULT_KEEP_RATIO))
+        if not 0 < keep_ratio <= MAX_KEEP_RATIO:
+            raise ValueError(f"keep_ratio debe ser mayor a 0 y a lo más {MAX_KEEP_RATIO}")
+        return {"iterations": iterations, "search": search, "keep_ratio": keep_ratio,
+                "budget_seconds": budget_ms / 1000 if search == "anytime" else None,
+                "base_seed": int(data.get("base_seed", DEFAULT_BASE_SEED))}
 
     def run_single_simulation_random(self):
         """
         Ejecuta múltiples simulaciones con estrategia aleatoria y retorna la mejor.
         Endpoint POST que permite obtener una simulación optimizada para visualización en Unity.
-        El número de iteraciones (1000) puede ajustarse según el tiempo de respuesta deseado.
+        El número de semillas, el tipo de búsqueda, keep_ratio y el presupuesto de tiempo (budget_ms) se pueden
+        ajustar en el body (ver _best_search_params).
         
         Retorna:
-            JSON con los datos de reproducción de la mejor simulación encontrada.
+            JSON (o replay binario si el cliente lo solicita en Accept) con la mejor simulación encontrada.
+            En caso de parámetros inválidos, retorna JSON con descripción del error y código 400.
         """
-        result_json = self._run_best_simulation(strategy_name="random", iterations=1000)
-        return jsonify(result_json)
+        try:
+            params = self._best_search_params()
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        with self.worker_pool.foreground():
+            result_json = self._run_best_simulation(strategy_name="random", **params)
+        return self._replay_response(result_json)
     
     def run_single_simulation_intelligent(self):
         """
         Ejecuta múltiples simulaciones con estrategia inteligente y retorna la mejor.
         Endpoint POST que garantiza obtener el mejor comportamiento posible considerando
         las variaciones aleatorias en las posiciones iniciales de los elementos.
+        Acepta los mismos parámetros opcionales que /simulation/random.
         
         Retorna:
-            JSON con los datos de reproducción de la mejor simulación encontrada.
+            JSON (o replay binario si el cliente lo solicita en Accept) con la mejor simulación encontrada.
+            En caso de parámetros inválidos, retorna JSON con descripción del error y código 400.
         """
-        result_json = self._run_best_simulation(strategy_name="intelligent")
+        try:
+            params = self._best_search_params()
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        with self.worker_pool.foreground():
+            result_json = self._run_best_simulation(strategy_name="intelligent", **params)
         print(result_json)
-        return jsonify(result_json)
+        return self._replay_response(result_json)
+
+    def _replay_response(self, replay_data):
+        """
+        Construye la respuesta HTTP de un replay según el header Accept de la petición.
+        Si el cliente prefiere REPLAY_MIMETYPE se envía el formato binario compacto; en cualquier
+        otro caso (incluido Accept: */*) se mantiene el JSON que espera Unity. El header X-Games-Evaluated
+        indica cuántas partidas se jugaron en la búsqueda.
+        
+        Parámetros:
+            replay_data (dict): Datos de reproducción (o diccionario de error)
+        
+        Retorna:
+            Response con el replay en JSON o en formato binario.
+        """
+        preferred = request.accept_mimetypes.best_match(["application/json", REPLAY_MIMETYPE])
+        if preferred == REPLAY_MIMETYPE and "error" not in replay_data:
+            response = Response(pack_replay(replay_data), mimetype=REPLAY_MIMETYPE)
+        else:
+            response = jsonify(replay_data)
+        response.vary.add("Accept")
+        # Partidas jugadas en la búsqueda (también disponible en el formato binario)
+        if "games_evaluated" in replay_data:
+            response.headers["X-Games-Evaluated"] = str(replay_data["games_evaluated"])
+        return response
+
+    def stream_simulation(self):
+        """
+        Ejecuta una sola simulación y transmite sus frames conforme se generan.
+        La respuesta es JSON delimitado por saltos de línea (NDJSON) con transferencia por bloques:
+        una línea 'metadata', una línea 'frame' por cada frame y una línea final 'result'.
+        El cliente puede empezar la reproducción con el primer frame y el servidor nunca
+        mantiene la lista completa de frames en memoria.
+        
+        Parámetros esperados en request.json:
+            strategy (str): Estrategia a utilizar (valor por defecto: 'intelligent')
+            seed (int): Semilla de la partida (opcional; permite repetir una simulación concreta)
+        
+        Retorna:
+            Response con mimetype application/x-ndjson.
+            En caso de parámetros inválidos, retorna JSON con descripción del error y código 400.
+        """
+        cfg = self.simulation_config
+        data = request.get_json(silent=True) or {}
+        strategy = data.get("strategy", "intelligent")
+        seed = data.get("seed")
+        if strategy not in STRATEGIES:
+            return jsonify({"error": f"Estrategia desconocida: {strategy}"}), 400
+        try:
+            seed = int(seed) if seed is not None else None
+        except (TypeError, ValueError):
+            return jsonify({"error": "seed debe ser un entero"}), 400
+
+        sim = Simulation(cfg["grid_width"], cfg["grid_height"], cfg["agents"], cfg["max_energy"],
+                         strategy=strategy, replay_mode="stream", seed=seed)
+
+        def generate():
+            yield json.dumps({"type": "metadata", "metadata": sim.simulation_data["metadata"]}) + "\n"
+            for frame in sim.iter_frames():
+                yield json.dumps({"type": "frame", "frame": frame}) + "\n"
+            yield json.dumps({
+                "type": "result",
+                "score": sim.evaluate(),
+                "final_score": sim.calculate_final_score(),
+                "end_reason": sim.end_reason,
+                "steps_total": sim.model.steps
+            }) + "\n"
+
+        return Response(generate(), mimetype="application/x-ndjson")
 
     def run_batch_experiment(self):
         """
@@ -168,20 +464,164 @@ class Server:
         Parámetros esperados en request.json:
             iterations (int): Número de simulaciones a ejecutar (valor por defecto: 10)
             strategy (str): Estrategia a utilizar (valor por defecto: 'intelligent')
+            engine (str): Motor de ejecución, 'simulation' o 'batched' (solo 'random'; valor por defecto: 'simulation')
+            win_rate_width (float): Activa el paro secuencial: ancho máximo del intervalo de la tasa de victorias
+                                    (fracción entre 0 y 1)
+            score_width (float): Activa el paro secuencial: ancho máximo del intervalo del puntaje promedio
+            confidence (float): Nivel de confianza de los intervalos del paro secuencial (valor por defecto: 0.95)
+            Con paro secuencial, iterations es el máximo de simulaciones (valor por defecto: 10000).
+            base_seed (int): Semilla de la primera simulación (valor por defecto: 0)
         
         Retorna:
-            JSON con resultados estadísticos del experimento incluyendo todas las simulaciones ordenadas.
+            JSON con resultados estadísticos del experimento incluyendo las métricas (y semilla) de todas las simulaciones ordenadas.
+            Peticiones idénticas con la misma configuración se sirven desde la caché de resultados.
+            Con paro secuencial incluye 'sequential' con las simulaciones ejecutadas y los intervalos alcanzados.
+            En caso de parámetros inválidos o un motor inválido para la estrategia, retorna JSON con descripción del error y código 400.
         """
-        cfg = self.simulation_config
+        cfg = dict(self.simulation_config)
         data = request.json or {}
-        iterations = data.get("iterations", 10)
         strategy = data.get("strategy", "intelligent")
 
-        manager = SimulationManager()
-        results = manager.run_batch_experiment(
-            cfg["grid_width"], cfg["grid_height"], 
-            cfg["agents"], cfg["max_energy"],
-            iterations=iterations,
-            strategy_name=strategy
-        )
-        return jsonify(results)
\ No newline at end of file
+        cache_key = self.results.key("batch", {
+            "config": cfg,
+            "request": {name: data.get(name) for name in
+                        ("iterations", "strategy", "engine", "win_rate_width", "score_width", "confidence", "base_seed")}
+        })
+        cached = self.results.get(cache_key)
+        if cached is not None:
+            print(f"♻️ Lote ({strategy}) servido desde la caché")
+            return jsonify(cached)
+
+        try:
+            iterations, options = self._batch_options(data)
+            with self.worker_pool.foreground():
+                if "win_rate_width" in options:
+                    results = self.manager.run_sequential_batch(
+                        cfg["grid_width"], cfg["grid_height"],
+                        cfg["agents"], cfg["max_energy"],
+                        strategy_name=strategy,
+                        max_iterations=iterations,
+                        **options
+                    )
+                else:
+                    results = self.manager.run_batch_experiment(
+                        cfg["grid_width"], cfg["grid_height"], 
+                        cfg["agents"], cfg["max_energy"],
+                        iterations=iterations,
+                        strategy_name=strategy,
+                        **options
+                    )
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        self.results.put(cache_key, results)
+        return jsonify(results)
+
+    def _batch_options(self, data):
+        """
+        Lee y valida los parámetros de un lote comunes a /run_batch y /jobs. Lanza ValueError (o TypeError)
+        si alguno es inválido.
+
+        Parámetros:
+            data (dict): Body de la petición
+
+        Retorna:
+            tuple: (iterations, options) con el número de simulaciones (el máximo con paro secuencial) y los
+                   argumentos para run_batch_experiment o, si incluyen 'win_rate_width', run_sequential_batch
+        """
+        strategy = data.get("strategy", "intelligent")
+        options = {
+            "engine": data.get("engine", "simulation"),
+            "base_seed": int(data.get("base_seed", DEFAULT_BASE_SEED))
+        }
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Estrategia desconocida: {strategy}")
+        if options["engine"] not in BATCH_ENGINES:
+            raise ValueError(f"engine inválido: {options['engine']}")
+        if options["engine"] == "batched" and strategy != "random":
+            raise ValueError("El motor 'batched' solo admite la estrategia 'random'")
+
+        if "win_rate_width" in data or "score_width" in data:
+            win_rate_width = data.get("win_rate_width")
+            score_width = data.get("score_width")
+            options["win_rate_width"] = None if win_rate_width is None else float(win_rate_width)
+            options["score_width"] = None if score_width is None else float(score_width)
+            options["confidence"] = float(data.get("confidence", DEFAULT_CONFIDENCE))
+            iterations = int(data.get("iterations", DEFAULT_MAX_ITERATIONS))
+            if any(width is not None and width <= 0 for width in (options["win_rate_width"], options["score_width"])):
+                raise ValueError("Los anchos de intervalo deben ser mayores a 0")
+            if not 0 < options["confidence"] < 1:
+                raise ValueError("confidence debe estar entre 0 y 1")
+            if iterations < 2:
+                raise ValueError("iterations debe ser al menos 2 con paro secuencial")
+        else:
+            iterations = int(data.get("iterations", DEFAULT_BATCH_ITERATIONS))
+            if iterations <= 0:
+                raise ValueError("iterations debe ser mayor a 0")
+        return iterations, options
+
+    def create_batch_job(self):
+        """
+        Crea un experimento por lotes que se ejecuta en segundo plano y regresa inmediatamente.
+        Endpoint POST que recibe los mismos parámetros que /run_batch.
+        
+        Parámetros esperados en request.json:
+            iterations (int): Número de simulaciones a ejecutar (valor por defecto: 10)
+            strategy (str): Estrategia a utilizar (valor por defecto: 'intelligent')
+            engine (str): Motor de ejecución, 'simulation' o 'batched' (solo 'random'; valor por defecto: 'simulation')
+            win_rate_width (float): Activa el paro secuencial: ancho máximo del intervalo de la tasa de victorias
+            score_width (float): Activa el paro secuencial: ancho máximo del intervalo del puntaje promedio
+            confidence (float): Nivel de confianza de los intervalos del paro secuencial (valor por defecto: 0.95)
+            Con paro secuencial, iterations es el máximo de simulaciones (valor por defecto: 10000).
+            base_seed (int): Semilla de la primera simulación (valor por defecto: 0)
+        
+        Retorna:
+            JSON con el identificador del trabajo y las URLs de consulta, con código 202.
+            En caso de parámetros inválidos, retorna JSON con descripción del error y código 400.
+        """
+        data = request.json or {}
+        try:
+            iterations, options = self._batch_options(data)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+
+        job = self.jobs.submit(self.simulation_config, iterations, data.get("strategy", "intelligent"), options)
+        response = job.to_dict()
+        response["status_url"] = f"/jobs/{job.id}"
+        response["result_url"] = f"/jobs/{job.id}/result"
+        return jsonify(response), 202
+
+    def get_batch_job(self, job_id):
+        """
+        Consulta el estado y progreso de un experimento en segundo plano.
+        
+        Parámetros:
+            job_id (str): Identificador del trabajo
+        
+        Retorna:
+            JSON con estado ('queued', 'running', 'done', 'failed') y progreso del trabajo.
+            Código 404 si el trabajo no existe.
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return jsonify({"error": f"Trabajo {job_id} no encontrado"}), 404
+        return jsonify(job.to_dict())
+
+    def get_batch_job_result(self, job_id):
+        """
+        Obtiene el resultado de un experimento en segundo plano ya terminado.
+        
+        Parámetros:
+            job_id (str): Identificador del trabajo
+        
+        Retorna:
+            JSON con las estadísticas del experimento (mismo formato que /run_batch).
+            Código 202 con el estado si aún no termina, 404 si no existe y 500 si falló.
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return jsonify({"error": f"Trabajo {job_id} no encontrado"}), 404
+        if job.status == JOB_FAILED:
+            return jsonify({"error": job.error, "job": job.to_dict()}), 500
+        if not job.is_finished:
+            return jsonify(job.to_dict()), 202
+        return jsonify(job.result)
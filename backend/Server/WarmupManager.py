@@ -0,0 +1,122 @@
+import time
+import queue
+import threading
+from Simulation.SimulationManager import SimulationManager
+from Simulation.WorkerPool import TaskCancelled
+
+# Estados posibles del precálculo en segundo plano
+WARMUP_IDLE = "idle"
+WARMUP_RUNNING = "running"
+WARMUP_DONE = "done"
+WARMUP_CANCELLED = "cancelled"
+WARMUP_FAILED = "failed"
+
+
+class WarmupManager:
+    """
+    Precalcula en segundo plano los mejores replays de la configuración vigente para que la primera
+    reproducción después de configurar se sirva desde la caché de resultados.
+    Las búsquedas corren con prioridad baja (SimulationManager en modo background): ceden el pool a las
+    peticiones interactivas y se cancelan cuando la configuración vuelve a cambiar.
+    """
+
+    def __init__(self, pool, run_search, strategies):
+        """
+        Inicializa el administrador de precálculo.
+
+        Parámetros:
+            pool (WorkerPool): Pool persistente compartido con las peticiones interactivas
+            run_search (function): Función llamada como run_search(estrategia, configuración, manager) que
+                                   ejecuta la búsqueda y guarda su resultado en la caché (o no hace nada si
+                                   ya está guardado o lo está calculando una petición interactiva)
+            strategies (tuple): Estrategias a precalcular, en orden
+        """
+        self.pool = pool
+        self.run_search = run_search
+        self.strategies = tuple(strategies)
+        self._lock = threading.Lock()
+        self._cancel = None
+        self._status = {"status": WARMUP_IDLE}
+        # Hilo daemon (no un ThreadPoolExecutor): el intérprete no lo espera al salir, así que los
+        # manejadores de atexit (shutdown) alcanzan a cancelarlo en lugar de esperar a que termine
+        self._pending = queue.Queue()
+        self._thread = threading.Thread(target=self._serve, name="warmup", daemon=True)
+        self._thread.start()
+
+    def schedule(self, config):
+        """
+        Cancela el precálculo en curso (si lo hay) y encola uno nuevo para la configuración indicada.
+
+        Parámetros:
+            config (dict): Configuración de simulación (se copia para aislarla de cambios posteriores)
+        """
+        cancel = threading.Event()
+        with self._lock:
+            if self._cancel is not None:
+                self._cancel.set()
+            self._cancel = cancel
+        self._pending.put((dict(config), cancel))
+
+    def _serve(self):
+        """
+        Ciclo del hilo de precálculo: atiende las configuraciones encoladas, una a la vez, hasta recibir None.
+        """
+        while True:
+            job = self._pending.get()
+            if job is None:
+                return
+            self._run(*job)
+
+    def _run(self, config, cancel):
+        """
+        Ejecuta las búsquedas de todas las estrategias para una configuración, en orden.
+
+        Parámetros:
+            config (dict): Configuración de simulación
+            cancel (threading.Event): Evento que se activa cuando este precálculo ya no es necesario
+        """
+        if cancel.is_set():
+            return
+        status = {"status": WARMUP_RUNNING, "config": config, "completed": [], "started_at": time.time(),
+                  "finished_at": None}
+        with self._lock:
+            self._status = status
+
+        print(f"🔥 Precalculando mejores replays para {config}...")
+        try:
+            for strategy in self.strategies:
+                # Un gestor por estrategia: si una petición espera este resultado, solo sube la prioridad de
+                # esta búsqueda (boost_event) y no la de las estrategias que siguen
+                manager = SimulationManager(pool=self.pool, background=True, cancel_event=cancel,
+                                            boost_event=threading.Event())
+                self.run_search(strategy, config, manager)
+                status["completed"].append(strategy)
+            status["status"] = WARMUP_DONE
+        except TaskCancelled:
+            status["status"] = WARMUP_CANCELLED
+            print("🔥 Precálculo cancelado (cambio de configuración o apagado del servidor)")
+        except Exception as e:
+            status["status"] = WARMUP_FAILED
+            status["error"] = str(e)
+            print(f"❌ El precálculo falló: {e}")
+        finally:
+            status["finished_at"] = time.time()
+
+    def status(self):
+        """
+        Reporta el estado del último precálculo.
+
+        Retorna:
+            dict: Estado, configuración, estrategias ya precalculadas y marcas de tiempo
+        """
+        with self._lock:
+            return dict(self._status, completed=list(self._status.get("completed", [])))
+
+    def shutdown(self):
+        """
+        Cancela el precálculo en curso y los encolados, y detiene el hilo sin esperar a que termine.
+        """
+        with self._lock:
+            if self._cancel is not None:
+                self._cancel.set()
+        self._pending.put(None)
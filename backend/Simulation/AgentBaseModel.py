@@ -1,5 +1,4 @@
 from mesa import Agent
-import random
 
 class AgentBaseModel(Agent):
     def __init__(self, model, pa, id, printable=False):
@@ -17,6 +16,7 @@ class AgentBaseModel(Agent):
         super().__init__(model)
         self.model = model
         self.id = id
+        self._carrying_victim = False
         self.printable = printable
         self.pa = 0 
         self.totalPA = pa 
@@ -26,6 +26,28 @@ class AgentBaseModel(Agent):
         self.steps_taken = 0
         self.movement_count = 0
     
+    @property
+    def carrying_victim(self):
+        """
+        Indica si el agente está cargando una víctima.
+        
+        Retorna:
+            bool: True si carga una víctima
+        """
+        return self._carrying_victim
+
+    @carrying_victim.setter
+    def carrying_victim(self, value):
+        """
+        Cambia el estado de carga registrándolo como cambio de agentes en el modelo.
+        
+        Parámetros:
+            value (bool): Nuevo estado de carga
+        """
+        if value != self._carrying_victim and self.pos is not None:
+            self.model.mark_dirty("agents", self.pos[0], self.pos[1])
+        self._carrying_victim = value
+
     def step(self):
         """
         Ejecuta el ciclo de vida del agente durante un turno. Recarga PA y ejecuta un bucle de acciones hasta agotar los puntos o no tener movimientos válidos.
@@ -74,8 +96,7 @@ class AgentBaseModel(Agent):
             return 2 
             
         # Costo de Puerta Cerrada
-        door_idx = self.model.get_door_index(curr_pos, target_pos)
-        if door_idx != -1 and self.model.doors[door_idx][2] == 'Closed':
+        if self.model.get_door_status(curr_pos, target_pos) == 'Closed':
             return 1 
             
         # Costo de Peligros
@@ -90,14 +111,14 @@ class AgentBaseModel(Agent):
     def decision_choose_movement(self, possible_steps):
         """
         Decide cuál será el siguiente movimiento entre las casillas disponibles.
-        En la clase base, esta decisión es puramente estocástica (aleatoria).
+        En la clase base, esta decisión es puramente estocástica (aleatoria) y usa el generador del modelo.
         
         Parámetros:
             possible_steps (list): Lista de tuplas con las coordenadas adyacentes válidas.
         Retorna:
             tuple: Coordenada (x, y) elegida para moverse.
         """
-        return random.choice(possible_steps)
+        return self.random.choice(possible_steps)
 
     def decision_extinguish_fire(self):
         """
@@ -109,7 +130,7 @@ class AgentBaseModel(Agent):
         Retorna:
             bool: True si decide extinguir, False en caso contrario.
         """
-        return random.choice([True, False])
+        return self.random.choice([True, False])
     
     def decision_complete_extinguish(self):
         """
@@ -121,7 +142,7 @@ class AgentBaseModel(Agent):
         Retorna:
             bool: True si decide extinguir completamente, False si solo reduce a humo.
         """
-        return random.choice([True, False])
+        return self.random.choice([True, False])
 
     def decision_chop_wall(self):
         """
@@ -133,7 +154,7 @@ class AgentBaseModel(Agent):
         Retorna:
             bool: True si decide romper la pared, False si decide no hacerlo.
         """
-        return random.choice([True, False])
+        return self.random.choice([True, False])
     
     def decision_open_door(self):
         """
@@ -145,7 +166,7 @@ class AgentBaseModel(Agent):
         Retorna:
             bool: True si decide abrir la puerta, False en caso contrario.
         """
-        return random.choice([True, False])
+        return self.random.choice([True, False])
 
     def decision_reveal_poi(self):
         """
@@ -157,7 +178,7 @@ class AgentBaseModel(Agent):
         Retorna:
             bool: True si decide revelar el POI, False en caso contrario.
         """
-        return random.choice([True, False])
+        return self.random.choice([True, False])
 
     def decision_rescue_victim(self):
         """
@@ -169,7 +190,7 @@ class AgentBaseModel(Agent):
         Retorna:
             bool: True si decide rescatar (cargar) a la víctima, False en caso contrario.
         """
-        return random.choice([True, False])
+        return self.random.choice([True, False])
 
 
     # --- ACCIONES ---
@@ -182,7 +203,7 @@ class AgentBaseModel(Agent):
         Retorna:
             list: Lista de tuplas (x, y) con los vecinos.
         """
-        return self.model.grid.get_neighborhood(self.pos, moore=False, include_center=False)
+        return self.model.topology.neighbors[self.pos]
     
     def _get_direction_index(self, cx, cy, tx, ty):
         """
@@ -248,13 +269,13 @@ class AgentBaseModel(Agent):
             return False
 
         # 1.1 OBSTÁCULOS: PUERTAS
-        door_idx = self.model.get_door_index(curr_pos, target_pos)
-        if door_idx != -1:
-            if self.model.doors[door_idx][2] == 'Closed':    
+        door_status = self.model.get_door_status(curr_pos, target_pos)
+        if door_status is not None:
+            if door_status == 'Closed':    
                 if self.printable: print(f"   🚪 Agente {self.id}: Puerta cerrada.")
                 if self.pa >= 1 and self.decision_open_door():
                     if self.printable: print(f"   👍 Agente {self.id}: Abriendo puerta (-1 PA).")
-                    self.model.doors[door_idx][2] = 'Open'
+                    self.model.open_door(curr_pos, target_pos)
                     self.pa -= 1
                     return True
                 else:
@@ -304,7 +325,7 @@ class AgentBaseModel(Agent):
 
         if self.pa >= move_cost:
             if self.printable: print(f"   🦶 Agente {self.id}: Moviéndose a {target_pos} (Costo: {move_cost}).")
-            self.model.grid.move_agent(self, target_pos)
+            self.model.move_agent(self, target_pos)
             self.pa -= move_cost
             self.steps_taken += 1
             self.movement_count += 1
@@ -1,5 +1,4 @@
 from Simulation.AgentBaseModel import AgentBaseModel
-from Simulation.AuxFunctions import dijkstra_search
 
 class AgentFireFighter(AgentBaseModel):
     def __init__(self, model, pa, id, printable=False):
@@ -20,7 +19,8 @@ class AgentFireFighter(AgentBaseModel):
     def decision_choose_movement(self, possible_steps):
         """
         Determina el movimiento del bombero priorizando la ubicación de fuegos activos.
-        Implementa el algoritmo de Dijkstra para encontrar la ruta más corta hacia el fuego más cercano. Si no hay fuego, se mueve aleatoriamente.
+        Usa el campo de distancias hacia el fuego que comparte el modelo (Dijkstra inverso multi-origen): elige el mismo
+        paso que un Dijkstra desde el agente, pero se calcula una vez por cambio del mundo. Si no hay fuego, se mueve aleatoriamente.
         
         Parámetros:
             possible_steps (list): Lista de movimientos válidos adyacentes.
@@ -38,7 +38,8 @@ class AgentFireFighter(AgentBaseModel):
                 print(f"   🤷‍♂️ No hay fuego en el mapa. Patrullando.")
             return super().decision_choose_movement(possible_steps)
 
-        next_step = dijkstra_search(self, fire_targets, avoid_fire=False)
+        field = self.model.get_fire_distance_field(step_cost=2 if self.carrying_victim else 1)
+        next_step = field.step_from(self.pos)
         
         if self.printable:
             print(f"   🗺️ Dijkstra sugiere ir a: {next_step}")
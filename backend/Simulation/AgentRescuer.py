@@ -1,5 +1,5 @@
 from Simulation.AgentBaseModel import AgentBaseModel
-from Simulation.AuxFunctions import dijkstra_search
+from Simulation.IncrementalPlanner import IncrementalPlanner
 
 class AgenteRescuer(AgentBaseModel):
     def __init__(self, model, pa, id, printable=False):
@@ -17,11 +17,15 @@ class AgenteRescuer(AgentBaseModel):
         super().__init__(model, pa, id, printable=printable)
         self.role = "Rescue"
         self.max_pa_savings = 2
+        # Planificador incremental reutilizado entre movimientos mientras no cambien los objetivos
+        self._planner = None
+        self._planner_key = None
 
     def decision_choose_movement(self, possible_steps):
         """
         Determina el movimiento del rescatista. Si carga una víctima, busca la salida; si no, busca POIs.
-        Implementa el algoritmo de Dijkstra para trazar la ruta hacia el objetivo más cercano (POI o Salida), evitando casillas con fuego.
+        Traza la ruta hacia el objetivo más cercano (POI o Salida) evitando casillas con fuego, con un planificador
+        incremental que conserva su búsqueda entre movimientos (mismo resultado que dijkstra_search).
         
         Parámetros:
             possible_steps (list): Lista de movimientos válidos.
@@ -30,9 +34,8 @@ class AgenteRescuer(AgentBaseModel):
         """
         targets = []
         if self.carrying_victim:
-            if hasattr(self.model, 'entryPoints'):
-                for ep in self.model.entryPoints:
-                    targets.append((ep[1], ep[0]))
+            if hasattr(self.model, 'topology'):
+                targets = list(self.model.topology.outside_doors)
         else:
             targets = [(p[1], p[0]) for p in self.model.pois]
         if not targets:
@@ -40,11 +43,30 @@ class AgenteRescuer(AgentBaseModel):
         cx, cy = self.pos
         targets.sort(key=lambda t: abs(t[0] - cx) + abs(t[1] - cy))
         closest_targets = targets[:3]
-        next_step = dijkstra_search(self, closest_targets, avoid_fire=True)
+        next_step = self._plan_step(closest_targets)
         if next_step and next_step in possible_steps:
             return next_step
         return super().decision_choose_movement(possible_steps)
     
+    def _plan_step(self, goals):
+        """
+        Obtiene el siguiente paso hacia los objetivos reutilizando el planificador del movimiento anterior.
+        Solo se reinicia si cambia el conjunto de objetivos o el costo por paso (al cargar o soltar una víctima);
+        los cambios de fuego, paredes y puertas se reparan de forma incremental.
+        
+        Parámetros:
+            goals (list): Celdas objetivo en formato (x, y).
+        Retorna:
+            tuple | None: Siguiente celda del camino, o None si no hay camino.
+        """
+        step_cost = 2 if self.carrying_victim else 1
+        key = (frozenset(goals), step_cost)
+        if self._planner is None or self._planner_key != key or self._planner.model is not self.model:
+            self._planner = IncrementalPlanner(self.model, goals, step_cost=step_cost, avoid_fire=True,
+                                               can_chop=self.decision_chop_wall())
+            self._planner_key = key
+        return self._planner.next_step(self.pos)
+
     def decision_rescue_victim(self):
         """
         Sobrescribe la decisión base. El rescatista siempre recoge a las víctimas encontradas.
@@ -1,28 +1,44 @@
 import os
 import heapq
+import hashlib
 import random
 
 
-def readMap():
+# Plantillas de mapa ya parseadas, indexadas por ruta absoluta -> (mtime, plantilla).
+# Los procesos creados con fork heredan las plantillas ya parseadas por el proceso padre.
+_MAP_TEMPLATES = {}
+
+# Huellas (SHA-256) del contenido de cada mapa, indexadas por ruta absoluta -> (mtime, huella)
+_MAP_FINGERPRINTS = {}
+
+
+def _default_map_path():
     """
-    Lee el archivo de texto 'InitialState.txt', parsea la configuración del entorno y estructura los datos del mapa.
+    Obtiene la ruta absoluta del archivo de estado inicial por defecto.
     
     Parámetros:
         Ninguno.
     Retorna:
-        dict: Diccionario 'mapData' que contiene listas de coordenadas para paredes, POIs, fuego, puertas y entradas.
+        str: Ruta absoluta de 'Data/InitialState.txt'.
     """
     current_dir = os.path.dirname(__file__)
     file_path = os.path.join(current_dir, "..", "Data", "InitialState.txt")
-    file_path = os.path.abspath(file_path)
+    return os.path.abspath(file_path)
 
-    if not os.path.exists(file_path):
-        return None
 
+def _parse_map_file(file_path):
+    """
+    Parsea el archivo de estado inicial a una plantilla inmutable (tuplas) que puede compartirse.
+    
+    Parámetros:
+        file_path (str): Ruta absoluta del archivo a leer.
+    Retorna:
+        dict: Plantilla con tuplas de paredes, POIs, fuego, puertas y entradas.
+    """
     with open(file_path, mode="r") as f:
         text = list(map(lambda x: x.strip(), f.readlines()))
         raw_walls = list(map(lambda x: x.split(" "), text[0:6]))
-        walls = raw_walls 
+        walls = tuple(tuple(row) for row in raw_walls)
 
         def parse_coords(line_list, type_data):
             res = []
@@ -33,99 +49,190 @@ def readMap():
                 y = row_game - 1
                 x = col_game - 1
                 if type_data == 'poi':
-                    res.append([y, x, vals[2]])
+                    res.append((y, x, vals[2]))
                 elif type_data == 'fire' or type_data == 'entry':
-                    res.append([y, x])
+                    res.append((y, x))
                 elif type_data == 'door':
                     row2_game = int(vals[2])
                     col2_game = int(vals[3])
                     y2 = row2_game - 1
                     x2 = col2_game - 1
-                    res.append([(y, x), (y2, x2), 'Closed'])
-            return res
+                    res.append(((y, x), (y2, x2), 'Closed'))
+            return tuple(res)
         pois = parse_coords(text[6:9], 'poi')
         fires = parse_coords(text[9:19], 'fire')
         doors = parse_coords(text[19:27], 'door')
         entryPoints = parse_coords(text[27::], 'entry')
-    mapData = {
+    return {
         'walls': walls,
         'pois': pois,
         'fires': fires,
         'doors': doors,
         'entryPoints': entryPoints
     }
+
+
+def load_map_template(file_path=None):
+    """
+    Obtiene la plantilla parseada del mapa, leyendo el archivo solo si cambió desde la última lectura.
+    La caché se indexa por ruta y fecha de modificación, así que editar el archivo invalida la plantilla.
+    
+    Parámetros:
+        file_path (str): Ruta del archivo de mapa (por defecto 'Data/InitialState.txt').
+    Retorna:
+        dict | None: Plantilla inmutable del mapa, o None si el archivo no existe.
+    """
+    file_path = os.path.abspath(file_path) if file_path else _default_map_path()
+    try:
+        mtime = os.stat(file_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    cached = _MAP_TEMPLATES.get(file_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    template = _parse_map_file(file_path)
+    _MAP_TEMPLATES[file_path] = (mtime, template)
+    return template
+
+
+def map_fingerprint(file_path=None):
+    """
+    Calcula la huella SHA-256 del contenido del archivo de mapa, recalculándola solo si el archivo cambió.
+    Sirve para invalidar resultados guardados cuando se edita el mapa.
+    
+    Parámetros:
+        file_path (str): Ruta del archivo de mapa (por defecto 'Data/InitialState.txt').
+    Retorna:
+        str | None: Huella hexadecimal, o None si el archivo no existe.
+    """
+    file_path = os.path.abspath(file_path) if file_path else _default_map_path()
+    try:
+        mtime = os.stat(file_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    cached = _MAP_FINGERPRINTS.get(file_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(file_path, mode="rb") as f:
+        fingerprint = hashlib.sha256(f.read()).hexdigest()
+    _MAP_FINGERPRINTS[file_path] = (mtime, fingerprint)
+    return fingerprint
+
+
+def readMap(file_path=None):
+    """
+    Obtiene la configuración del entorno a partir del archivo 'InitialState.txt'.
+    El archivo se parsea una sola vez (ver load_map_template); cada llamada regresa una copia
+    estructural barata que el modelo puede modificar sin afectar a la plantilla compartida.
+    
+    Parámetros:
+        file_path (str): Ruta del archivo de mapa (por defecto 'Data/InitialState.txt').
+    Retorna:
+        dict: Diccionario 'mapData' que contiene listas de coordenadas para paredes, POIs, fuego, puertas y entradas.
+    """
+    template = load_map_template(file_path)
+    if template is None:
+        return None
+
+    mapData = {
+        'walls': [list(row) for row in template['walls']],
+        'pois': [list(p) for p in template['pois']],
+        'fires': [list(f) for f in template['fires']],
+        'doors': [list(d) for d in template['doors']],
+        'entryPoints': [list(ep) for ep in template['entryPoints']]
+    }
     return mapData
 
 
-def dijkstra_search(agent, targets, avoid_fire=False):
+def dijkstra_search(agent, targets, avoid_fire=False, heuristic=True):
     """
     Determina el siguiente paso óptimo para alcanzar el objetivo más cercano calculando el camino de menor costo.
-    Implementa el algoritmo de Dijkstra utilizando una cola de prioridad (heapq) para explorar el grafo de la cuadrícula, considerando costos variables por terreno, fuego, humo, ruptura de paredes y apertura de puertas.
+    Implementa A* (Dijkstra guiado por la distancia Manhattan al objetivo más cercano) con una cola de prioridad (heapq),
+    considerando costos variables por terreno, fuego, humo, ruptura de paredes y apertura de puertas.
+    La heurística es consistente y la cola desempata por costo acumulado, posición y primer paso, de modo que el
+    resultado es exactamente el mismo que con Dijkstra: el objetivo de menor costo (empates por la posición menor)
+    y, entre los caminos óptimos hacia él, el primer paso menor.
     
     Parámetros:
         agent (Agent): La instancia del agente que realiza la búsqueda (necesario para verificar habilidades y posición).
         targets (list): Lista de coordenadas objetivo (tuplas) a las que el agente desea llegar.
         avoid_fire (bool): Bandera para asignar un costo prohibitivo a las celdas con fuego.
+        heuristic (bool): Usa la heurística Manhattan (A*); con False se comporta como Dijkstra sin guía.
     Retorna:
         tuple | None: Coordenadas (x, y) del primer paso del camino óptimo encontrado, o None si no hay camino.
     """
     start = agent.pos
-    
-    queue = [(0, start, None)]
-    visited = {}
+    goals = set(targets)
+
+    # Valores constantes durante toda la búsqueda
     can_chop = agent.decision_chop_wall()
+    model = agent.model
+    topology = model.topology
+    step_cost = 2 if agent.carrying_victim else 1
+    wall_cost = 2 if can_chop else 9999
+    fire_cost = 100 if avoid_fire else 1 # Evita el fuego a toda costa / Apaga y pasa
+
+    if not goals:
+        return None
+
+    def estimate(pos):
+        # Cada paso cuesta al menos step_cost y acerca a lo más una casilla al objetivo
+        if not heuristic:
+            return 0
+        px, py = pos
+        return step_cost * min(abs(px - tx) + abs(py - ty) for tx, ty in goals)
+
+    # Mejor (costo, primer paso) conocido por celda: evita encolar entradas dominadas
+    best = {}
+    closed = set()
+    queue = [(estimate(start), 0, start, None)]
     while queue:
-        cost, current, first_step = heapq.heappop(queue)
-        if current in visited and visited[current] <= cost:
+        _, cost, current, first_step = heapq.heappop(queue)
+        if current in closed:
             continue
-        visited[current] = cost
-        if current in targets:
+        closed.add(current)
+        if current in goals:
             return first_step if first_step else current
         cx, cy = current
-        neighbors = agent.model.grid.get_neighborhood(current, moore=False, include_center=False)
-        for next_pos in neighbors:
-            nx, ny = next_pos
-            step_cost = 2 if agent.carrying_victim else 1
+        # Vecinos precalculados con su índice de dirección (0: y+1, 1: x+1, 2: y-1, 3: x-1)
+        for next_pos, wall_dir, _ in topology.steps[current]:
+            if next_pos in closed:
+                continue
             action_cost = 0
-            wall_dir = -1
-            if ny > cy: wall_dir = 0
-            elif nx > cx: wall_dir = 1
-            elif ny < cy: wall_dir = 2
-            elif nx < cx: wall_dir = 3
             
             # PAREDES
-            if agent.model.has_wall(cx, cy, wall_dir):
-                if can_chop:
-                    action_cost += 2
-                else:
-                    action_cost += 9999
+            if model.has_wall(cx, cy, wall_dir):
+                action_cost += wall_cost
             
             # PUERTAS
-            door_idx = agent.model.get_door_index(current, next_pos)
-            if door_idx != -1:
-                if agent.model.doors[door_idx][2] == 'Closed':
-                    action_cost += 1 
+            if model.get_door_status(current, next_pos) == 'Closed':
+                action_cost += 1 
 
             # FUEGO / HUMO
-            cell_status = agent.model.get_cell_status(next_pos)
+            cell_status = model.get_cell_status(next_pos)
             if cell_status == 'Fire':
-                if avoid_fire:
-                    action_cost += 100 # Evita el fuego a toda costa
-                else:
-                    action_cost += 1 # Apaga y pasa
+                action_cost += fire_cost
             elif cell_status == 'Smoke':
                 action_cost += 1
 
             total_step_cost = cost + step_cost + action_cost
             
-            if total_step_cost < 1000: # Solo añadimos si es un camino viable (menor a muro infinito)
-                if next_pos not in visited or total_step_cost < visited[next_pos]:
-                    new_first_step = first_step if first_step else next_pos
-                    heapq.heappush(queue, (total_step_cost, next_pos, new_first_step))
+            if total_step_cost >= 1000: # Solo añadimos si es un camino viable (menor a muro infinito)
+                continue
+            new_first_step = first_step if first_step else next_pos
+            known = best.get(next_pos)
+            if known is not None and (known[0], known[1]) <= (total_step_cost, new_first_step):
+                continue
+            best[next_pos] = (total_step_cost, new_first_step)
+            heapq.heappush(queue, (total_step_cost + estimate(next_pos), total_step_cost, next_pos, new_first_step))
     return None
 
 
-def get_closest_entry_to_pois(entry_points, pois):
+def get_closest_entry_to_pois(entry_points, pois, rng=random):
     """
     Calcula qué punto de entrada es el más cercano a cualquier punto de interés (POI) activo.
     Implementa el algoritmo de Distancia Manhattan para calcular la cercanía entre coordenadas.
@@ -133,13 +240,14 @@ def get_closest_entry_to_pois(entry_points, pois):
     Parámetros:
         entry_points (list): Lista de coordenadas [y, x] de las entradas disponibles.
         pois (list): Lista de POIs activos con formato [y, x, type, ...].
+        rng (random.Random): Generador usado para el desempate aleatorio (por defecto el módulo global).
     Retorna:
         tuple: Coordenadas (x, y) de la entrada más cercana. Si no hay datos, retorna una aleatoria o (0,0).
     """
     if not pois or not entry_points:
         if entry_points:
-            rng = random.choice(entry_points)
-            return (rng[1], rng[0])
+            entry = rng.choice(entry_points)
+            return (entry[1], entry[0])
         return (0, 0)
     best_entry = None
     min_dist = float('inf')
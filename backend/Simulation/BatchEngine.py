@@ -0,0 +1,706 @@
+"""
+Motor por lotes que avanza B partidas independientes de la estrategia 'random' al mismo tiempo.
+
+El estado de todas las partidas vive en arreglos de NumPy: fuego, bordes (paredes/puertas con los bits
+EDGE_* de ExplorerModel) y POIs con forma (B, H, W), y posiciones de agentes con forma (B, N, 2).
+Las partidas avanzan en lockstep: en cada ronda se recorre el turno de cada agente y cada una de sus
+posibles acciones, resolviendo a la vez todas las partidas que siguen activas, y después la fase de
+fuego completa (dados, explosiones, flashover, barrido de POIs y reposición) para todas ellas.
+
+Las reglas son las de ExplorerModel/AgentBaseModel, incluidos sus detalles (la pared que consulta un
+agente usa su índice de dirección, la entrada a la ambulancia se revisa al inicio de cada turno,
+model.steps avanza 2 por ronda completa). Las decisiones aleatorias salen de un generador basado en
+contador: cada sorteo depende solo de la semilla de la partida y de su posición en el turno, así que una
+partida da el mismo resultado sin importar con qué otras partidas se agrupe. El generador es distinto al
+de Mesa, por lo que una semilla no produce la misma partida que en Simulation (que sigue siendo la
+referencia); las estadísticas de ambos motores sí coinciden.
+"""
+import numpy as np
+from Simulation.AuxFunctions import load_map_template
+from Simulation.Topology import get_topology
+from Simulation.FireEngine import flashover_mask, burning_mask
+
+# Desplazamiento de cada familia de bits por celda (ver EDGE_* en ExplorerModel)
+_DOOR_SHIFT = 4
+_OPEN_SHIFT = 8
+_DAMAGED_SHIFT = 12
+
+# Desplazamiento (dx, dy) de cada dirección de borde: 0=Arriba, 1=Izquierda, 2=Abajo, 3=Derecha
+_OFFSET_X = np.array([0, -1, 0, 1])
+_OFFSET_Y = np.array([-1, 0, 1, 0])
+
+# Tipos de POI en poi_grid
+POI_NONE = 0
+POI_FALSE_ALARM = 1
+POI_VICTIM = 2
+
+# Razones de fin de partida (mismos nombres que Simulation.end_reason)
+END_REASONS = ("NOT_FINISHED", "WIN", "LOSS_VICTIMS", "LOSS_COLLAPSE")
+
+# Sorteos por acción: vecino elegido, primera decisión (romper/abrir/extinguir/revelar)
+# y segunda decisión (extinguir por completo/rescatar)
+_DRAWS_PER_ACTION = 3
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_INIT_DOMAIN = np.uint64(1 << 62)
+
+
+def _mix64(z):
+    """
+    Función de mezcla de splitmix64 aplicada elemento a elemento.
+
+    Parámetros:
+        z (numpy.ndarray): Valores uint64.
+    Retorna:
+        numpy.ndarray: Valores uint64 mezclados.
+    """
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class BatchRandomEngine:
+    """
+    Ejecuta un lote de partidas con estrategia 'random' en lockstep sobre arreglos (B, H, W).
+    """
+
+    def __init__(self, width, height, agents, pa, seeds):
+        """
+        Prepara el estado inicial de todas las partidas del lote.
+
+        Parámetros:
+            width (int): Ancho del grid de simulación
+            height (int): Alto del grid de simulación
+            agents (int): Número de agentes por partida
+            pa (int): Puntos de acción de cada agente
+            seeds (list): Semilla de cada partida (una partida por semilla)
+        """
+        template = load_map_template()
+        if template is None:
+            raise Exception("Error leyendo InitialState.txt")
+        if len(template['walls']) != height or len(template['walls'][0]) != width:
+            raise ValueError("El motor por lotes requiere que el grid tenga el tamaño del mapa")
+
+        self.width = width
+        self.height = height
+        self.agents = agents
+        self.total_pa = pa
+        # Igual que AgentBaseModel: se pueden ahorrar hasta 4 PA, y cada acción cuesta al menos 1
+        self.max_pa = pa + 4
+        self.max_actions = self.max_pa
+        self.seeds = [int(s) for s in seeds]
+        B = len(self.seeds)
+        self.size = B
+
+        self._build_tables(get_topology(width, height, template['entryPoints']))
+        # Sorteos reservados por ronda y por turno (agentes 0..N-1 y fase de fuego N)
+        self._stride = max(self.max_actions * _DRAWS_PER_ACTION + 1, 2 + 5 * agents + 6)
+
+        with np.errstate(over='ignore'):
+            self._keys = _mix64(np.array(self.seeds, dtype=np.int64).astype(np.uint64) * _GOLDEN)
+
+        edges = np.zeros((height, width), dtype=np.uint16)
+        for y, row in enumerate(template['walls']):
+            for x, cell in enumerate(row):
+                for d, c in enumerate(cell):
+                    if c != '0':
+                        edges[y, x] |= 1 << d
+        for (y1, x1), (y2, x2), status in template['doors']:
+            for (ax, ay), (bx, by) in (((x1, y1), (x2, y2)), ((x2, y2), (x1, y1))):
+                d = self._edge_direction(ax, ay, bx, by)
+                if d == -1 or not (0 <= ax < width and 0 <= ay < height):
+                    continue
+                edges[ay, ax] |= 1 << (_DOOR_SHIFT + d)
+                if status != 'Closed':
+                    edges[ay, ax] |= 1 << (_OPEN_SHIFT + d)
+        fire = np.zeros((height, width), dtype=np.int8)
+        for y, x in template['fires']:
+            fire[y, x] = 2
+        poi = np.zeros((height, width), dtype=np.int8)
+        for y, x, ptype in template['pois']:
+            if not poi[y, x]:
+                poi[y, x] = POI_VICTIM if ptype in ('v', 'Victim') else POI_FALSE_ALARM
+
+        self.edge_grid = np.repeat(edges[None], B, axis=0)
+        self.fire_grid = np.repeat(fire[None], B, axis=0)
+        self.poi_grid = np.repeat(poi[None], B, axis=0)
+        self.positions = np.zeros((B, agents, 2), dtype=np.int64)
+        self.carrying = np.zeros((B, agents), dtype=bool)
+        self.pa = np.zeros((B, agents), dtype=np.int64)
+        self.movements = np.zeros((B, agents), dtype=np.int64)
+        self.victims_saved = np.zeros(B, dtype=np.int64)
+        self.victims_lost = np.zeros(B, dtype=np.int64)
+        self.damage_taken = np.zeros(B, dtype=np.int64)
+        self.steps = np.zeros(B, dtype=np.int64)
+        self.running = np.ones(B, dtype=bool)
+        self.rounds = 0
+
+        every = np.arange(B)
+        self._replenish(every, _INIT_DOMAIN)
+        self._place_agents(every)
+
+    @staticmethod
+    def _edge_direction(x1, y1, x2, y2):
+        """
+        Dirección del borde entre dos celdas adyacentes (0=Arriba, 1=Izquierda, 2=Abajo, 3=Derecha).
+
+        Retorna:
+            int: Dirección, o -1 si no son adyacentes.
+        """
+        dx, dy = x2 - x1, y2 - y1
+        for d in range(4):
+            if _OFFSET_X[d] == dx and _OFFSET_Y[d] == dy:
+                return d
+        return -1
+
+    def _build_tables(self, topology):
+        """
+        Convierte las tablas de la topología en arreglos indexables por (y, x).
+
+        Parámetros:
+            topology (Topology): Geometría estática del mapa.
+        """
+        H, W = self.height, self.width
+        self._nb_count = np.zeros((H, W), dtype=np.int64)
+        self._nb_x = np.zeros((H, W, 4), dtype=np.int64)
+        self._nb_y = np.zeros((H, W, 4), dtype=np.int64)
+        self._nb_agent_dir = np.zeros((H, W, 4), dtype=np.int64)
+        self._nb_edge_dir = np.zeros((H, W, 4), dtype=np.int64)
+        for (x, y), steps in topology.steps.items():
+            self._nb_count[y, x] = len(steps)
+            for k, ((nx, ny), agent_dir, edge_dir) in enumerate(steps):
+                self._nb_x[y, x, k] = nx
+                self._nb_y[y, x, k] = ny
+                self._nb_agent_dir[y, x, k] = agent_dir
+                self._nb_edge_dir[y, x, k] = edge_dir
+
+        self._spawn_x = np.array([p[0] for p in topology.spawn_perimeter])
+        self._spawn_y = np.array([p[1] for p in topology.spawn_perimeter])
+        self._respawn_x = np.array([p[0] for p in topology.respawn_perimeter])
+        self._respawn_y = np.array([p[1] for p in topology.respawn_perimeter])
+        self._entry = np.zeros((H, W), dtype=bool)
+        for x, y in topology.outside_doors:
+            if 0 <= x < W and 0 <= y < H:
+                self._entry[y, x] = True
+        self._border = np.zeros((H, W), dtype=bool)
+        self._border[0, :] = self._border[-1, :] = True
+        self._border[:, 0] = self._border[:, -1] = True
+
+    # --- ALEATORIEDAD ---
+    def _uniforms(self, games, counter, count):
+        """
+        Sorteos uniformes en [0, 1) para varias partidas a partir de su semilla y un contador.
+
+        Parámetros:
+            games (numpy.ndarray): Índices de las partidas.
+            counter (int | numpy.uint64): Posición del primer sorteo.
+            count (int): Número de sorteos consecutivos por partida.
+        Retorna:
+            numpy.ndarray: Arreglo (len(games), count) de flotantes.
+        """
+        with np.errstate(over='ignore'):
+            offsets = (np.uint64(counter) + np.arange(count, dtype=np.uint64)) * _GOLDEN
+            bits = _mix64(self._keys[games][:, None] + offsets[None, :])
+        return (bits >> np.uint64(11)) * (1.0 / (1 << 53))
+
+    def _counter(self, round_index, slot):
+        """
+        Posición del primer sorteo reservado para un turno (slot = agente, o N para la fase de fuego).
+
+        Retorna:
+            int: Contador base.
+        """
+        return (round_index * (self.agents + 1) + slot) * self._stride
+
+    @staticmethod
+    def _pick(mask, u):
+        """
+        Elige uniformemente una columna verdadera de cada fila de una máscara (como random.choice).
+
+        Parámetros:
+            mask (numpy.ndarray): Máscara booleana (n, k) de opciones válidas, en el orden de la lista original.
+            u (numpy.ndarray): Sorteo uniforme por fila.
+        Retorna:
+            tuple: (índice elegido por fila, máscara de filas que tenían al menos una opción)
+        """
+        counts = mask.sum(axis=1)
+        chosen = (u * counts).astype(np.int64)
+        index = np.argmax(np.cumsum(mask, axis=1) > chosen[:, None], axis=1)
+        return index, counts > 0
+
+    # --- ESTADO INICIAL ---
+    def _place_agents(self, games):
+        """
+        Despliega los agentes en posiciones aleatorias del perímetro (perímetro barajado, como en
+        ExplorerModel._place_random_agents).
+
+        Parámetros:
+            games (numpy.ndarray): Índices de las partidas.
+        """
+        perimeter = len(self._spawn_x)
+        keys = self._uniforms(games, _INIT_DOMAIN + np.uint64(6), perimeter)
+        order = np.argsort(keys, axis=1)
+        slots = np.arange(self.agents) % perimeter
+        chosen = order[:, slots]
+        self.positions[games, :, 0] = self._spawn_x[chosen]
+        self.positions[games, :, 1] = self._spawn_y[chosen]
+
+    # --- CAMBIOS DE BORDES ---
+    def _clear_walls(self, games, xs, ys, dirs):
+        """
+        Quita la pared de un lado de cada celda indicada, marcándolo como dañado si existía.
+
+        Parámetros:
+            games (numpy.ndarray): Índices de las partidas.
+            xs (numpy.ndarray): Coordenadas x.
+            ys (numpy.ndarray): Coordenadas y.
+            dirs (numpy.ndarray): Dirección del lado (0-3).
+        """
+        mask = self.edge_grid[games, ys, xs].astype(np.int64)
+        wall = (mask >> dirs) & 1
+        cleared = (mask & ~(1 << dirs)) | (1 << (_DAMAGED_SHIFT + dirs))
+        self.edge_grid[games, ys, xs] = np.where(wall == 1, cleared, mask)
+
+    def _remove_walls(self, games, xs, ys, dirs):
+        """
+        Equivalente vectorizado de ExplorerModel.remove_wall: limpia el lado indicado y su contraparte.
+
+        Parámetros:
+            games (numpy.ndarray): Índices de las partidas.
+            xs (numpy.ndarray): Coordenadas x.
+            ys (numpy.ndarray): Coordenadas y.
+            dirs (numpy.ndarray): Dirección de la pared (0-3).
+        """
+        self._clear_walls(games, xs, ys, dirs)
+        nx = xs + _OFFSET_X[dirs]
+        ny = ys + _OFFSET_Y[dirs]
+        inside = (nx >= 0) & (nx < self.width) & (ny >= 0) & (ny < self.height)
+        self._clear_walls(games[inside], nx[inside], ny[inside], (dirs[inside] + 2) % 4)
+
+    def _set_door_bits(self, games, xs, ys, dirs, shift, value):
+        """
+        Enciende o apaga un bit de puerta en ambos lados del borde (celda y vecina en la dirección dada).
+
+        Parámetros:
+            games (numpy.ndarray): Índices de las partidas.
+            xs (numpy.ndarray): Coordenadas x.
+            ys (numpy.ndarray): Coordenadas y.
+            dirs (numpy.ndarray): Dirección del borde (0-3).
+            shift (int): _DOOR_SHIFT o _OPEN_SHIFT.
+            value (bool): True para encender, False para apagar.
+        """
+        nx = xs + _OFFSET_X[dirs]
+        ny = ys + _OFFSET_Y[dirs]
+        for gx, gy, gd in ((xs, ys, dirs), (nx, ny, (dirs + 2) % 4)):
+            mask = self.edge_grid[games, gy, gx].astype(np.int64)
+            bit = 1 << (shift + gd)
+            self.edge_grid[games, gy, gx] = (mask | bit) if value else (mask & ~bit)
+
+    # --- AGENTES ---
+    def _send_to_ambulance(self, games, agent, counter):
+        """
+        Reaparece a un agente herido en un punto aleatorio del perímetro sin fuego (estrategia 'random');
+        la víctima que cargaba se pierde.
+
+        Parámetros:
+            games (numpy.ndarray): Índices de las partidas.
+            agent (int): Índice del agente.
+            counter (int): Posición del sorteo.
+        """
+        if not games.size:
+            return
+        carrying = self.carrying[games, agent]
+        self.victims_lost[games[carrying]] += 1
+        self.carrying[games, agent] = False
+
+        safe = self.fire_grid[games[:, None], self._respawn_y[None, :], self._respawn_x[None, :]] != 2
+        index, found = self._pick(safe, self._uniforms(games, counter, 1)[:, 0])
+        self.positions[games, agent, 0] = np.where(found, self._respawn_x[index], 0)
+        self.positions[games, agent, 1] = np.where(found, self._respawn_y[index], 0)
+
+    def _rescue_at_entry(self, games, agent):
+        """
+        Cuenta como salvada la víctima de un agente que inicia su turno en una entrada (como ExplorerModel.step).
+
+        Parámetros:
+            games (numpy.ndarray): Índices de las partidas.
+            agent (int): Índice del agente.
+        """
+        x = self.positions[games, agent, 0]
+        y = self.positions[games, agent, 1]
+        saved = self.carrying[games, agent] & self._entry[y, x]
+        self.carrying[games[saved], agent] = False
+        self.victims_saved[games[saved]] += 1
+
+    def _act(self, games, agent, u):
+        """
+        Ejecuta una acción del agente en cada partida (AgentBaseModel.step + attempt_action).
+
+        Parámetros:
+            games (numpy.ndarray): Partidas en las que el agente sigue actuando.
+            agent (int): Índice del agente.
+            u (numpy.ndarray): Sorteos (len(games), _DRAWS_PER_ACTION).
+        Retorna:
+            numpy.ndarray: Partidas en las que el agente puede seguir actuando.
+        """
+        x = self.positions[games, agent, 0]
+        y = self.positions[games, agent, 1]
+        k = (u[:, 0] * self._nb_count[y, x]).astype(np.int64)
+        tx = self._nb_x[y, x, k]
+        ty = self._nb_y[y, x, k]
+        agent_dir = self._nb_agent_dir[y, x, k]
+        edge_dir = self._nb_edge_dir[y, x, k]
+
+        mask = self.edge_grid[games, y, x].astype(np.int64)
+        # Igual que AgentBaseModel, la pared se consulta con el índice de dirección del agente
+        wall = ((mask >> agent_dir) & 1) == 1
+        door = ((mask >> (_DOOR_SHIFT + edge_dir)) & 1) == 1
+        closed = door & (((mask >> (_OPEN_SHIFT + edge_dir)) & 1) == 0)
+        status = self.fire_grid[games, ty, tx]
+        carrying = self.carrying[games, agent]
+        pa = self.pa[games, agent]
+
+        # predict_action_cost
+        cost = np.where(wall, 2, np.where(closed, 1, np.where(status > 0, 1, 1 + carrying)))
+        able = pa >= cost
+        first = u[:, 1] < 0.5
+        second = u[:, 2] < 0.5
+        taken = np.zeros(games.size, dtype=bool)
+
+        # 1. Pared: romperla (-2 PA, +1 daño)
+        chop = able & wall & first
+        if chop.any():
+            self._remove_walls(games[chop], x[chop], y[chop], agent_dir[chop])
+            self.damage_taken[games[chop]] += 1
+            pa[chop] -= 2
+            taken |= chop
+
+        # 1.1 Puerta cerrada: abrirla (-1 PA)
+        free = able & ~wall
+        open_door = free & closed & first
+        if open_door.any():
+            self._set_door_bits(games[open_door], x[open_door], y[open_door], edge_dir[open_door], _OPEN_SHIFT, True)
+            pa[open_door] -= 1
+            taken |= open_door
+
+        # 2. Fuego: extinguir por completo (-2 PA) o convertir a humo (-1 PA); humo: quitarlo (-1 PA)
+        free &= ~closed
+        fire = free & (status == 2) & first
+        if fire.any():
+            complete = fire & second & (pa >= 2)
+            partial = fire & ~complete
+            self.fire_grid[games[complete], ty[complete], tx[complete]] = 0
+            self.fire_grid[games[partial], ty[partial], tx[partial]] = 1
+            pa[complete] -= 2
+            pa[partial] -= 1
+            taken |= fire
+        smoke = free & (status == 1) & first
+        if smoke.any():
+            self.fire_grid[games[smoke], ty[smoke], tx[smoke]] = 0
+            pa[smoke] -= 1
+            taken |= smoke
+
+        # 3. Movimiento (can_move revisa la pared con la dirección real del borde)
+        move = free & (status == 0) & (((mask >> edge_dir) & 1) == 0)
+        if move.any():
+            moved = games[move]
+            mx, my = tx[move], ty[move]
+            self.positions[moved, agent, 0] = mx
+            self.positions[moved, agent, 1] = my
+            pa[move] -= 1 + carrying[move]
+            self.movements[moved, agent] += 1
+
+            # Salvamento al llegar al borde con una víctima
+            now_carrying = carrying[move].copy()
+            rescued = now_carrying & self._border[my, mx]
+            self.victims_saved[moved[rescued]] += 1
+            now_carrying &= ~rescued
+
+            # POI: revelar; las falsas alarmas se eliminan y las víctimas pueden recogerse
+            poi = self.poi_grid[moved, my, mx]
+            reveal = (poi != POI_NONE) & first[move]
+            false_alarm = reveal & (poi == POI_FALSE_ALARM)
+            pick_up = reveal & (poi == POI_VICTIM) & ~now_carrying & second[move]
+            cleared = false_alarm | pick_up
+            self.poi_grid[moved[cleared], my[cleared], mx[cleared]] = POI_NONE
+            now_carrying |= pick_up
+            self.carrying[moved, agent] = now_carrying
+            taken |= move
+
+        self.pa[games, agent] = pa
+        return games[taken & (pa > 0)]
+
+    def _agent_turn(self, games, agent, round_index):
+        """
+        Turno completo de un agente en varias partidas: recarga PA, actúa hasta agotarlos o no poder
+        y, si termina sobre fuego, es enviado a la ambulancia.
+
+        Parámetros:
+            games (numpy.ndarray): Índices de las partidas.
+            agent (int): Índice del agente.
+            round_index (int): Número de ronda.
+        """
+        self.pa[games, agent] = np.minimum(self.pa[games, agent] + self.total_pa, self.max_pa)
+        base = self._counter(round_index, agent)
+        acting = games[self.pa[games, agent] > 0]
+        for action in range(self.max_actions):
+            if not acting.size:
+                break
+            acting = self._act(acting, agent, self._uniforms(acting, base + action * _DRAWS_PER_ACTION,
+                                                             _DRAWS_PER_ACTION))
+
+        x = self.positions[games, agent, 0]
+        y = self.positions[games, agent, 1]
+        burning = self.fire_grid[games, y, x] == 2
+        self._send_to_ambulance(games[burning], agent, base + self.max_actions * _DRAWS_PER_ACTION)
+
+    # --- FUEGO ---
+    def _ignite(self, games, xs, ys, counter):
+        """
+        Enciende fuego en una celda de cada partida (add_fire_or_smoke con intensidad 2): primero envía
+        a la ambulancia a los agentes que estén ahí.
+
+        Parámetros:
+            games (numpy.ndarray): Índices de las partidas.
+            xs (numpy.ndarray): Coordenadas x.
+            ys (numpy.ndarray): Coordenadas y.
+            counter (int): Posición del primer sorteo (uno por agente).
+        """
+        if not games.size:
+            return
+        for agent in range(self.agents):
+            here = (self.positions[games, agent, 0] == xs) & (self.positions[games, agent, 1] == ys)
+            if here.any():
+                self._send_to_ambulance(games[here], agent, counter + agent)
+        self.fire_grid[games, ys, xs] = 2
+
+    def _explode(self, games, cx, cy, counter):
+        """
+        Resuelve explosiones (ExplorerModel.resolve_explosion) avanzando el rayo de cada dirección
+        en todas las partidas a la vez.
+
+        Parámetros:
+            games (numpy.ndarray): Índices de las partidas.
+            cx (numpy.ndarray): Coordenada x del centro.
+            cy (numpy.ndarray): Coordenada y del centro.
+            counter (int): Posición del primer sorteo de las explosiones.
+        """
+        for d in range(4):
+            dx, dy = _OFFSET_X[d], _OFFSET_Y[d]
+            rays = np.arange(games.size)
+            dist = 1
+            while rays.size:
+                nx = cx[rays] + dx * dist
+                ny = cy[rays] + dy * dist
+                inside = (nx >= 0) & (nx < self.width) & (ny >= 0) & (ny < self.height)
+                rays, nx, ny = rays[inside], nx[inside], ny[inside]
+                if not rays.size:
+                    break
+                px, py = nx - dx, ny - dy
+                ray_games = games[rays]
+                mask = self.edge_grid[ray_games, py, px].astype(np.int64)
+
+                # Pared: se destruye (+1 daño) y el rayo se detiene
+                wall = ((mask >> d) & 1) == 1
+                if wall.any():
+                    self._remove_walls(ray_games[wall], px[wall], py[wall], np.full(wall.sum(), d))
+                    self.damage_taken[ray_games[wall]] += 1
+
+                # Puerta cerrada: se destruye y el rayo se detiene
+                closed = ~wall & (((mask >> (_DOOR_SHIFT + d)) & 1) == 1) & (((mask >> (_OPEN_SHIFT + d)) & 1) == 0)
+                if closed.any():
+                    dirs = np.full(closed.sum(), d)
+                    for shift in (_DOOR_SHIFT, _OPEN_SHIFT):
+                        self._set_door_bits(ray_games[closed], px[closed], py[closed], dirs, shift, False)
+
+                # Celda sin fuego: se enciende y el rayo se detiene; con fuego, el rayo continúa
+                passing = ~wall & ~closed
+                burning = self.fire_grid[ray_games, ny, nx] == 2
+                ignite = passing & ~burning
+                self._ignite(ray_games[ignite], nx[ignite], ny[ignite], counter + d * self.agents)
+                rays = rays[passing & burning]
+                dist += 1
+
+    def _advance_fire(self, games, round_index):
+        """
+        Fase de fuego de una ronda: tirada de dados, humo/fuego/explosión, flashover hasta el punto fijo
+        y barrido de POIs en fuego.
+
+        Parámetros:
+            games (numpy.ndarray): Índices de las partidas activas.
+            round_index (int): Número de ronda.
+        """
+        base = self._counter(round_index, self.agents)
+        dice = self._uniforms(games, base, 2)
+        x = (dice[:, 1] * 8).astype(np.int64)
+        y = self.height - 1 - (dice[:, 0] * 6).astype(np.int64)
+        status = self.fire_grid[games, y, x]
+
+        # Vacía: humo, o fuego directamente si hay fuego adyacente
+        empty = status == 0
+        near_fire = np.zeros(games.size, dtype=bool)
+        count = self._nb_count[y, x]
+        for k in range(4):
+            valid = count > k
+            near_fire |= valid & (self.fire_grid[games, self._nb_y[y, x, k], self._nb_x[y, x, k]] == 2)
+        smoke = empty & ~near_fire
+        self.fire_grid[games[smoke], y[smoke], x[smoke]] = 1
+        ignite = (empty & near_fire) | (status == 1)
+        self._ignite(games[ignite], x[ignite], y[ignite], base + 2 + 4 * self.agents)
+
+        # Fuego: explosión
+        explode = status == 2
+        if explode.any():
+            self._explode(games[explode], x[explode], y[explode], base + 2)
+
+        fire = self.fire_grid[games]
+        fire[flashover_mask(fire)] = 2
+        self.fire_grid[games] = fire
+
+        poi = self.poi_grid[games]
+        burned = burning_mask(fire, poi != POI_NONE)
+        self.victims_lost[games] += (burned & (poi == POI_VICTIM)).sum(axis=(1, 2))
+        poi[burned] = POI_NONE
+        self.poi_grid[games] = poi
+
+        self._replenish(games, base + 2 + 5 * self.agents)
+
+    def _replenish(self, games, counter):
+        """
+        Repone POIs hasta tener 3 situaciones activas (POIs en el mapa + víctimas cargadas),
+        eligiendo celdas sin fuego ni POI en el mismo orden que ExplorerModel.replenish_pois.
+
+        Parámetros:
+            games (numpy.ndarray): Índices de las partidas.
+            counter (int | numpy.uint64): Posición del primer sorteo (dos por POI repuesto).
+        """
+        active = (self.poi_grid[games] != POI_NONE).sum(axis=(1, 2)) + self.carrying[games].sum(axis=1)
+        for slot in range(3):
+            pending = games[active + slot < 3]
+            if not pending.size:
+                break
+            # Celdas válidas recorridas columna por columna (x externo, y interno)
+            valid = (self.fire_grid[pending] != 2) & (self.poi_grid[pending] == POI_NONE)
+            valid = valid.transpose(0, 2, 1).reshape(pending.size, -1)
+            u = self._uniforms(pending, np.uint64(counter) + np.uint64(2 * slot), 2)
+            index, found = self._pick(valid, u[:, 0])
+            pending, index, u = pending[found], index[found], u[found]
+            ptype = np.where(u[:, 1] > 0.5, POI_VICTIM, POI_FALSE_ALARM)
+            self.poi_grid[pending, index % self.height, index // self.height] = ptype
+
+    # --- CICLO PRINCIPAL ---
+    def _game_over(self, games):
+        """
+        Condiciones de fin de partida de ExplorerModel.check_game_over.
+
+        Parámetros:
+            games (numpy.ndarray): Índices de las partidas.
+        Retorna:
+            numpy.ndarray: Máscara de partidas terminadas.
+        """
+        return ((self.victims_saved[games] >= 7) | (self.victims_lost[games] >= 4)
+                | (self.damage_taken[games] >= 24))
+
+    def step(self):
+        """
+        Avanza una ronda en todas las partidas activas (equivalente a ExplorerModel.step).
+
+        Retorna:
+            int: Número de partidas que siguen activas.
+        """
+        games = np.nonzero(self.running)[0]
+        # Mesa suma un paso al llamar a step; el modelo suma otro al completar la fase de fuego
+        self.steps[games] += 1
+        for agent in range(self.agents):
+            if not games.size:
+                break
+            self._rescue_at_entry(games, agent)
+            self._agent_turn(games, agent, self.rounds)
+            over = self._game_over(games)
+            if over.any():
+                ended = games[over]
+                # El siguiente agente alcanza a revisar su entrada antes de que el ciclo se detenga
+                if agent + 1 < self.agents:
+                    self._rescue_at_entry(ended, agent + 1)
+                self.running[ended] = False
+                games = games[~over]
+
+        if games.size:
+            self._advance_fire(games, self.rounds)
+            self.running[games[self._game_over(games)]] = False
+            self.steps[games] += 1
+        self.rounds += 1
+        return int(self.running.sum())
+
+    def run(self):
+        """
+        Ejecuta todas las partidas del lote hasta que terminen.
+
+        Retorna:
+            list: Métricas de cada partida en el formato de SimulationManager (sin 'id').
+        """
+        while self.step():
+            pass
+        return self.results()
+
+    def results(self):
+        """
+        Métricas de cada partida con los mismos campos y puntajes que Simulation.
+
+        Retorna:
+            list: Diccionarios con seed, score, end_reason, steps, damage, saved y total_distance.
+        """
+        results = []
+        for b, seed in enumerate(self.seeds):
+            saved = int(self.victims_saved[b])
+            lost = int(self.victims_lost[b])
+            damage = int(self.damage_taken[b])
+            steps = int(self.steps[b])
+            if self.running[b]:
+                end_reason = "NOT_FINISHED"
+            elif saved >= 7:
+                end_reason = "WIN"
+            elif lost >= 4:
+                end_reason = "LOSS_VICTIMS"
+            else:
+                end_reason = "LOSS_COLLAPSE"
+            # Mismos pesos que Simulation.calculate_final_score
+            score = saved * 100 + lost * -50 + damage * -10 + steps * -0.5
+            if end_reason == "WIN":
+                score += 200
+            results.append({
+                "seed": seed,
+                "score": score,
+                "end_reason": end_reason,
+                "steps": steps,
+                "damage": damage,
+                "saved": saved,
+                "total_distance": int(self.movements[b].sum()),
+            })
+        return results
+
+
+def run_random_batch(width, height, agents, pa, seeds, batch_size=10000, progress_callback=None):
+    """
+    Ejecuta partidas 'random' con el motor por lotes, en grupos de hasta batch_size partidas.
+
+    Parámetros:
+        width (int): Ancho del grid de simulación
+        height (int): Alto del grid de simulación
+        agents (int): Número de agentes por partida
+        pa (int): Puntos de acción de cada agente
+        seeds (list): Semilla de cada partida
+        batch_size (int): Máximo de partidas simultáneas (limita la memoria)
+        progress_callback (function): Función llamada como progress_callback(completadas, total) tras cada grupo
+
+    Retorna:
+        list: Métricas de cada partida, en el orden de seeds.
+    """
+    seeds = list(seeds)
+    results = []
+    for start in range(0, len(seeds), batch_size):
+        engine = BatchRandomEngine(width, height, agents, pa, seeds[start:start + batch_size])
+        results.extend(engine.run())
+        if progress_callback:
+            progress_callback(len(results), len(seeds))
+    return results
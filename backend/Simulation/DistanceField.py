@@ -0,0 +1,162 @@
+"""
+Campos de distancia multi-origen compartidos entre agentes.
+
+En lugar de lanzar un Dijkstra desde cada agente hacia todos sus objetivos, se lanza un único
+Dijkstra inverso desde todos los objetivos a la vez. El campo guarda, para cada celda ya fijada,
+la distancia al objetivo más cercano y el primer paso a tomar, de modo que mientras el mundo no
+cambie elegir movimiento es una consulta a lo ya calculado.
+
+El paso elegido es exactamente el mismo que regresa dijkstra_search: el objetivo de menor costo
+(empates por la posición menor) y, entre los caminos óptimos hacia él, el primer paso menor.
+"""
+import heapq
+
+# Costo a partir del cual un camino se considera inviable (igual que en dijkstra_search)
+MAX_PATH_COST = 1000
+
+
+def edge_cost(model, current, next_pos, wall_dir, step_cost=1, avoid_fire=False, can_chop=True):
+    """
+    Calcula el costo de avanzar de una celda a una adyacente con las mismas reglas que dijkstra_search.
+
+    Parámetros:
+        model (ExplorerModel): Modelo con el estado del mundo.
+        current (tuple): Celda origen (x, y).
+        next_pos (tuple): Celda destino (x, y).
+        wall_dir (int): Índice de dirección del movimiento (convención de dijkstra_search).
+        step_cost (int): Costo base del movimiento (2 si el agente carga una víctima).
+        avoid_fire (bool): Asigna un costo prohibitivo a las celdas con fuego.
+        can_chop (bool): Indica si el agente puede romper paredes.
+    Retorna:
+        int: Costo total del movimiento.
+    """
+    action_cost = 0
+
+    # PAREDES
+    if model.has_wall(current[0], current[1], wall_dir):
+        action_cost += 2 if can_chop else 9999
+
+    # PUERTAS
+    if model.get_door_status(current, next_pos) == 'Closed':
+        action_cost += 1
+
+    # FUEGO / HUMO
+    cell_status = model.get_cell_status(next_pos)
+    if cell_status == 'Fire':
+        action_cost += 100 if avoid_fire else 1
+    elif cell_status == 'Smoke':
+        action_cost += 1
+
+    return step_cost + action_cost
+
+
+class DistanceField:
+    """
+    Distancias al objetivo más cercano y primer paso óptimo de cada celda para un conjunto de objetivos.
+    La búsqueda inversa avanza de forma perezosa: solo se expande hasta fijar las celdas consultadas,
+    y lo ya calculado se reutiliza en las consultas siguientes.
+    """
+
+    def __init__(self, model, targets, step_cost=1, avoid_fire=False, can_chop=True):
+        """
+        Prepara el Dijkstra inverso multi-origen desde los objetivos.
+
+        Parámetros:
+            model (ExplorerModel): Modelo con el estado del mundo (usa model.topology).
+            targets (list): Celdas objetivo en formato (x, y).
+            step_cost (int): Costo base del movimiento.
+            avoid_fire (bool): Asigna un costo prohibitivo a las celdas con fuego.
+            can_chop (bool): Indica si el agente puede romper paredes.
+        """
+        self.model = model
+        self.step_cost = step_cost
+        self.avoid_fire = avoid_fire
+        self.can_chop = can_chop
+        self._reverse_steps = model.topology.reverse_steps
+        self._neighbors = model.topology.neighbors
+
+        # distance: distancia tentativa (definitiva para las celdas en _done)
+        self.distance = {}
+        self._done = set()
+        self._costs = {}
+        self._target = {}
+        self._next_step = {}
+        self._queue = []
+        for t in targets:
+            if t not in self.distance:
+                self.distance[t] = 0
+                self._queue.append((0, t))
+        heapq.heapify(self._queue)
+
+    def _settle_until(self, pos):
+        """
+        Avanza el Dijkstra inverso hasta fijar la distancia de 'pos' (o agotar la cola).
+        Al fijar 'pos' quedan fijadas también todas las celdas más cercanas a los objetivos.
+
+        Parámetros:
+            pos (tuple): Celda cuya distancia se necesita (x, y).
+        """
+        model = self.model
+        queue = self._queue
+        done = self._done
+        distance = self.distance
+        costs = self._costs
+        while pos not in done and queue:
+            dist, v = heapq.heappop(queue)
+            if v in done:
+                continue
+            done.add(v)
+            # Relaja las aristas u -> v que entran a la celda recién fijada
+            for u, wall_dir, _ in self._reverse_steps[v]:
+                if u in done:
+                    continue
+                cost = edge_cost(model, u, v, wall_dir, self.step_cost, self.avoid_fire, self.can_chop)
+                costs[(u, v)] = cost
+                new_dist = dist + cost
+                if new_dist < MAX_PATH_COST and new_dist < distance.get(u, MAX_PATH_COST):
+                    distance[u] = new_dist
+                    heapq.heappush(queue, (new_dist, u))
+
+    def _resolve(self, u):
+        """
+        Calcula el objetivo preferido y el primer paso de una celda ya fijada,
+        con los mismos desempates que dijkstra_search (objetivo menor y, después, paso menor).
+
+        Parámetros:
+            u (tuple): Celda fijada (x, y).
+        Retorna:
+            tuple: (objetivo, primer paso)
+        """
+        if u in self._target:
+            return self._target[u], self._next_step[u]
+        dist = self.distance[u]
+        if dist == 0:
+            best_target, best_step = u, u
+        else:
+            best_target = None
+            best_step = None
+            for v in self._neighbors[u]:
+                cost = self._costs.get((u, v))
+                if cost is None or v not in self._done or cost + self.distance[v] != dist:
+                    continue
+                t = self._resolve(v)[0]
+                if best_target is None or t < best_target or (t == best_target and v < best_step):
+                    best_target = t
+                    best_step = v
+        self._target[u] = best_target
+        self._next_step[u] = best_step
+        return best_target, best_step
+
+    def step_from(self, pos):
+        """
+        Obtiene el primer paso óptimo desde una celda.
+
+        Parámetros:
+            pos (tuple): Celda de partida (x, y).
+        Retorna:
+            tuple | None: Siguiente celda del camino (la misma celda si ya es objetivo), o None si no hay camino.
+        """
+        self._settle_until(pos)
+        if pos not in self._done:
+            return None
+        return self._resolve(pos)[1]
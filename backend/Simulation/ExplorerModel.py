@@ -1,10 +1,29 @@
-import random
+import numpy as np
 from mesa import Model
-from mesa.space import MultiGrid
 from Simulation.AgentBaseModel import AgentBaseModel
 from Simulation.AgentFireFighter import AgentFireFighter
 from Simulation.AgentRescuer import AgenteRescuer
 from Simulation.AuxFunctions import readMap, get_closest_entry_to_pois
+from Simulation.Topology import get_topology
+from Simulation.DistanceField import DistanceField
+from Simulation.FireEngine import get_fire_engine, DEFAULT_FIRE_ENGINE
+from Simulation.SlimGrid import create_grid, DEFAULT_GRID
+
+# Nombre del estado de una celda según su valor en fire_grid
+_CELL_STATUS = ('Empty', 'Smoke', 'Fire')
+
+# Bits de cada celda en edge_grid: un grupo de 4 bits por tipo de borde y, dentro del grupo,
+# un bit por dirección (0=Arriba, 1=Izquierda, 2=Abajo, 3=Derecha), igual que los caracteres de 'walls'.
+EDGE_WALL = 0x0001
+EDGE_DOOR = 0x0010
+EDGE_DOOR_OPEN = 0x0100
+EDGE_DAMAGED = 0x1000
+
+# Cadena de 4 caracteres de 'walls' para cada máscara de paredes de una celda
+_WALL_STRINGS = tuple("".join('1' if mask & (1 << d) else '0' for d in range(4)) for mask in range(16))
+
+# Desplazamiento (dx, dy) de cada dirección de borde
+_EDGE_OFFSETS = ((0, -1), (-1, 0), (0, 1), (1, 0))
 
 class ExplorerModel(Model):
     """
@@ -13,7 +32,8 @@ class ExplorerModel(Model):
     Implementa el patrón Observer para notificar cambios de estado en cada paso.
     """
     
-    def __init__(self, width, height, agents, pa, strategy="random", printable=False, on_step_callback=None):
+    def __init__(self, width, height, agents, pa, strategy="random", printable=False, on_step_callback=None, seed=None,
+                 fire_engine=DEFAULT_FIRE_ENGINE, grid=DEFAULT_GRID):
         """
         Inicializa el modelo de simulación con el mapa y los agentes según la estrategia elegida.
         
@@ -25,8 +45,13 @@ class ExplorerModel(Model):
             strategy (str): Estrategia de despliegue ('random' o 'intelligent')
             printable (bool): Indica si se deben imprimir mensajes de debug en consola
             on_step_callback (function): Función a ejecutar después de cada paso (patrón Observer)
+            seed (int): Semilla del generador aleatorio del modelo (None para una semilla aleatoria).
+                        Todas las tiradas del modelo y de sus agentes usan self.random, derivado de esta semilla.
+            fire_engine (str): Motor de flashover y barrido de POIs ('reference' o 'vectorized', ver FireEngine)
+            grid (str): Almacén de posiciones de agentes ('mesa' para MultiGrid o 'slim' para corridas headless, ver SlimGrid)
         """
-        super().__init__()
+        super().__init__(seed=seed)
+        self.fire_engine = get_fire_engine(fire_engine)
 
         self.on_step_callback = on_step_callback
 
@@ -35,12 +60,43 @@ class ExplorerModel(Model):
         if mapData is None: 
             raise Exception("Error leyendo InitialState.txt")
 
-        self.grid = MultiGrid(width, height, torus=False)
-        self.walls = mapData['walls']
-        self.doors = mapData['doors'] 
-        self.fires = [[f[0], f[1], 2] for f in mapData['fires']]
-        self.pois = mapData['pois'] 
+        self.grid = create_grid(grid, width, height)
+        # Versiones por subestado (solo aumentan) y journal de celdas modificadas [(subestado, x, y)].
+        # Permiten saber si algo cambió entre dos consultas y reutilizar datos derivados
+        # (campos de distancia, partes de frames) mientras su subestado no cambie.
+        self.versions = {"fires": 0, "edges": 0, "pois": 0, "agents": 0}
+        self.change_journal = []
+        self._distance_fields = {}
+
+        # Paredes y puertas de cada celda como máscara de bits (ver EDGE_*), con consultas O(1).
+        # _door_edges conserva el orden original de las puertas para la lista 'doors'.
+        self._map_height = len(mapData['walls'])
+        self._map_width = len(mapData['walls'][0])
+        self.edge_grid = np.zeros((self._map_height, self._map_width), dtype=np.uint16)
+        self._edge_item = self.edge_grid.item
+        self._door_edges = {}
+        self._walls_cache = None
+        self._doors_cache = None
+        self._load_edges(mapData['walls'], mapData['doors'])
+        # Estado de fuego por celda en un arreglo H×W (0=vacía, 1=humo, 2=fuego) con consultas O(1).
+        # _fire_cells conserva el orden de aparición de cada celda, que es el orden de la lista 'fires'.
+        self.fire_grid = np.zeros((height, width), dtype=np.int8)
+        self._fire_item = self.fire_grid.item
+        self._fire_cells = {}
+        self._fires_cache = None
+        for f in mapData['fires']:
+            self._set_fire(f[0], f[1], 2)
+        # POIs indexados por posición (y, x); el diccionario conserva el orden de la lista 'pois'
+        # y poi_grid los marca en un arreglo H×W para el barrido de POIs en fuego
+        self._pois = {}
+        self._pois_cache = None
+        self.poi_grid = np.zeros((height, width), dtype=bool)
+        for p in mapData['pois']:
+            self._pois.setdefault((p[0], p[1]), p)
+            self.poi_grid[p[0], p[1]] = True
         self.entryPoints = mapData['entryPoints']
+        # Geometría estática (vecinos, perímetro, entradas) compartida entre modelos del mismo mapa
+        self.topology = get_topology(width, height, self.entryPoints)
         
         self.agents_list = []
         self.replenish_pois()
@@ -69,22 +125,15 @@ class ExplorerModel(Model):
             num_agents (int): Cantidad de agentes a desplegar
             pa (int): Puntos de acción de cada agente
         """
-        exterior_positions = []
-        for x in range(self.grid.width):
-            exterior_positions.append((x, 0))
-        for x in range(self.grid.width):
-            exterior_positions.append((x, self.grid.height - 1))
-        for y in range(1, self.grid.height - 1):
-            exterior_positions.append((0, y))
-        for y in range(1, self.grid.height - 1):
-            exterior_positions.append((self.grid.width - 1, y))
+        exterior_positions = list(self.topology.spawn_perimeter)
         
-        random.shuffle(exterior_positions)
+        self.random.shuffle(exterior_positions)
         
         for i in range(num_agents):
             pos = exterior_positions[i % len(exterior_positions)]
             a = AgentBaseModel(self, pa, i, printable=self.printable)
             self.grid.place_agent(a, pos)
+            self.mark_dirty("agents", pos[0], pos[1])
             self.agents_list.append(a)
             if self.printable:
                 print(f"RANDOM - Agente {i} (Base) en {pos}")
@@ -98,7 +147,7 @@ class ExplorerModel(Model):
             num_agents (int): Cantidad de agentes a desplegar
             pa (int): Puntos de acción de cada agente
         """
-        outside_doors = [(ep[1], ep[0]) for ep in self.entryPoints]
+        outside_doors = self.topology.outside_doors
         
         if self.printable:
             print(f"👥 Desplegando {num_agents} agentes en parejas...")
@@ -115,6 +164,7 @@ class ExplorerModel(Model):
                 role_icon = "Rescatadores"
             
             self.grid.place_agent(a, pos)
+            self.mark_dirty("agents", pos[0], pos[1])
             self.agents_list.append(a)
             
             if self.printable:
@@ -138,7 +188,7 @@ class ExplorerModel(Model):
         4. Repone víctimas si es necesario
         5. Verifica condiciones de fin de juego
         """
-        outside_doors = [(ep[1], ep[0]) for ep in self.entryPoints]
+        outside_doors = self.topology.entry_set
         
         # Procesa las acciones de cada agente y verifica rescates
         for agent in self.agents_list:
@@ -166,29 +216,320 @@ class ExplorerModel(Model):
         
         self.steps += 1
 
-    def get_door_index(self, pos1, pos2):
+    @property
+    def fires(self):
+        """
+        Lista de fuegos en formato [y, x, estado] (1=humo, 2=fuego), en orden de aparición.
+        Se construye a partir de fire_grid solo cuando se consulta (p. ej. al registrar un frame)
+        y se reutiliza mientras el fuego no cambie.
+        
+        Retorna:
+            list: Lista de fuegos activos y humo
+        """
+        if self._fires_cache is None:
+            grid = self.fire_grid
+            self._fires_cache = [[y, x, grid.item(y, x)] for (y, x) in self._fire_cells]
+        return self._fires_cache
+
+    def _set_fire(self, y, x, state):
+        """
+        Actualiza el estado de fuego de una celda, manteniendo el orden de aparición de la lista de fuegos.
+        Una celda que pasa a vacía sale del orden; si vuelve a encenderse se agrega al final.
+        
+        Parámetros:
+            y (int): Fila de la celda
+            x (int): Columna de la celda
+            state (int): Nuevo estado (0=vacía, 1=humo, 2=fuego)
+        """
+        self.fire_grid[y, x] = state
+        self.mark_dirty("fires", x, y)
+        if state:
+            self._fire_cells.setdefault((y, x), None)
+        else:
+            self._fire_cells.pop((y, x), None)
+        self._fires_cache = None
+
+    def _fire_state(self, x, y):
+        """
+        Obtiene el estado de fuego de una celda (0 fuera del grid).
+        
+        Parámetros:
+            x (int): Coordenada x de la celda
+            y (int): Coordenada y de la celda
+        
+        Retorna:
+            int: 0=vacía, 1=humo, 2=fuego
+        """
+        if 0 <= x < self.grid.width and 0 <= y < self.grid.height:
+            return self._fire_item(y, x)
+        return 0
+
+    def _load_edges(self, walls, doors):
+        """
+        Construye edge_grid a partir de las paredes y puertas leídas del mapa.
+        
+        Parámetros:
+            walls (list): Filas de cadenas de 4 caracteres por celda ('1' = pared)
+            doors (list): Puertas en formato [(y1, x1), (y2, x2), status]
+        """
+        for y, row in enumerate(walls):
+            for x, cell in enumerate(row):
+                mask = 0
+                for d, c in enumerate(cell):
+                    if c != '0':
+                        mask |= EDGE_WALL << d
+                self.edge_grid[y, x] = mask
+
+        for (y1, x1), (y2, x2), status in doors:
+            key = ((y1, x1), (y2, x2))
+            if key in self._door_edges:
+                continue
+            self._door_edges[key] = None
+            self._set_door_bits((x1, y1), (x2, y2), EDGE_DOOR)
+            if status != 'Closed':
+                self._set_door_bits((x1, y1), (x2, y2), EDGE_DOOR_OPEN)
+
+    def _edge_dir(self, pos1, pos2):
+        """
+        Obtiene la dirección del borde que separa dos celdas (0=Arriba, 1=Izquierda, 2=Abajo, 3=Derecha).
+        
+        Parámetros:
+            pos1 (tuple): Celda origen en formato (x, y)
+            pos2 (tuple): Celda destino en formato (x, y)
+        
+        Retorna:
+            int: Dirección del borde, o -1 si las celdas no son adyacentes o salen del mapa
+        """
+        x1, y1 = pos1
+        x2, y2 = pos2
+        if not (0 <= x1 < self._map_width and 0 <= y1 < self._map_height):
+            return -1
+        dx, dy = x2 - x1, y2 - y1
+        if dx == 0:
+            if dy == -1: return 0
+            if dy == 1: return 2
+        elif dy == 0:
+            if dx == -1: return 1
+            if dx == 1: return 3
+        return -1
+
+    def _set_door_bits(self, pos1, pos2, flag, value=True):
+        """
+        Enciende o apaga un bit de puerta en ambos lados del borde entre dos celdas adyacentes.
+        
+        Parámetros:
+            pos1 (tuple): Primera celda en formato (x, y)
+            pos2 (tuple): Segunda celda en formato (x, y)
+            flag (int): Bit a modificar (EDGE_DOOR o EDGE_DOOR_OPEN)
+            value (bool): True para encender el bit, False para apagarlo
+        """
+        for a, b in ((pos1, pos2), (pos2, pos1)):
+            d = self._edge_dir(a, b)
+            if d == -1:
+                continue
+            x, y = a
+            if value:
+                self.edge_grid[y, x] |= flag << d
+            else:
+                self.edge_grid[y, x] &= ~(flag << d) & 0xFFFF
+            self.mark_dirty("edges", x, y)
+        self._doors_cache = None
+
+    @property
+    def walls(self):
+        """
+        Paredes en el formato del mapa: filas de cadenas de 4 caracteres por celda ('1' = pared).
+        Se construye a partir de edge_grid solo cuando se consulta y se reutiliza mientras no cambie.
+        
+        Retorna:
+            list: Filas con la cadena de paredes de cada celda
+        """
+        if self._walls_cache is None:
+            self._walls_cache = [[_WALL_STRINGS[m & 0xF] for m in row] for row in self.edge_grid.tolist()]
+        return self._walls_cache
+
+    @property
+    def doors(self):
+        """
+        Puertas en formato [(y1, x1), (y2, x2), status], en el orden en que aparecen en el mapa.
+        Se construye a partir de edge_grid solo cuando se consulta y se reutiliza mientras no cambie.
+        
+        Retorna:
+            list: Lista de puertas con su estado ('Closed' u 'Open')
+        """
+        if self._doors_cache is None:
+            self._doors_cache = [[p1, p2, self.get_door_status((p1[1], p1[0]), (p2[1], p2[0]))]
+                                 for (p1, p2) in self._door_edges]
+        return self._doors_cache
+
+    def mark_dirty(self, kind, x, y):
+        """
+        Registra el cambio de una celda en un subestado: aumenta su versión y lo anota en el journal.
+        
+        Parámetros:
+            kind (str): Subestado modificado ('fires', 'edges', 'pois' o 'agents')
+            x (int): Coordenada x de la celda
+            y (int): Coordenada y de la celda
+        """
+        self.versions[kind] += 1
+        self.change_journal.append((kind, x, y))
+
+    @property
+    def world_version(self):
+        """
+        Versión global del estado: cambia si cambia cualquiera de los subestados.
+        
+        Retorna:
+            int: Suma de las versiones de todos los subestados
+        """
+        return sum(self.versions.values())
+
+    @property
+    def journal_cursor(self):
+        """
+        Posición actual del journal de cambios, para consultar después qué cambió desde este punto.
+        
+        Retorna:
+            int: Número de cambios registrados hasta ahora
+        """
+        return len(self.change_journal)
+
+    def dirty_cells_since(self, cursor, kinds=None):
+        """
+        Obtiene las celdas modificadas desde una posición del journal.
+        
+        Parámetros:
+            cursor (int): Valor de journal_cursor tomado anteriormente
+            kinds (tuple): Subestados a considerar (None para todos)
+        
+        Retorna:
+            set: Celdas (x, y) modificadas desde ese punto
+        """
+        return {(x, y) for kind, x, y in self.change_journal[cursor:] if kinds is None or kind in kinds}
+
+    def move_agent(self, agent, pos):
+        """
+        Mueve un agente a otra celda registrando el cambio de posiciones.
+        
+        Parámetros:
+            agent (AgentBaseModel): Agente a mover
+            pos (tuple): Celda destino en formato (x, y)
+        """
+        if agent.pos is not None:
+            self.mark_dirty("agents", agent.pos[0], agent.pos[1])
+        self.grid.move_agent(agent, pos)
+        self.mark_dirty("agents", pos[0], pos[1])
+
+    def get_fire_distance_field(self, step_cost=1):
         """
-        Busca si existe una puerta entre dos posiciones adyacentes.
-        Las puertas se almacenan en formato [(y1, x1), (y2, x2), status].
+        Obtiene el campo de distancias hacia todas las celdas con fuego o humo (rutas de los bomberos).
+        Se calcula una sola vez por versión del fuego y de paredes/puertas, y lo comparten todos los agentes que lo consultan.
+        
+        Parámetros:
+            step_cost (int): Costo base del movimiento (2 si el agente carga una víctima)
+        
+        Retorna:
+            DistanceField: Campo con el primer paso óptimo desde cada celda
+        """
+        # El campo depende solo del fuego (objetivos y costos) y de paredes/puertas
+        version = (self.versions["fires"], self.versions["edges"])
+        cached = self._distance_fields.get(step_cost)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        targets = [(x, y) for (y, x) in self._fire_cells]
+        field = DistanceField(self, targets, step_cost=step_cost, avoid_fire=False, can_chop=True)
+        self._distance_fields[step_cost] = (version, field)
+        return field
+
+    def get_door_status(self, pos1, pos2):
+        """
+        Busca si existe una puerta entre dos posiciones adyacentes y regresa su estado.
         
         Parámetros:
             pos1 (tuple): Primera posición en formato (x, y)
             pos2 (tuple): Segunda posición en formato (x, y)
         
         Retorna:
-            int: Índice de la puerta en self.doors, o -1 si no existe puerta
-        """
-        y1, x1 = pos1[1], pos1[0]
-        y2, x2 = pos2[1], pos2[0]
-        
-        for i, d in enumerate(self.doors):
-            door_p1 = d[0]
-            door_p2 = d[1]
-            # Verifica coincidencia en ambas direcciones (bidireccional)
-            if ((door_p1 == (y1, x1) and door_p2 == (y2, x2)) or
-                (door_p1 == (y2, x2) and door_p2 == (y1, x1))):
-                return i
-        return -1
+            str | None: 'Closed' u 'Open', o None si no existe puerta entre ambas celdas
+        """
+        d = self._edge_dir(pos1, pos2)
+        if d == -1:
+            return None
+        mask = self._edge_item(pos1[1], pos1[0])
+        if not mask & (EDGE_DOOR << d):
+            return None
+        return 'Open' if mask & (EDGE_DOOR_OPEN << d) else 'Closed'
+
+    def open_door(self, pos1, pos2):
+        """
+        Abre la puerta entre dos posiciones adyacentes (si existe).
+        
+        Parámetros:
+            pos1 (tuple): Primera posición en formato (x, y)
+            pos2 (tuple): Segunda posición en formato (x, y)
+        """
+        if self.get_door_status(pos1, pos2) is not None:
+            self._set_door_bits(pos1, pos2, EDGE_DOOR_OPEN)
+
+    def destroy_door(self, pos1, pos2):
+        """
+        Elimina la puerta entre dos posiciones adyacentes (p. ej. destruida por una explosión).
+        
+        Parámetros:
+            pos1 (tuple): Primera posición en formato (x, y)
+            pos2 (tuple): Segunda posición en formato (x, y)
+        """
+        (x1, y1), (x2, y2) = pos1, pos2
+        for key in (((y1, x1), (y2, x2)), ((y2, x2), (y1, x1))):
+            if key in self._door_edges:
+                del self._door_edges[key]
+                self._set_door_bits(pos1, pos2, EDGE_DOOR, False)
+                self._set_door_bits(pos1, pos2, EDGE_DOOR_OPEN, False)
+                return
+
+    @property
+    def pois(self):
+        """
+        Lista de POIs en formato [y, x, tipo(, revelado)], en orden de aparición.
+        Los elementos son los mismos registros del índice por posición, así que revelar un POI
+        se refleja sin reconstruir la lista; solo se regenera al agregar o eliminar POIs.
+        
+        Retorna:
+            list: Lista de POIs en el mapa
+        """
+        if self._pois_cache is None:
+            self._pois_cache = list(self._pois.values())
+        return self._pois_cache
+
+    def _add_poi(self, poi):
+        """
+        Agrega un POI al índice por posición.
+        
+        Parámetros:
+            poi (list): Registro [y, x, tipo, revelado]
+        """
+        self._pois[(poi[0], poi[1])] = poi
+        self.poi_grid[poi[0], poi[1]] = True
+        self._pois_cache = None
+        self.mark_dirty("pois", poi[1], poi[0])
+
+    def _pop_poi(self, x, y):
+        """
+        Quita del índice el POI de una posición.
+        
+        Parámetros:
+            x (int): Coordenada x de la celda
+            y (int): Coordenada y de la celda
+        
+        Retorna:
+            list | None: El POI eliminado, o None si no había POI en esa posición
+        """
+        poi = self._pois.pop((y, x), None)
+        if poi is not None:
+            self.poi_grid[y, x] = False
+            self._pois_cache = None
+            self.mark_dirty("pois", x, y)
+        return poi
 
     def replenish_pois(self):
         """
@@ -198,7 +539,7 @@ class ExplorerModel(Model):
         Genera nuevos POIs aleatoriamente (50% víctima, 50% falsa alarma) en celdas válidas.
         """
         # Cuenta POIs físicos en el mapa
-        pois_on_map = len(self.pois)
+        pois_on_map = len(self._pois)
         
         # Cuenta víctimas siendo transportadas por agentes
         victims_being_carried = sum(1 for a in self.agents_list if getattr(a, 'carrying_victim', False))
@@ -218,9 +559,9 @@ class ExplorerModel(Model):
             if valid_spots:
                 pos = self.random.choice(valid_spots)
                 # Genera tipo aleatorio: 50% víctima ('v'), 50% falsa alarma ('f')
-                ptype = 'v' if random.random() > 0.5 else 'f'
+                ptype = 'v' if self.random.random() > 0.5 else 'f'
                 # Estructura POI: [y, x, tipo, revelado]
-                self.pois.append([pos[1], pos[0], ptype, False]) 
+                self._add_poi([pos[1], pos[0], ptype, False])
                 total_active += 1
             else: 
                 break
@@ -235,8 +576,7 @@ class ExplorerModel(Model):
         Retorna:
             bool: True si hay un POI en esa posición, False en caso contrario
         """
-        x, y = pos
-        return any(p[0] == y and p[1] == x for p in self.pois)
+        return (pos[1], pos[0]) in self._pois
 
     def reveal_poi(self, pos):
         """
@@ -251,13 +591,9 @@ class ExplorerModel(Model):
             str: 'Victim' si es víctima real, 'FalseAlarm' si es falsa alarma, None si no hay POI
         """
         x, y = pos
-        target_poi = None
         
         # Busca el POI específico en la posición
-        for p in self.pois:
-            if p[0] == y and p[1] == x:
-                target_poi = p
-                break
+        target_poi = self._pois.get((y, x))
         
         if target_poi:
             # Marca como revelado (manejo seguro para compatibilidad con versiones anteriores)
@@ -265,6 +601,7 @@ class ExplorerModel(Model):
                 target_poi.append(True)
             else: 
                 target_poi[3] = True
+            self.mark_dirty("pois", x, y)
             
             # Determina el tipo de POI
             p_type = target_poi[2]
@@ -287,18 +624,16 @@ class ExplorerModel(Model):
         Parámetros:
             pos (tuple): Posición en formato (x, y)
         """
-        x, y = pos
-        self.pois = [p for p in self.pois if not (p[0] == y and p[1] == x)]
+        self._pop_poi(pos[0], pos[1])
 
     def check_victims_and_pois_in_fire(self):
         """
         Verifica y procesa víctimas/POIs consumidos por fuego activo.
-        Se ejecuta una vez por turno para contabilizar pérdidas.
+        Se ejecuta una vez por turno, después del flashover, y procesa todos los POIs en fuego a la vez;
+        la reposición se hace una sola vez al final del turno (replenish_pois en step).
         """
-        for f in self.fires:
-            if f[2] == 2:  # Solo fuego activo (no humo)
-                fx, fy = f[1], f[0]
-                self.check_poi_on_fire(fx, fy)
+        for y, x in self.fire_engine.burning_pois(self):
+            self.check_poi_on_fire(x, y)
 
     def check_poi_on_fire(self, x, y):
         """
@@ -309,30 +644,18 @@ class ExplorerModel(Model):
             x (int): Coordenada x de la celda
             y (int): Coordenada y de la celda
         """
-        poi_removed = False
-        
-        # Itera en reversa para poder eliminar elementos durante la iteración
-        for i in range(len(self.pois) - 1, -1, -1):
-            p = self.pois[i]
-            py, px = p[0], p[1] 
-            
-            if px == x and py == y:
-                p_type = p[2]
-                
-                if p_type in ['Victim', 'v']:
-                    self.victims_lost += 1
-                    if self.printable:
-                        print(f"¡Víctima perdida en el fuego en ({x}, {y})! Total perdidas: {self.victims_lost}")
-                elif p_type in ['f']:
-                    if self.printable:
-                        print(f"Falsa alarma consumida por el fuego en ({x}, {y})")
-                
-                self.pois.pop(i)
-                poi_removed = True
-        
-        # Repone POIs si el total cae por debajo de 3
-        if poi_removed and len(self.pois) < 3:
-            self.replenish_pois()
+        p = self._pop_poi(x, y)
+        if p is None:
+            return
+
+        p_type = p[2]
+        if p_type in ['Victim', 'v']:
+            self.victims_lost += 1
+            if self.printable:
+                print(f"¡Víctima perdida en el fuego en ({x}, {y})! Total perdidas: {self.victims_lost}")
+        elif p_type in ['f']:
+            if self.printable:
+                print(f"Falsa alarma consumida por el fuego en ({x}, {y})")
 
     def has_wall(self, x, y, dir_idx):
         """
@@ -346,47 +669,48 @@ class ExplorerModel(Model):
         Retorna:
             bool: True si existe pared en esa dirección, False en caso contrario
         """
-        if 0 <= y < len(self.walls) and 0 <= x < len(self.walls[0]):
-            return self.walls[y][x][dir_idx] != '0'
+        if 0 <= y < self._map_height and 0 <= x < self._map_width:
+            return bool(self._edge_item(y, x) & (EDGE_WALL << (dir_idx & 3)))
         return False
     
     def remove_wall(self, x, y, dir_idx):
         """
-        Elimina una pared en una dirección específica y su contraparte en la celda adyacente.
-        Incrementa el contador de daño estructural del edificio.
+        Elimina una pared en una dirección específica y su contraparte en la celda adyacente,
+        marcando ambos lados del borde como dañados.
         
         Parámetros:
             x (int): Coordenada x de la celda
             y (int): Coordenada y de la celda
             dir_idx (int): Índice de dirección de la pared a eliminar
         """
-        if 0 <= y < len(self.walls) and 0 <= x < len(self.walls[0]):
-            w = list(self.walls[y][x])
-            w[dir_idx] = '0'
-            self.walls[y][x] = "".join(w)
+        if 0 <= y < self._map_height and 0 <= x < self._map_width:
+            dir_idx &= 3
+            self._clear_wall_bit(x, y, dir_idx)
             
-            # Calcula posición de celda adyacente y dirección opuesta
-            nx, ny = x, y
-            opp = -1
-            
-            if dir_idx == 0: 
-                ny -= 1 # Arriba visual (Matricial)
-                opp = 2
-            elif dir_idx == 1: 
-                nx -= 1
-                opp = 3
-            elif dir_idx == 2: 
-                ny += 1 # Abajo visual (Matricial)
-                opp = 0
-            elif dir_idx == 3: 
-                nx += 1
-                opp = 1
+            # Calcula posición de celda adyacente y dirección opuesta (Arriba/Abajo visual = Matricial)
+            dx, dy = _EDGE_OFFSETS[dir_idx]
+            nx, ny = x + dx, y + dy
+            opp = (dir_idx + 2) % 4
             
             # Elimina la pared desde el lado opuesto para mantener consistencia
-            if 0 <= ny < len(self.walls) and 0 <= nx < len(self.walls[0]):
-                w2 = list(self.walls[ny][nx])
-                w2[opp] = '0'
-                self.walls[ny][nx] = "".join(w2)
+            if 0 <= ny < self._map_height and 0 <= nx < self._map_width:
+                self._clear_wall_bit(nx, ny, opp)
+            self._walls_cache = None
+
+    def _clear_wall_bit(self, x, y, dir_idx):
+        """
+        Quita la pared de un lado de la celda; si existía, marca ese lado como dañado.
+        
+        Parámetros:
+            x (int): Coordenada x de la celda
+            y (int): Coordenada y de la celda
+            dir_idx (int): Dirección del lado (0-3)
+        """
+        mask = self._edge_item(y, x)
+        wall_bit = EDGE_WALL << dir_idx
+        if mask & wall_bit:
+            self.edge_grid[y, x] = (mask & ~wall_bit) | (EDGE_DAMAGED << dir_idx)
+            self.mark_dirty("edges", x, y)
 
     def can_move(self, from_pos, to_pos):
         """
@@ -426,11 +750,9 @@ class ExplorerModel(Model):
             return False
 
         # Verifica puerta: si existe y está cerrada, bloquea el paso
-        d_idx = self.get_door_index(from_pos, to_pos)
-        if d_idx != -1:
-            status = self.doors[d_idx][2]
-            if status == 'Closed':
-                return False
+        mask = self._edge_item(fy, fx)
+        if mask & (EDGE_DOOR << dir_idx) and not mask & (EDGE_DOOR_OPEN << dir_idx):
+            return False
 
         return True
 
@@ -471,7 +793,7 @@ class ExplorerModel(Model):
         """
         Agrega humo o fuego a una celda específica.
         El humo se convierte automáticamente en fuego si hay fuego adyacente.
-        El fuego daña a agentes presentes y destruye víctimas.
+        El fuego daña a agentes presentes; los POIs que alcanza se pierden en el barrido de check_victims_and_pois_in_fire.
         
         Parámetros:
             pos (tuple): Posición en formato (x, y)
@@ -481,7 +803,7 @@ class ExplorerModel(Model):
         
         # Si se intenta agregar humo pero hay fuego adyacente, se convierte directamente en fuego
         if intensity == 1:
-            neighbors = self.grid.get_neighborhood((x, y), moore=False, include_center=False)
+            neighbors = self.topology.neighbors[(x, y)]
             for n in neighbors:
                 if self.get_cell_status(n) == 'Fire':
                     intensity = 2
@@ -489,22 +811,13 @@ class ExplorerModel(Model):
 
         # Procesa consecuencias del fuego activo
         if intensity == 2:
-            self.check_poi_on_fire(x, y)
             cell_contents = self.grid.get_cell_list_contents(pos)
             for obj in cell_contents:
                 if isinstance(obj, AgentBaseModel): 
                     self.send_to_ambulance(obj)
         
         # Actualiza o crea registro de fuego en la posición
-        found = False
-        for f in self.fires:
-            if f[0] == y and f[1] == x:
-                f[2] = intensity
-                found = True
-                break
-        
-        if not found: 
-            self.fires.append([y, x, intensity])
+        self._set_fire(y, x, intensity)
 
     def resolve_explosion(self, center_pos):
         """
@@ -540,9 +853,8 @@ class ExplorerModel(Model):
                     break
                 
                 # Verifica colisión con puerta cerrada: la destruye y detiene propagación
-                d_idx = self.get_door_index((px,py), (nx,ny))
-                if d_idx != -1 and self.doors[d_idx][2] == 'Closed':
-                    self.doors.pop(d_idx)
+                if self.get_door_status((px,py), (nx,ny)) == 'Closed':
+                    self.destroy_door((px,py), (nx,ny))
                     active = False
                     break
 
@@ -558,28 +870,16 @@ class ExplorerModel(Model):
     def resolve_flashover(self):
         """
         Simula el fenómeno de 'Flashover', actualizando el estado de las celdas de humo a fuego activo si se encuentran adyacentes a una llama existente.
-        Implementa una regla de propagación basada en la vecindad (Von Neumann) para determinar la transición de estado del fuego.
+        La propagación (vecindad de Von Neumann) se repite hasta un punto fijo, de modo que una cadena de humo
+        conectada al fuego se enciende completa en el mismo turno. El cálculo lo hace el motor de fuego del modelo.
 
         Parámetros:
             Ninguno.
         Retorna:
             None
         """
-        fire_locs = {(f[1], f[0]) for f in self.fires if f[2] == 2}
-        
-        to_convert = []
-        for i, f in enumerate(self.fires):
-            if f[2] == 1:
-                fy, fx = f[0], f[1]
-                neighbors = self.grid.get_neighborhood((fx, fy), moore=False, include_center=False)
-                if any(n in fire_locs for n in neighbors):
-                    to_convert.append(i)
-        
-        for idx in to_convert:
-            if 0 <= idx < len(self.fires) and self.fires[idx][2] == 1:
-                self.fires[idx][2] = 2
-                fx, fy = self.fires[idx][1], self.fires[idx][0]
-                self.check_poi_on_fire(fx, fy)
+        for fy, fx in self.fire_engine.flashover_cells(self):
+            self._set_fire(fy, fx, 2)
 
     def send_to_ambulance(self, agent):
         """
@@ -607,38 +907,23 @@ class ExplorerModel(Model):
 
         # --- ESTRATEGIA INTELLIGENTE ---
         if self.strategy == "intelligent":
-            target = get_closest_entry_to_pois(self.entryPoints, self.pois)
+            target = get_closest_entry_to_pois(self.entryPoints, self.pois, rng=self.random)
             if self.is_fire(target):
                 if self.printable: print("⚠️ La ambulancia óptima tiene fuego. Buscando alternativa...")
-                width, height = self.grid.width, self.grid.height
-                perimeter = []
-                for x in range(width):
-                    perimeter.append((x, 0)); perimeter.append((x, height - 1))
-                for y in range(1, height - 1):
-                    perimeter.append((0, y)); perimeter.append((width - 1, y))
-                
-                safe_perimeter = [p for p in perimeter if not self.is_fire(p)]
+                safe_perimeter = [p for p in self.topology.respawn_perimeter if not self.is_fire(p)]
                 if safe_perimeter:
                     target = self.random.choice(safe_perimeter)
 
         # --- ESTRATEGIA RANDOM ---
         else:
-            width, height = self.grid.width, self.grid.height
-            perimeter = []
-            for x in range(width):
-                perimeter.append((x, 0))            
-                perimeter.append((x, height - 1)) 
-            for y in range(1, height - 1):
-                perimeter.append((0, y))            
-                perimeter.append((width - 1, y))    
-            safe_perimeter = [p for p in perimeter if not self.is_fire(p)]
+            safe_perimeter = [p for p in self.topology.respawn_perimeter if not self.is_fire(p)]
             if safe_perimeter:
                 target = self.random.choice(safe_perimeter)
         # Mover agente
         if target:
-            self.grid.move_agent(agent, target)
+            self.move_agent(agent, target)
         else:
-            self.grid.move_agent(agent, (0,0))
+            self.move_agent(agent, (0,0))
 
     def get_cell_status(self, pos):
         """
@@ -651,9 +936,8 @@ class ExplorerModel(Model):
             str: 'Empty' si no hay fuego, 'Smoke' si hay humo, 'Fire' si hay fuego activo
         """
         x, y = pos
-        for f in self.fires:
-            if f[0] == y and f[1] == x: 
-                return 'Smoke' if f[2]==1 else 'Fire'
+        if 0 <= x < self.grid.width and 0 <= y < self.grid.height:
+            return _CELL_STATUS[self._fire_item(y, x)]
         return 'Empty'
     
     def is_fire(self, pos):
@@ -666,7 +950,7 @@ class ExplorerModel(Model):
         Retorna:
             bool: True si hay fuego activo, False en caso contrario
         """
-        return self.get_cell_status(pos) == 'Fire'
+        return self._fire_state(pos[0], pos[1]) == 2
 
     def is_outside_building(self, pos):
         """
@@ -690,12 +974,10 @@ class ExplorerModel(Model):
             pos (tuple): Posición en formato (x, y)
         """
         x, y = pos
-        for i, f in enumerate(self.fires):
-            if f[0] == y and f[1] == x:
-                self.fires.pop(i)
-                if self.printable:
-                    print(f"Fuego removido completamente de {pos}")
-                return
+        if self._fire_state(x, y):
+            self._set_fire(y, x, 0)
+            if self.printable:
+                print(f"Fuego removido completamente de {pos}")
 
     def remove_smoke(self, pos):
         """
@@ -705,12 +987,10 @@ class ExplorerModel(Model):
             pos (tuple): Posición en formato (x, y)
         """
         x, y = pos
-        for i, f in enumerate(self.fires):
-            if f[0] == y and f[1] == x and f[2] == 1:
-                self.fires.pop(i)
-                if self.printable:
-                    print(f"Humo removido de {pos}")
-                return
+        if self._fire_state(x, y) == 1:
+            self._set_fire(y, x, 0)
+            if self.printable:
+                print(f"Humo removido de {pos}")
 
     def downgrade_fire(self, pos):
         """
@@ -720,17 +1000,15 @@ class ExplorerModel(Model):
             pos (tuple): Posición en formato (x, y)
         """
         x, y = pos
-        for i, f in enumerate(self.fires):
-            if f[0] == y and f[1] == x:
-                if f[2] == 2:
-                    f[2] = 1
-                    if self.printable:
-                        print(f"Fuego convertido a humo en {pos}")
-                else:
-                    self.fires.pop(i)
-                    if self.printable:
-                        print(f"Humo removido de {pos}")
-                return
+        state = self._fire_state(x, y)
+        if state == 2:
+            self._set_fire(y, x, 1)
+            if self.printable:
+                print(f"Fuego convertido a humo en {pos}")
+        elif state == 1:
+            self._set_fire(y, x, 0)
+            if self.printable:
+                print(f"Humo removido de {pos}")
             
     def check_game_over(self):
         """
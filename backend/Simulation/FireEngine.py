@@ -0,0 +1,172 @@
+"""
+Motores intercambiables para la dinámica del fuego sobre el estado en arreglos del modelo.
+
+Cada motor resuelve las dos fases del turno de fuego que recorren todo el tablero:
+    - Flashover: el humo conectado (vecindad de Von Neumann) a una llama se enciende en cadena
+      hasta llegar a un punto fijo, no solo el humo directamente adyacente.
+    - Barrido de POIs: los POIs en celdas con fuego activo se pierden todos a la vez.
+
+La tirada de dados y las explosiones siguen en ExplorerModel porque afectan una sola celda o recorren
+un rayo de forma secuencial. El motor 'reference' usa ciclos por celda y sirve para verificar al
+motor 'vectorized', que opera con máscaras de NumPy; ambos regresan las celdas en orden (y, x).
+
+En un solo tablero de 8x6 el costo fijo de cada operación de NumPy pesa más que los ciclos, así que
+las partidas individuales usan 'reference' por omisión. Las funciones de máscaras aceptan arreglos
+con dimensiones extra al inicio (..., H, W), de modo que también sirven para muchos tableros a la vez.
+"""
+import numpy as np
+
+
+def flashover_mask(fire_grid):
+    """
+    Calcula qué celdas de humo se encienden por flashover dilatando la máscara de fuego sobre la de humo
+    (vecindad de Von Neumann) hasta que ya no cambia.
+
+    Parámetros:
+        fire_grid (numpy.ndarray): Estados de fuego (0=vacía, 1=humo, 2=fuego) con forma (..., H, W).
+    Retorna:
+        numpy.ndarray: Máscara booleana (..., H, W) de las celdas que pasan de humo a fuego.
+    """
+    smoke = fire_grid == 1
+    ignited = np.zeros_like(smoke)
+    if not smoke.any():
+        return ignited
+    frontier = fire_grid == 2
+    while True:
+        # Celdas alcanzadas por la última capa encendida (arriba, abajo, izquierda, derecha)
+        reach = np.zeros_like(smoke)
+        reach[..., 1:, :] |= frontier[..., :-1, :]
+        reach[..., :-1, :] |= frontier[..., 1:, :]
+        reach[..., :, 1:] |= frontier[..., :, :-1]
+        reach[..., :, :-1] |= frontier[..., :, 1:]
+        frontier = reach & smoke
+        if not frontier.any():
+            return ignited
+        ignited |= frontier
+        smoke &= ~frontier
+
+
+def burning_mask(fire_grid, poi_grid):
+    """
+    Intersecta las máscaras de POIs y de fuego activo.
+
+    Parámetros:
+        fire_grid (numpy.ndarray): Estados de fuego con forma (..., H, W).
+        poi_grid (numpy.ndarray): Máscara booleana de POIs con la misma forma.
+    Retorna:
+        numpy.ndarray: Máscara booleana de los POIs que se pierden en el fuego.
+    """
+    return poi_grid & (fire_grid == 2)
+
+
+class ReferenceFireEngine:
+    """
+    Motor de referencia: recorre celdas con ciclos de Python.
+    """
+    name = "reference"
+
+    def flashover_cells(self, model):
+        """
+        Calcula las celdas de humo que se encienden por flashover (recorrido desde todas las llamas a través del humo).
+
+        Parámetros:
+            model (ExplorerModel): Modelo con fire_grid y topology.
+        Retorna:
+            list: Celdas (y, x) que pasan de humo a fuego, en orden de filas.
+        """
+        grid = model.fire_grid
+        neighbors = model.topology.neighbors
+        frontier = [(x, y) for (y, x) in model._fire_cells if grid.item(y, x) == 2]
+        ignited = set()
+        while frontier:
+            cell = frontier.pop()
+            for n in neighbors[cell]:
+                if n not in ignited and grid.item(n[1], n[0]) == 1:
+                    ignited.add(n)
+                    frontier.append(n)
+        return sorted((y, x) for (x, y) in ignited)
+
+    def burning_pois(self, model):
+        """
+        Obtiene los POIs que están en celdas con fuego activo.
+
+        Parámetros:
+            model (ExplorerModel): Modelo con fire_grid y el índice de POIs.
+        Retorna:
+            list: Celdas (y, x) con POI y fuego, en orden de filas.
+        """
+        grid = model.fire_grid
+        return sorted((y, x) for (y, x) in model._pois if grid.item(y, x) == 2)
+
+
+class VectorizedFireEngine:
+    """
+    Motor vectorizado: resuelve cada fase con operaciones sobre máscaras H×W.
+    """
+    name = "vectorized"
+
+    def flashover_cells(self, model):
+        """
+        Calcula las celdas de humo que se encienden por flashover con flashover_mask.
+
+        Parámetros:
+            model (ExplorerModel): Modelo con fire_grid.
+        Retorna:
+            list: Celdas (y, x) que pasan de humo a fuego, en orden de filas.
+        """
+        ys, xs = np.nonzero(flashover_mask(model.fire_grid))
+        return list(zip(ys.tolist(), xs.tolist()))
+
+    def burning_pois(self, model):
+        """
+        Obtiene los POIs que están en celdas con fuego activo con burning_mask.
+
+        Parámetros:
+            model (ExplorerModel): Modelo con fire_grid y poi_grid.
+        Retorna:
+            list: Celdas (y, x) con POI y fuego, en orden de filas.
+        """
+        ys, xs = np.nonzero(burning_mask(model.fire_grid, model.poi_grid))
+        return list(zip(ys.tolist(), xs.tolist()))
+
+
+FIRE_ENGINES = {
+    ReferenceFireEngine.name: ReferenceFireEngine,
+    VectorizedFireEngine.name: VectorizedFireEngine,
+}
+DEFAULT_FIRE_ENGINE = ReferenceFireEngine.name
+
+
+def get_fire_engine(name=DEFAULT_FIRE_ENGINE):
+    """
+    Crea el motor de fuego indicado.
+
+    Parámetros:
+        name (str): Nombre del motor ('reference' o 'vectorized').
+    Retorna:
+        ReferenceFireEngine | VectorizedFireEngine: Instancia del motor.
+    """
+    if name not in FIRE_ENGINES:
+        raise ValueError(f"fire_engine inválido: {name}")
+    return FIRE_ENGINES[name]()
+
+
+def compare_fire_engines(model):
+    """
+    Verifica que ambos motores den el mismo resultado sobre el estado actual de un modelo
+    (por ejemplo desde on_step_callback durante una partida).
+
+    Parámetros:
+        model (ExplorerModel): Modelo a revisar.
+    Retorna:
+        dict: Fases en desacuerdo -> (resultado de referencia, resultado vectorizado); vacío si coinciden.
+    """
+    reference = ReferenceFireEngine()
+    vectorized = VectorizedFireEngine()
+    differences = {}
+    for phase in ("flashover_cells", "burning_pois"):
+        expected = getattr(reference, phase)(model)
+        actual = getattr(vectorized, phase)(model)
+        if expected != actual:
+            differences[phase] = (expected, actual)
+    return differences
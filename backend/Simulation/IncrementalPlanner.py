@@ -0,0 +1,309 @@
+"""
+Planificador incremental por agente (estilo D* Lite) para rutas hacia un conjunto fijo de objetivos.
+
+La búsqueda se hace desde los objetivos hacia el agente, así que moverse no invalida nada: entre
+una acción y la siguiente solo se reparan los vértices cuyas aristas cambiaron según el journal
+de cambios del modelo (fuego, paredes y puertas). Las llaves usan la distancia Manhattan al agente
+como heurística y el modificador km de D* Lite para no reordenar la cola cuando el agente avanza.
+
+El paso elegido es exactamente el mismo que regresa dijkstra_search: al terminar, toda celda en un
+camino óptimo desde el agente tiene su distancia exacta, y el desempate (objetivo menor y después
+primer paso menor) se resuelve sobre esas distancias.
+"""
+import heapq
+from Simulation.DistanceField import edge_cost, MAX_PATH_COST
+
+INF = float("inf")
+_NO_KEY = (INF, INF)
+
+
+class IncrementalPlanner:
+    """
+    Mantiene el árbol de búsqueda inverso de un agente entre llamadas y lo repara ante cambios del mundo.
+    """
+
+    def __init__(self, model, goals, step_cost=1, avoid_fire=False, can_chop=True):
+        """
+        Prepara la búsqueda inversa desde los objetivos (se inicia en la primera consulta).
+
+        Parámetros:
+            model (ExplorerModel): Modelo con el estado del mundo (usa topology y el journal de cambios).
+            goals (list): Celdas objetivo en formato (x, y).
+            step_cost (int): Costo base del movimiento (2 si el agente carga una víctima).
+            avoid_fire (bool): Asigna un costo prohibitivo a las celdas con fuego.
+            can_chop (bool): Indica si el agente puede romper paredes.
+        """
+        self.model = model
+        self.goals = frozenset(goals)
+        self.step_cost = step_cost
+        self.avoid_fire = avoid_fire
+        self.can_chop = can_chop
+        self._steps = model.topology.steps
+        self._reverse_steps = model.topology.reverse_steps
+        self._neighbors = model.topology.neighbors
+
+        self._g = {}
+        self._rhs = {}
+        # Costos de arista ya evaluados; se descartan solo los que tocan celdas modificadas
+        self._costs = {}
+        # Cola con borrado perezoso: _queued guarda la llave vigente de cada celda encolada
+        self._queue = []
+        self._queued = {}
+        self._start = None
+        self._km = 0
+        self._cursor = model.journal_cursor
+        self.expanded = 0
+
+    def _heuristic(self, cell):
+        """
+        Cota inferior del costo entre el agente y una celda: cada paso cuesta al menos step_cost.
+
+        Parámetros:
+            cell (tuple): Celda (x, y).
+        Retorna:
+            int: Estimación admisible y consistente.
+        """
+        return self.step_cost * (abs(cell[0] - self._start[0]) + abs(cell[1] - self._start[1]))
+
+    def _key(self, cell, value):
+        """
+        Calcula la llave de una celda a partir de min(g, rhs).
+
+        Parámetros:
+            cell (tuple): Celda (x, y).
+            value (int | float): min(g, rhs) de la celda.
+        Retorna:
+            tuple: (estimación total + km, min(g, rhs))
+        """
+        if value == INF:
+            return _NO_KEY
+        return (value + self._heuristic(cell) + self._km, value)
+
+    def _top_key(self):
+        """
+        Obtiene la menor llave vigente de la cola, descartando entradas obsoletas.
+
+        Retorna:
+            tuple: Llave mínima, o (INF, INF) si la cola está vacía.
+        """
+        queue = self._queue
+        queued = self._queued
+        while queue:
+            key = queue[0][0]
+            if queued.get(queue[0][1]) == key:
+                return key
+            heapq.heappop(queue)
+        return _NO_KEY
+
+    def _cost(self, u, v, wall_dir):
+        """
+        Obtiene el costo de la arista u -> v, evaluándolo con edge_cost solo la primera vez.
+
+        Parámetros:
+            u (tuple): Celda origen (x, y).
+            v (tuple): Celda destino (x, y).
+            wall_dir (int): Índice de dirección del movimiento (convención de dijkstra_search).
+        Retorna:
+            int: Costo del movimiento.
+        """
+        cost = self._costs.get((u, v))
+        if cost is None:
+            cost = self._costs[(u, v)] = edge_cost(self.model, u, v, wall_dir, self.step_cost,
+                                                   self.avoid_fire, self.can_chop)
+        return cost
+
+    def _queue_vertex(self, u, gu, rhs):
+        """
+        Encola la celda si es localmente inconsistente o la saca de la cola si ya es consistente.
+
+        Parámetros:
+            u (tuple): Celda (x, y).
+            gu (int | float): Valor g actual.
+            rhs (int | float): Valor rhs actual.
+        """
+        if gu != rhs:
+            value = gu if gu < rhs else rhs
+            start = self._start
+            key = (value + self.step_cost * (abs(u[0] - start[0]) + abs(u[1] - start[1])) + self._km, value)
+            self._queued[u] = key
+            heapq.heappush(self._queue, (key, u))
+        else:
+            self._queued.pop(u, None)
+
+    def _update_vertex(self, u):
+        """
+        Recalcula rhs(u) con las aristas actuales y actualiza su lugar en la cola.
+
+        Parámetros:
+            u (tuple): Celda (x, y).
+        """
+        g = self._g
+        if u not in self.goals:
+            costs = self._costs
+            best = INF
+            for v, wall_dir, _ in self._steps[u]:
+                gv = g.get(v, INF)
+                if gv == INF:
+                    continue
+                cost = costs.get((u, v))
+                if cost is None:
+                    cost = self._cost(u, v, wall_dir)
+                if gv + cost < best:
+                    best = gv + cost
+            # Igual que en dijkstra_search, un camino de costo >= MAX_PATH_COST se considera inviable
+            self._rhs[u] = best if best < MAX_PATH_COST else INF
+        self._queue_vertex(u, g.get(u, INF), self._rhs.get(u, INF))
+
+    def _lower_predecessors(self, v):
+        """
+        Actualiza rhs de los predecesores de v cuando bajó g(v): basta comparar contra la arista p -> v.
+
+        Parámetros:
+            v (tuple): Celda cuya distancia bajó (x, y).
+        """
+        gv = self._g[v]
+        goals = self.goals
+        rhs = self._rhs
+        costs = self._costs
+        for p, wall_dir, _ in self._reverse_steps[v]:
+            if p in goals:
+                continue
+            cost = costs.get((p, v))
+            if cost is None:
+                cost = self._cost(p, v, wall_dir)
+            total = gv + cost
+            if total < rhs.get(p, INF) and total < MAX_PATH_COST:
+                rhs[p] = total
+                self._queue_vertex(p, self._g.get(p, INF), total)
+
+    def _move_start(self, start):
+        """
+        Registra la nueva posición del agente. La primera vez siembra los objetivos; después solo
+        acumula km para que las llaves ya encoladas sigan siendo cotas inferiores válidas.
+
+        Parámetros:
+            start (tuple): Celda actual del agente (x, y).
+        """
+        if self._start is None:
+            self._start = start
+            for goal in self.goals:
+                self._rhs[goal] = 0
+                self._queue_vertex(goal, INF, 0)
+        elif start != self._start:
+            self._km += self._heuristic(start)
+            self._start = start
+
+    def _apply_changes(self):
+        """
+        Repara los vértices afectados por los cambios registrados en el journal desde la última consulta.
+        Un cambio de fuego solo altera las aristas que entran a la celda; uno de paredes o puertas,
+        las que entran y salen de ella.
+        """
+        journal = self.model.change_journal
+        if self._cursor == len(journal):
+            return
+        changes = journal[self._cursor:]
+        self._cursor = len(journal)
+        neighbors = self._neighbors
+        costs = self._costs
+        affected = set()
+        for kind, x, y in changes:
+            cell = (x, y)
+            if cell not in neighbors:
+                continue
+            if kind == "fires":
+                for n in neighbors[cell]:
+                    affected.add(n)
+                    costs.pop((n, cell), None)
+            elif kind == "edges":
+                affected.add(cell)
+                for n in neighbors[cell]:
+                    affected.add(n)
+                    costs.pop((n, cell), None)
+                    costs.pop((cell, n), None)
+        for u in affected:
+            self._update_vertex(u)
+
+    def _compute(self, start):
+        """
+        Expande vértices inconsistentes hasta que la distancia del agente sea definitiva.
+
+        Parámetros:
+            start (tuple): Celda actual del agente (x, y).
+        """
+        g = self._g
+        rhs = self._rhs
+        queue = self._queue
+        while True:
+            top = self._top_key()
+            g_start = g.get(start, INF)
+            rhs_start = rhs.get(start, INF)
+            if top == _NO_KEY or (top >= self._key(start, min(g_start, rhs_start)) and g_start == rhs_start):
+                return
+            k_old, u = heapq.heappop(queue)
+            gu = g.get(u, INF)
+            ru = rhs.get(u, INF)
+            k_new = self._key(u, min(gu, ru))
+            if k_old < k_new:
+                # La llave quedó vieja porque el agente se movió: se reencola con la actual
+                self._queued[u] = k_new
+                heapq.heappush(queue, (k_new, u))
+                continue
+            del self._queued[u]
+            self.expanded += 1
+            if gu > ru:
+                # Sobreconsistente: la distancia bajó y queda fija
+                g[u] = ru
+                self._lower_predecessors(u)
+            else:
+                # Subconsistente: la distancia subió; se invalida y se propaga
+                g[u] = INF
+                self._update_vertex(u)
+                for p, _, _ in self._reverse_steps[u]:
+                    self._update_vertex(p)
+
+    def next_step(self, start):
+        """
+        Obtiene el primer paso óptimo desde la posición del agente, reparando antes la búsqueda.
+
+        Parámetros:
+            start (tuple): Celda actual del agente (x, y).
+        Retorna:
+            tuple | None: Siguiente celda del camino (la misma celda si ya es objetivo), o None si no hay camino.
+        """
+        self._move_start(start)
+        self._apply_changes()
+        self._compute(start)
+        if self._g.get(start, INF) == INF:
+            return None
+        return self._resolve(start, {})[1]
+
+    def _resolve(self, u, memo):
+        """
+        Calcula el objetivo preferido y el primer paso de una celda con distancia definitiva,
+        con los mismos desempates que dijkstra_search (objetivo menor y, después, paso menor).
+
+        Parámetros:
+            u (tuple): Celda (x, y).
+            memo (dict): Resultados ya calculados en esta consulta.
+        Retorna:
+            tuple: (objetivo, primer paso)
+        """
+        if u in memo:
+            return memo[u]
+        if u in self.goals:
+            memo[u] = (u, u)
+            return memo[u]
+        dist = self._g[u]
+        best_target = None
+        best_step = None
+        for v, wall_dir, _ in self._steps[u]:
+            gv = self._g.get(v, INF)
+            if gv >= dist or gv + self._cost(u, v, wall_dir) != dist:
+                continue
+            t = self._resolve(v, memo)[0]
+            if best_target is None or t < best_target or (t == best_target and v < best_step):
+                best_target = t
+                best_step = v
+        memo[u] = (best_target, best_step)
+        return memo[u]
@@ -0,0 +1,239 @@
+"""
+Formato binario compacto para replays (alternativa al JSON anidado).
+
+Todos los valores son little-endian. Estructura:
+    Encabezado: magic 'FRRP', versión (B), end_reason (B), score (i), steps_total (I),
+                width (B), height (B), agents (B), seed (q, -1 si no existe), número de frames (I)
+    Cada frame: step (I), stats saved/lost (B, B) y damage (H)
+                agentes:  conteo (B) + registros id (H), x (B), y (B), flags (B: bit 0 = carga víctima, bits 1-2 = rol)
+                fuegos:   conteo (H) + registros y (B), x (B), state (B)
+                POIs:     conteo (H) + registros y (B), x (B), type (B), revealed (B)
+                paredes:  un nibble por celda (bit i = pared en la dirección i), dos celdas por byte
+                puertas:  conteo (B) + registros y1, x1, y2, x2, status (5 x B)
+"""
+import struct
+from Simulation.ReplayEncoding import decode_frames
+
+REPLAY_MIMETYPE = "application/x-firerescue-replay"
+
+MAGIC = b"FRRP"
+VERSION = 1
+
+END_REASONS = ("NOT_FINISHED", "WIN", "LOSS_VICTIMS", "LOSS_COLLAPSE", "TIMEOUT", "PRUNED")
+ROLES = ("Base", "Firefighter", "Rescue")
+POI_TYPES = ("f", "v")
+DOOR_STATUS = ("Closed", "Open")
+
+_HEADER = struct.Struct("<4sBBiIBBBqI")
+_FRAME_HEADER = struct.Struct("<IBBH")
+_COUNT_B = struct.Struct("<B")
+_COUNT_H = struct.Struct("<H")
+_AGENT = struct.Struct("<HBBB")
+_FIRE = struct.Struct("<BBB")
+_POI = struct.Struct("<BBBB")
+_DOOR = struct.Struct("<BBBBB")
+
+
+def _code(table, value, field):
+    """
+    Obtiene el código numérico de un valor categórico.
+
+    Parámetros:
+        table (tuple): Valores permitidos; el código es su índice.
+        value (str): Valor a codificar.
+        field (str): Nombre del campo (para el mensaje de error).
+    Retorna:
+        int: Índice del valor en la tabla.
+    """
+    try:
+        return table.index(value)
+    except ValueError:
+        raise ValueError(f"Valor no soportado en el formato binario para '{field}': {value}")
+
+
+def _pack_walls(walls, width, height):
+    """
+    Empaqueta las paredes de un frame como nibbles (4 bits por celda, dos celdas por byte).
+
+    Parámetros:
+        walls (list): Lista de 'height' cadenas con 4 caracteres por celda.
+        width (int): Ancho del grid.
+        height (int): Alto del grid.
+    Retorna:
+        bytes: Máscara de paredes empaquetada.
+    """
+    nibbles = []
+    for row in walls:
+        for x in range(width):
+            mask = 0
+            for d, c in enumerate(row[4 * x:4 * x + 4]):
+                if c != "0":
+                    mask |= 1 << d
+            nibbles.append(mask)
+    if len(nibbles) % 2:
+        nibbles.append(0)
+    return bytes(nibbles[i] | (nibbles[i + 1] << 4) for i in range(0, len(nibbles), 2))
+
+
+def _unpack_walls(data, offset, width, height):
+    """
+    Reconstruye las cadenas de paredes de un frame a partir de su máscara empaquetada.
+
+    Parámetros:
+        data (bytes): Contenido binario del replay.
+        offset (int): Posición donde inicia la máscara de paredes.
+        width (int): Ancho del grid.
+        height (int): Alto del grid.
+    Retorna:
+        tuple: (lista de cadenas de paredes por fila, nueva posición de lectura)
+    """
+    cells = width * height
+    size = (cells + 1) // 2
+    raw = data[offset:offset + size]
+    walls = []
+    for y in range(height):
+        row = []
+        for x in range(width):
+            i = y * width + x
+            mask = (raw[i // 2] >> (4 * (i % 2))) & 0xF
+            row.append("".join("1" if mask & (1 << d) else "0" for d in range(4)))
+        walls.append("".join(row))
+    return walls, offset + size
+
+
+def pack_replay(replay_data):
+    """
+    Serializa un replay (resultado de Simulation.get_results_json) al formato binario compacto.
+    Acepta replays con frames completos o codificados en modo delta.
+
+    Parámetros:
+        replay_data (dict): Diccionario con 'score', 'end_reason', 'steps_total' y 'data'.
+    Retorna:
+        bytes: Replay empaquetado.
+    """
+    simulation_data = replay_data["data"]
+    metadata = simulation_data["metadata"]
+    width, height = metadata["width"], metadata["height"]
+    seed = metadata.get("seed")
+
+    parts = [_HEADER.pack(
+        MAGIC, VERSION,
+        _code(END_REASONS, replay_data["end_reason"], "end_reason"),
+        replay_data["score"], replay_data["steps_total"],
+        width, height, metadata["agents"],
+        -1 if seed is None else seed,
+        len(simulation_data["frames"])
+    )]
+
+    # Las paredes cambian pocas veces en una partida: se empaqueta cada configuración distinta una sola vez
+    packed_walls = {}
+
+    for frame in decode_frames(simulation_data):
+        stats = frame["stats"]
+        parts.append(_FRAME_HEADER.pack(frame["step"], stats["saved"], stats["lost"], stats["damage"]))
+
+        parts.append(_COUNT_B.pack(len(frame["agents"])))
+        for a in frame["agents"]:
+            flags = (1 if a["carrying"] else 0) | (_code(ROLES, a["role"], "role") << 1)
+            parts.append(_AGENT.pack(a["id"], a["x"], a["y"], flags))
+
+        parts.append(_COUNT_H.pack(len(frame["fires"])))
+        for f in frame["fires"]:
+            parts.append(_FIRE.pack(f["y"], f["x"], f["state"]))
+
+        parts.append(_COUNT_H.pack(len(frame["pois"])))
+        for p in frame["pois"]:
+            parts.append(_POI.pack(p["y"], p["x"], _code(POI_TYPES, p["type"], "type"), 1 if p["revealed"] else 0))
+
+        walls_key = tuple(frame["walls"])
+        walls = packed_walls.get(walls_key)
+        if walls is None:
+            walls = packed_walls[walls_key] = _pack_walls(frame["walls"], width, height)
+        parts.append(walls)
+
+        parts.append(_COUNT_B.pack(len(frame["doors"])))
+        for d in frame["doors"]:
+            (y1, x1), (y2, x2) = d["p1"], d["p2"]
+            parts.append(_DOOR.pack(y1, x1, y2, x2, _code(DOOR_STATUS, d["status"], "status")))
+
+    return b"".join(parts)
+
+
+def unpack_replay(data):
+    """
+    Decodifica un replay binario al mismo diccionario que produce Simulation.get_results_json
+    (con frames completos y coordenadas de puertas como listas, igual que tras pasar por JSON).
+
+    Parámetros:
+        data (bytes): Replay empaquetado con pack_replay.
+    Retorna:
+        dict: Replay con 'score', 'end_reason', 'steps_total' y 'data' ('metadata' y 'frames').
+    """
+    (magic, version, reason_code, score, steps_total,
+     width, height, agents, seed, frame_count) = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("El contenido no es un replay binario de Fire Rescue")
+    if version != VERSION:
+        raise ValueError(f"Versión de replay binario no soportada: {version}")
+    offset = _HEADER.size
+
+    frames = []
+    for _ in range(frame_count):
+        step, saved, lost, damage = _FRAME_HEADER.unpack_from(data, offset)
+        offset += _FRAME_HEADER.size
+
+        (count,) = _COUNT_B.unpack_from(data, offset)
+        offset += _COUNT_B.size
+        agent_list = []
+        for _ in range(count):
+            agent_id, x, y, flags = _AGENT.unpack_from(data, offset)
+            offset += _AGENT.size
+            agent_list.append({"id": agent_id, "x": x, "y": y,
+                               "carrying": bool(flags & 1), "role": ROLES[flags >> 1]})
+
+        (count,) = _COUNT_H.unpack_from(data, offset)
+        offset += _COUNT_H.size
+        fires = []
+        for _ in range(count):
+            y, x, state = _FIRE.unpack_from(data, offset)
+            offset += _FIRE.size
+            fires.append({"y": y, "x": x, "state": state})
+
+        (count,) = _COUNT_H.unpack_from(data, offset)
+        offset += _COUNT_H.size
+        pois = []
+        for _ in range(count):
+            y, x, ptype, revealed = _POI.unpack_from(data, offset)
+            offset += _POI.size
+            pois.append({"y": y, "x": x, "type": POI_TYPES[ptype], "revealed": bool(revealed)})
+
+        walls, offset = _unpack_walls(data, offset, width, height)
+
+        (count,) = _COUNT_B.unpack_from(data, offset)
+        offset += _COUNT_B.size
+        doors = []
+        for _ in range(count):
+            y1, x1, y2, x2, status = _DOOR.unpack_from(data, offset)
+            offset += _DOOR.size
+            doors.append({"p1": [y1, x1], "p2": [y2, x2], "status": DOOR_STATUS[status]})
+
+        frames.append({
+            "step": step,
+            "agents": agent_list,
+            "fires": fires,
+            "pois": pois,
+            "walls": walls,
+            "doors": doors,
+            "stats": {"saved": saved, "lost": lost, "damage": damage}
+        })
+
+    return {
+        "score": score,
+        "end_reason": END_REASONS[reason_code],
+        "steps_total": steps_total,
+        "data": {
+            "metadata": {"width": width, "height": height, "agents": agents,
+                         "seed": None if seed == -1 else seed},
+            "frames": frames
+        }
+    }
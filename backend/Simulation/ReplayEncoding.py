@@ -0,0 +1,254 @@
+"""
+Codificación delta de replays: keyframes periódicos más diferencias por frame.
+
+Un replay en modo 'delta' guarda un frame completo (keyframe) cada N frames y, entre ellos,
+solo los campos que cambiaron respecto al frame anterior:
+    - agents / walls: lista indexada {"set": [[indice, valor], ...]}
+    - fires / pois / doors: cambios por clave {"upsert": [...], "remove": [clave, ...]}
+    - stats: diccionario completo si cambió
+Si un cambio no puede expresarse de forma exacta (p. ej. cambia el orden de la lista)
+se guarda la lista completa como {"full": [...]}.
+"""
+
+DEFAULT_KEYFRAME_INTERVAL = 50
+
+# Campos de lista indexados por posición (longitud normalmente constante)
+_INDEXED_FIELDS = ("agents", "walls")
+
+# Campos de lista cuyos elementos se identifican por una clave (posición o par de celdas)
+_KEYED_FIELDS = {
+    "fires": lambda f: (f["y"], f["x"]),
+    "pois": lambda p: (p["y"], p["x"]),
+    "doors": lambda d: (tuple(d["p1"]), tuple(d["p2"])),
+}
+
+
+def _normalize_key(key):
+    """
+    Convierte una clave deserializada (listas anidadas de JSON) a tuplas para poder compararla.
+
+    Parámetros:
+        key (list | tuple): Clave de un elemento (p. ej. [y, x] o [[y1, x1], [y2, x2]]).
+    Retorna:
+        tuple: Clave equivalente formada únicamente por tuplas.
+    """
+    return tuple(_normalize_key(k) if isinstance(k, (list, tuple)) else k for k in key)
+
+
+def _diff_indexed(prev_list, cur_list):
+    """
+    Calcula las diferencias entre dos listas indexadas por posición.
+
+    Parámetros:
+        prev_list (list): Lista del frame anterior.
+        cur_list (list): Lista del frame actual.
+    Retorna:
+        dict | None: Delta del campo, o None si no hubo cambios.
+    """
+    if prev_list is cur_list:
+        return None
+    if len(prev_list) != len(cur_list):
+        return {"full": cur_list}
+    changes = [[i, item] for i, (old, item) in enumerate(zip(prev_list, cur_list)) if old != item]
+    return {"set": changes} if changes else None
+
+
+def _diff_keyed(prev_list, cur_list, key_fn):
+    """
+    Calcula las diferencias entre dos listas cuyos elementos se identifican por clave.
+    Verifica que el orden reconstruido por el decodificador coincida con el real.
+
+    Parámetros:
+        prev_list (list): Lista del frame anterior.
+        cur_list (list): Lista del frame actual.
+        key_fn (function): Función que obtiene la clave de un elemento.
+    Retorna:
+        dict | None: Delta del campo, o None si no hubo cambios.
+    """
+    if prev_list is cur_list:
+        return None
+    prev_map = {key_fn(item): item for item in prev_list}
+    cur_map = {key_fn(item): item for item in cur_list}
+    if len(prev_map) != len(prev_list) or len(cur_map) != len(cur_list):
+        # Claves repetidas: no se puede codificar por clave
+        return None if prev_list == cur_list else {"full": cur_list}
+
+    removed = [k for k in prev_map if k not in cur_map]
+    upserts = [item for k, item in cur_map.items() if prev_map.get(k) != item]
+    if not removed and not upserts:
+        return None
+
+    # Orden que obtendría el decodificador: se conservan los existentes y se agregan los nuevos al final
+    expected = [k for k in prev_map if k in cur_map] + [k for k in cur_map if k not in prev_map]
+    if expected != list(cur_map):
+        return {"full": cur_list}
+
+    delta = {}
+    if upserts:
+        delta["upsert"] = upserts
+    if removed:
+        delta["remove"] = [list(k) for k in removed]
+    return delta
+
+
+def encode_delta(prev_frame, frame):
+    """
+    Genera el frame delta que transforma 'prev_frame' en 'frame'.
+
+    Parámetros:
+        prev_frame (dict): Frame completo anterior.
+        frame (dict): Frame completo actual.
+    Retorna:
+        dict: Frame delta con el paso y únicamente los campos modificados.
+    """
+    delta = {"step": frame["step"]}
+    for field in _INDEXED_FIELDS:
+        change = _diff_indexed(prev_frame[field], frame[field])
+        if change is not None:
+            delta[field] = change
+    for field, key_fn in _KEYED_FIELDS.items():
+        change = _diff_keyed(prev_frame[field], frame[field], key_fn)
+        if change is not None:
+            delta[field] = change
+    if prev_frame["stats"] != frame["stats"]:
+        delta["stats"] = frame["stats"]
+    return delta
+
+
+def apply_delta(prev_frame, delta):
+    """
+    Reconstruye un frame completo aplicando un frame delta sobre el frame anterior.
+
+    Parámetros:
+        prev_frame (dict): Frame completo anterior.
+        delta (dict): Frame delta generado por encode_delta.
+    Retorna:
+        dict: Nuevo frame completo (los elementos sin cambios se comparten con prev_frame).
+    """
+    frame = dict(prev_frame)
+    frame["step"] = delta["step"]
+
+    for field in _INDEXED_FIELDS:
+        change = delta.get(field)
+        if change is None:
+            continue
+        if "full" in change:
+            frame[field] = change["full"]
+        else:
+            items = list(prev_frame[field])
+            for i, item in change["set"]:
+                items[i] = item
+            frame[field] = items
+
+    for field, key_fn in _KEYED_FIELDS.items():
+        change = delta.get(field)
+        if change is None:
+            continue
+        if "full" in change:
+            frame[field] = change["full"]
+            continue
+        items = {_normalize_key(key_fn(item)): item for item in prev_frame[field]}
+        for key in change.get("remove", []):
+            items.pop(_normalize_key(key), None)
+        for item in change.get("upsert", []):
+            items[_normalize_key(key_fn(item))] = item
+        frame[field] = list(items.values())
+
+    if "stats" in delta:
+        frame["stats"] = delta["stats"]
+    return frame
+
+
+def _strip_keyframe(frame):
+    """
+    Obtiene el frame completo a partir de un keyframe eliminando su marca.
+
+    Parámetros:
+        frame (dict): Keyframe almacenado.
+    Retorna:
+        dict: Frame completo sin la marca 'keyframe'.
+    """
+    return {k: v for k, v in frame.items() if k != "keyframe"}
+
+
+def is_delta_encoded(simulation_data):
+    """
+    Indica si los datos de simulación están almacenados en modo delta.
+
+    Parámetros:
+        simulation_data (dict): Diccionario con 'metadata' y 'frames'.
+    Retorna:
+        bool: True si los frames están codificados como keyframes + deltas.
+    """
+    return simulation_data.get("encoding", {}).get("mode") == "delta"
+
+
+def decode_frames(simulation_data):
+    """
+    Recorre los frames de una simulación devolviendo siempre frames completos.
+    Funciona tanto con replays completos como con replays en modo delta.
+
+    Parámetros:
+        simulation_data (dict): Diccionario con 'metadata' y 'frames'.
+    Retorna:
+        generator: Frames completos en orden.
+    """
+    if not is_delta_encoded(simulation_data):
+        yield from simulation_data["frames"]
+        return
+
+    current = None
+    for stored in simulation_data["frames"]:
+        if stored.get("keyframe"):
+            current = _strip_keyframe(stored)
+        else:
+            current = apply_delta(current, stored)
+        yield current
+
+
+def get_frame(simulation_data, index):
+    """
+    Reconstruye un único frame partiendo del keyframe anterior más cercano.
+
+    Parámetros:
+        simulation_data (dict): Diccionario con 'metadata' y 'frames'.
+        index (int): Índice del frame solicitado.
+    Retorna:
+        dict: Frame completo en la posición indicada.
+    """
+    frames = simulation_data["frames"]
+    if not is_delta_encoded(simulation_data):
+        return frames[index]
+
+    if index < 0:
+        index += len(frames)
+    start = index
+    while not frames[start].get("keyframe"):
+        start -= 1
+
+    current = _strip_keyframe(frames[start])
+    for stored in frames[start + 1:index + 1]:
+        current = apply_delta(current, stored)
+    return current
+
+
+def expand_replay(replay_data):
+    """
+    Convierte un replay (resultado de Simulation.get_results_json) a frames completos.
+    Si ya está en formato completo se retorna sin cambios.
+
+    Parámetros:
+        replay_data (dict): Diccionario con 'score', 'end_reason', 'steps_total' y 'data'.
+    Retorna:
+        dict: Replay equivalente con la lista completa de frames.
+    """
+    simulation_data = replay_data["data"]
+    if not is_delta_encoded(simulation_data):
+        return replay_data
+
+    expanded = dict(replay_data)
+    expanded["data"] = {
+        "metadata": simulation_data["metadata"],
+        "frames": list(decode_frames(simulation_data)),
+    }
+    return expanded
@@ -1,6 +1,21 @@
 import random
 import json
 from Simulation.ExplorerModel import ExplorerModel
+from Simulation.FireEngine import DEFAULT_FIRE_ENGINE
+from Simulation.SlimGrid import DEFAULT_GRID
+from Simulation.ReplayEncoding import DEFAULT_KEYFRAME_INTERVAL, encode_delta
+
+# Pesos de calculate_final_score
+W_SAVED = 100       # Premio alto por cada víctima salvada
+W_LOST = -50        # Castigo por cada víctima perdida
+W_DAMAGE = -10      # Castigo moderado por cada punto de daño estructural
+W_STEPS = -0.5      # Castigo pequeño por cada paso (incentiva eficiencia)
+W_WIN = 200         # Bonificación adicional por victoria
+
+# Máximo de víctimas salvadas al terminar una partida: se gana con 7, pero el fin de juego se revisa
+# después del turno completo de cada agente y en ese último turno se pueden entregar hasta 3 víctimas
+# (las situaciones activas que repone el modelo), así que una victoria puede terminar con 6 + 3
+MAX_VICTIMS_SAVED = 9
 
 class Simulation:
     """
@@ -8,7 +23,9 @@ class Simulation:
     Gestiona la ejecución del modelo, el registro de frames y el cálculo de puntajes.
     """
     
-    def __init__(self, width, height, agents, pa, strategy="random"):
+    def __init__(self, width, height, agents, pa, strategy="random",
+                 replay_mode="full", keyframe_interval=DEFAULT_KEYFRAME_INTERVAL, seed=None,
+                 fire_engine=DEFAULT_FIRE_ENGINE, grid=DEFAULT_GRID):
         """
         Inicializa una nueva simulación con los parámetros especificados.
         
@@ -18,37 +35,126 @@ class Simulation:
             agents (int): Número de agentes a desplegar
             pa (int): Puntos de acción (energía máxima) de cada agente
             strategy (str): Estrategia de despliegue de agentes ('random' o 'intelligent')
+            replay_mode (str): Formato de almacenamiento de frames ('full', 'delta', 'none' para no registrarlos
+                               o 'stream' para entregarlos con iter_frames sin acumularlos)
+            keyframe_interval (int): Cada cuántos frames se guarda un keyframe completo en modo 'delta'
+            seed (int): Semilla que determina la partida; con la misma semilla se reproduce la misma simulación
+                        (None para elegir una aleatoria, disponible en self.seed)
+            fire_engine (str): Motor de dinámica del fuego ('reference' o 'vectorized'; ambos dan la misma partida)
+            grid (str): Almacén de posiciones de agentes ('mesa' o 'slim'; ambos dan la misma partida)
         """
+        if replay_mode not in ("full", "delta", "none", "stream"):
+            raise ValueError(f"replay_mode inválido: {replay_mode}")
+
+        # Toda la aleatoriedad de la partida proviene del generador del modelo creado con esta semilla;
+        # si no se especifica se elige una para que la corrida siempre pueda reproducirse
+        if seed is None:
+            seed = random.randrange(2 ** 31)
+        self.seed = seed
         
         # Crea el modelo con callback para registrar cada cambio de estado
         self.model = ExplorerModel(width, height, agents, pa, strategy=strategy, 
-                                   on_step_callback=self.record_frame, printable=False)
+                                   on_step_callback=self.record_frame, printable=False, seed=seed,
+                                   fire_engine=fire_engine, grid=grid)
         
         # Estructura para almacenar todos los frames de la simulación
         self.simulation_data = {
             "metadata": {
                 "width": width, 
                 "height": height, 
-                "agents": agents
+                "agents": agents,
+                "seed": seed
             },
             "frames": []
         }
+
+        # En modo delta solo se conserva el último frame completo para calcular diferencias
+        self.replay_mode = replay_mode
+        self.keyframe_interval = max(1, keyframe_interval)
+        self._last_frame = None
+        self._pending_frames = []
+        # Partes de frame ya construidas: nombre -> (versión del subestado del modelo, valor)
+        self._frame_parts = {}
+        if replay_mode == "delta":
+            self.simulation_data["encoding"] = {
+                "mode": "delta",
+                "keyframe_interval": self.keyframe_interval
+            }
         
-        # Estado final de la simulación (WIN, LOSS_VICTIMS, LOSS_COLLAPSE, TIMEOUT)
+        # Estado final de la simulación (WIN, LOSS_VICTIMS, LOSS_COLLAPSE, TIMEOUT o PRUNED si se abandonó)
         self.end_reason = "NOT_FINISHED" 
 
-    def run(self):
+    def run(self, max_rounds=None, prune_below=None):
         """
-        Ejecuta la simulación completa hasta que termine por victoria, derrota o timeout.
+        Ejecuta la simulación hasta que termine por victoria, derrota o timeout.
         Registra un frame después de cada paso del modelo.
+        Con max_rounds la ejecución se pausa tras esa cantidad de rondas (llamadas a model.step) y una
+        llamada posterior a run la continúa; la partida y sus frames son los mismos que sin pausas.
+        Con prune_below la partida se abandona (end_reason 'PRUNED') en cuanto su score_upper_bound queda
+        por debajo del umbral; una partida abandonada ya no continúa.
+
+        Parámetros:
+            max_rounds (int): Máximo de rondas a ejecutar en esta llamada (None para jugar hasta el final)
+            prune_below (function): Función sin argumentos que regresa el puntaje a superar, consultada después
+                                    de cada ronda (None si todavía no hay umbral)
+
+        Retorna:
+            bool: True si la partida terminó o se abandonó, False si se pausó por max_rounds
         """
+        if self.end_reason == "PRUNED":
+            return True
+
+        rounds = 0
         while self.model.running:
+            if max_rounds is not None and rounds >= max_rounds:
+                return False
             self.record_frame()
             self.model.step()
             self.check_game_status()
+            rounds += 1
+
+            # Abandona la partida si ni en el mejor caso puede superar el umbral
+            if prune_below is not None and self.model.running:
+                threshold = prune_below()
+                if threshold is not None and self.score_upper_bound() < threshold:
+                    self.end_reason = "PRUNED"
+                    break
         
         # Registra el frame final después de que termine la simulación
         self.record_frame()
+        return True
+
+    def iter_frames(self):
+        """
+        Ejecuta la simulación completa entregando cada frame en cuanto se produce.
+        Solo se conservan en memoria los frames generados durante el paso en curso,
+        por lo que la lista completa de frames nunca se construye. Requiere replay_mode='stream'.
+
+        Retorna:
+            generator: Frames completos en el orden en que se registran
+        """
+        if self.replay_mode != "stream":
+            raise ValueError("iter_frames requiere replay_mode='stream'")
+
+        while self.model.running:
+            self.record_frame()
+            self.model.step()
+            self.check_game_status()
+            yield from self._drain_pending_frames()
+
+        # Registra el frame final después de que termine la simulación
+        self.record_frame()
+        yield from self._drain_pending_frames()
+
+    def _drain_pending_frames(self):
+        """
+        Entrega y descarta los frames acumulados desde la última llamada.
+
+        Retorna:
+            list: Frames pendientes en orden de registro
+        """
+        frames, self._pending_frames = self._pending_frames, []
+        return frames
 
     def check_game_status(self):
         """
@@ -65,13 +171,43 @@ class Simulation:
 
     def record_frame(self):
         """
-        Captura el estado completo del modelo en el paso actual.
+        Captura el estado completo del modelo en el paso actual y lo almacena según el modo de replay.
+        En modo 'full' guarda el frame completo; en modo 'delta' guarda un keyframe cada
+        'keyframe_interval' frames y, entre ellos, solo las diferencias con el frame anterior.
+        En modo 'stream' el frame queda pendiente hasta que iter_frames lo entrega.
+        En modo 'none' no se registra nada (corridas que solo necesitan métricas).
+        """
+        if self.replay_mode == "none":
+            return
+
+        frame = self.build_frame()
+        frames = self.simulation_data["frames"]
+
+        if self.replay_mode == "stream":
+            self._pending_frames.append(frame)
+        elif self.replay_mode == "delta":
+            if len(frames) % self.keyframe_interval == 0:
+                frames.append(dict(frame, keyframe=True))
+            else:
+                frames.append(encode_delta(self._last_frame, frame))
+            self._last_frame = frame
+        else:
+            frames.append(frame)
+
+    def build_frame(self):
+        """
+        Construye el frame completo del estado actual del modelo.
         Registra posiciones de agentes, fuegos, POIs, paredes, puertas y estadísticas.
         Cada frame permite reconstruir visualmente el estado de la simulación.
+        Las partes cuyo subestado no cambió desde el frame anterior (según model.versions)
+        se reutilizan en lugar de reconstruirse, por lo que frames consecutivos pueden compartirlas.
+
+        Retorna:
+            dict: Frame completo con el estado del paso actual
         """
-        frame = {
+        return {
             "step": self.model.steps,
-            "agents": [
+            "agents": self._frame_part("agents", "agents", lambda: [
                 {
                     "id": a.id, 
                     "x": a.pos[0], 
@@ -80,16 +216,16 @@ class Simulation:
                     "role": getattr(a, "role", "Base")
                 } 
                 for a in self.model.agents_list
-            ],
-            "fires": [
+            ]),
+            "fires": self._frame_part("fires", "fires", lambda: [
                 {
                     "y": f[0], 
                     "x": f[1], 
                     "state": f[2]  # 1=humo, 2=fuego
                 } 
                 for f in self.model.fires
-            ],
-            "pois": [
+            ]),
+            "pois": self._frame_part("pois", "pois", lambda: [
                 {
                     "y": p[0], 
                     "x": p[1], 
@@ -97,16 +233,16 @@ class Simulation:
                     "revealed": (p[3] if len(p) > 3 else False)
                 } 
                 for p in self.model.pois
-            ],
-            "walls": ["".join(row) for row in self.model.walls],
-            "doors": [
+            ]),
+            "walls": self._frame_part("walls", "edges", lambda: ["".join(row) for row in self.model.walls]),
+            "doors": self._frame_part("doors", "edges", lambda: [
                 {
                     "p1": d[0], 
                     "p2": d[1], 
                     "status": d[2]
                 } 
                 for d in self.model.doors
-            ],
+            ]),
             "stats": {
                 "saved": self.model.victims_saved, 
                 "lost": self.model.victims_lost, 
@@ -119,7 +255,26 @@ class Simulation:
             #"doors": [{"p1": d[0], "p2": d[1], "status": d[2]} for d in self.model.doors],
             #"stats": {"saved": self.model.victims_saved, "lost": self.model.victims_lost, "damage": self.model.damage_taken}
         }
-        self.simulation_data["frames"].append(frame)
+
+    def _frame_part(self, name, kind, build):
+        """
+        Obtiene una parte del frame, reconstruyéndola solo si su subestado cambió desde la última vez.
+
+        Parámetros:
+            name (str): Nombre de la parte del frame ('agents', 'fires', 'walls', ...)
+            kind (str): Subestado del modelo del que depende ('agents', 'fires', 'pois' o 'edges')
+            build (function): Función que construye la parte a partir del modelo
+
+        Retorna:
+            list: Parte del frame (compartida entre frames mientras no cambie)
+        """
+        version = self.model.versions[kind]
+        cached = self._frame_parts.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        value = build()
+        self._frame_parts[name] = (version, value)
+        return value
 
     def evaluate(self):
         """
@@ -157,12 +312,6 @@ class Simulation:
         Retorna:
             float: Puntaje final considerando víctimas, daño y pasos ejecutados
         """
-        # Definición de pesos para cada métrica
-        W_SAVED = 100       # Premio alto por cada víctima salvada
-        W_LOST = -50        # Castigo por cada víctima perdida
-        W_DAMAGE = -10      # Castigo moderado por cada punto de daño estructural
-        W_STEPS = -0.5      # Castigo pequeño por cada paso (incentiva eficiencia)
-
         score = (self.model.victims_saved * W_SAVED) + \
                 (self.model.victims_lost * W_LOST) + \
                 (self.model.damage_taken * W_DAMAGE) + \
@@ -170,10 +319,26 @@ class Simulation:
         
         # Bonificación adicional por victoria
         if self.end_reason == "WIN":
-            score += 200
+            score += W_WIN
             
         return score
 
+    def score_upper_bound(self):
+        """
+        Calcula una cota superior optimista del puntaje final (calculate_final_score) que la partida aún puede
+        alcanzar: supone que gana con el máximo de víctimas salvadas posible y sin más pérdidas, daño ni pasos.
+        Las víctimas perdidas, el daño y los pasos solo aumentan, así que el puntaje final nunca la supera.
+
+        Retorna:
+            float: Puntaje final si la partida ya terminó; si no, la cota superior
+        """
+        if not self.model.running:
+            return self.calculate_final_score()
+        return (MAX_VICTIMS_SAVED * W_SAVED) + W_WIN + \
+               (self.model.victims_lost * W_LOST) + \
+               (self.model.damage_taken * W_DAMAGE) + \
+               (self.model.steps * W_STEPS)
+
     def get_results_json(self):
         """
         Genera un diccionario con todos los resultados de la simulación para serialización.
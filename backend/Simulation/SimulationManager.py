@@ -1,42 +1,145 @@
+import math
+import queue
 import random
+import statistics
+import time
 import multiprocessing
+from contextlib import nullcontext
 from tqdm import tqdm
 from Simulation.Simulation import Simulation
+from Simulation.BatchEngine import run_random_batch
+from Simulation.WorkerPool import WorkerPool, TaskCancelled, read_threshold, raise_threshold
+
+# Motores para ejecutar lotes: 'simulation' corre una Simulation por tarea en el pool (referencia);
+# 'batched' avanza todas las partidas 'random' juntas en arreglos de NumPy (ver BatchEngine)
+BATCH_ENGINES = ("simulation", "batched")
+
+# Búsqueda por mitades sucesivas: fracción de partidas que sobrevive cada ronda de eliminación
+# y cantidad de rondas de juego de la primera (se multiplica por 1 / keep_ratio en cada etapa)
+DEFAULT_KEEP_RATIO = 0.25
+DEFAULT_MIN_ROUNDS = 4
+# Cada etapa vuelve a jugar a las sobrevivientes desde la ronda 0, así que con fracciones mayores habría
+# tantas etapas que la búsqueda costaría más que jugar todas las partidas completas
+MAX_KEEP_RATIO = 0.5
+
+# Búsqueda con presupuesto de tiempo: partidas pendientes por worker (mantiene ocupados a todos los
+# workers sin acumular trabajo que seguiría corriendo después de la fecha límite)
+DEFAULT_IN_FLIGHT_PER_WORKER = 2
+
+# Paro secuencial de lotes: confianza de los intervalos, partidas por bloque según el motor
+# (el motor 'batched' amortiza mejor bloques grandes) y máximo de partidas si no se alcanza la precisión
+DEFAULT_CONFIDENCE = 0.95
+SEQUENTIAL_CHUNK_SIZES = {"simulation": 100, "batched": 1000}
+DEFAULT_MAX_ITERATIONS = 10000
+
+
+def wilson_interval(successes, total, confidence=DEFAULT_CONFIDENCE):
+    """
+    Calcula el intervalo de Wilson para una proporción (p. ej. la tasa de victorias).
+    A diferencia del intervalo normal, no colapsa a ancho cero cuando no hay (o solo hay) éxitos.
+
+    Parámetros:
+        successes (int): Cantidad de éxitos
+        total (int): Cantidad de ensayos
+        confidence (float): Nivel de confianza (entre 0 y 1)
+
+    Retorna:
+        tuple: (límite inferior, límite superior) entre 0 y 1; (0, 1) si no hay ensayos
+    """
+    if total == 0:
+        return 0.0, 1.0
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / total
+    denominator = 1 + z * z / total
+    center = (p + z * z / (2 * total)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    # En los extremos el límite correspondiente es exacto (evita residuos de redondeo)
+    low = 0.0 if successes == 0 else max(0.0, center - margin)
+    high = 1.0 if successes == total else min(1.0, center + margin)
+    return low, high
+
+
+def mean_interval(values, confidence=DEFAULT_CONFIDENCE):
+    """
+    Calcula el intervalo normal para la media de una muestra (p. ej. el puntaje promedio).
+
+    Parámetros:
+        values (list): Valores de la muestra
+        confidence (float): Nivel de confianza (entre 0 y 1)
+
+    Retorna:
+        tuple: (media, límite inferior, límite superior); los límites son infinitos con menos de 2 valores
+    """
+    if not values:
+        return 0.0, -math.inf, math.inf
+    mean = statistics.fmean(values)
+    if len(values) < 2:
+        return mean, -math.inf, math.inf
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    margin = z * statistics.stdev(values, mean) / math.sqrt(len(values))
+    return mean, mean - margin, mean + margin
+
+
+def _ranking_key(result):
+    """
+    Llave para ordenar resultados de mejor a peor: puntaje descendente y, en empates, id ascendente, para que
+    el orden (y la mejor corrida que se guarda en la caché) no dependa del orden en que terminan los workers.
+
+    Parámetros:
+        result (dict): Resultado de _worker_simulation
+
+    Retorna:
+        tuple: (-puntaje, id)
+    """
+    return -result["score"], result["id"]
+
 
 def _worker_simulation(args):
     """
     Función ejecutada por cada proceso worker para realizar una simulación independiente.
     Se ejecuta en paralelo en diferentes núcleos de CPU para optimizar el rendimiento.
-    
+    Solo regresa métricas y la semilla; el replay se regenera en el proceso padre cuando se necesita.
+
     Parámetros:
-        args (tuple): Tupla con (width, height, agents, pa, )
-    
+        args (tuple): Tupla con (id, width, height, agents, pa, strategy, seed) y, opcionalmente, max_rounds
+                      para jugar solo las primeras rondas de la partida y el token de un umbral compartido
+                      (WorkerPool.score_threshold) para abandonarla si ya no puede superar a la mejor
+
     Retorna:
-        dict: Diccionario con métricas de la simulación y datos completos de reproducción
+        dict: Diccionario con métricas de la simulación y la semilla que la produjo
+              ('finished' indica si la partida terminó o se detuvo por max_rounds; las abandonadas
+              terminan con end_reason 'PRUNED')
     """
-    width, height, agents, pa, strategy = args
-    
-    # Ejecuta la simulación completa con los parámetros especificados
-    sim = Simulation(width, height, agents, pa, strategy=strategy)
-    sim.run()
-    
-    # Obtiene los datos completos de reproducción (todos los frames)
-    full_replay_data = sim.get_results_json()
-    
+    run_id, width, height, agents, pa, strategy, seed = args[:7]
+    max_rounds = args[7] if len(args) > 7 else None
+    threshold = args[8] if len(args) > 8 else None
+    prune_below = (lambda: read_threshold(threshold)) if threshold is not None else None
+
+    # Ejecuta la simulación sin registrar frames (el replay se reconstruye por semilla)
+    # con el grid ligero: sin visualización no se necesita MultiGrid y la partida es la misma
+    sim = Simulation(width, height, agents, pa, strategy=strategy, replay_mode="none", seed=seed, grid="slim")
+    finished = sim.run(max_rounds=max_rounds, prune_below=prune_below)
+
     # Calcula el puntaje final considerando víctimas, daño y eficiencia
     final_score = sim.calculate_final_score()
 
+    # Una partida completa sube el umbral para que las demás tareas de la búsqueda lo usen de inmediato
+    if threshold is not None and finished and sim.end_reason != "PRUNED":
+        raise_threshold(threshold, final_score)
+
     # Calcula la distancia total recorrida por todos los agentes (suma de movimientos individuales)
     total_movements = sum(agent.movement_count for agent in sim.model.agents_list)
 
     return {
+        "id": run_id,
+        "seed": seed,
         "score": final_score,
         "end_reason": sim.end_reason,
         "steps": sim.model.steps,
         "damage": sim.model.damage_taken,
         "saved": sim.model.victims_saved,
-        "replay_data": full_replay_data,
         "total_distance": total_movements,
+        "finished": finished,
     }
 
 
@@ -46,11 +149,110 @@ class SimulationManager:
     Utiliza multiprocessing para ejecutar simulaciones simultáneas en todos los núcleos disponibles.
     """
 
-    def run_batch_experiment(self, width, height, agents, pa, iterations, strategy_name):
+    def __init__(self, pool=None, background=False, cancel_event=None, boost_event=None):
+        """
+        Inicializa el gestor.
+
+        Parámetros:
+            pool (WorkerPool): Pool persistente a reutilizar. Si es None, cada lote crea y cierra su propio pool.
+            background (bool): Ejecuta los lotes con prioridad baja (WorkerPool.imap_background), cediendo el
+                               pool al trabajo interactivo; requiere un pool persistente
+            cancel_event (threading.Event): Cancela los lotes en curso: dejan de esperar resultados y lanzan
+                                            TaskCancelled (en segundo plano, además, dejan de enviar tareas)
+            boost_event (threading.Event): En segundo plano, al activarse los lotes dejan de ceder el pool
+        """
+        if background and pool is None:
+            raise ValueError("background requiere un WorkerPool persistente")
+        self.pool = pool
+        self.background = background
+        self.cancel_event = cancel_event
+        self.boost_event = boost_event
+
+    def _score_threshold(self, pool, prune, replay_top):
+        """
+        Reserva un umbral de puntaje compartido con los workers para abandonar las partidas que ya no pueden
+        ser la mejor. Solo es posible con un WorkerPool y cuando interesa únicamente la mejor corrida.
+
+        Parámetros:
+            pool (WorkerPool): Pool en el que corren las tareas (None si se usa un multiprocessing.Pool temporal)
+            prune (bool): Si se deben abandonar las partidas sin posibilidad de superar a la mejor
+            replay_top (int): Cantidad de mejores corridas solicitadas
+
+        Retorna:
+            contextmanager: Produce el token del umbral para las tareas, o None si no se poda
+        """
+        if prune and replay_top > 1:
+            raise ValueError("prune solo admite replay_top de 0 o 1 (solo se conserva la mejor corrida)")
+        if prune and pool is not None:
+            return pool.score_threshold()
+        return nullcontext()
+
+    @staticmethod
+    def _split_pruned(results):
+        """
+        Separa las partidas abandonadas por la poda de las que terminaron.
+
+        Parámetros:
+            results (list): Resultados de _worker_simulation
+
+        Retorna:
+            tuple: (resultados sin las abandonadas, cantidad de abandonadas)
+        """
+        kept = [res for res in results if res["end_reason"] != "PRUNED"]
+        return kept, len(results) - len(kept)
+
+    def _run_tasks(self, tasks_args, desc, progress_callback=None):
+        """
+        Ejecuta las tareas de simulación en paralelo y regresa sus resultados conforme terminan.
+
+        Parámetros:
+            tasks_args (list): Argumentos de cada llamada a _worker_simulation
+            desc (str): Texto de la barra de progreso
+            progress_callback (function): Función llamada como progress_callback(completadas, total) tras cada resultado
+
+        Retorna:
+            list: Resultados de todas las tareas
+        """
+        num_cores = self.pool.processes if self.pool else multiprocessing.cpu_count()
+        results = []
+
+        if not tasks_args:
+            return results
+
+        # Enviamos tareas en grupos para reducir overhead de llamadas
+        chunk_size = max(1, len(tasks_args) // (num_cores * 4))
+
+        if self.pool is not None:
+            if self.background:
+                iterator = self.pool.imap_background(_worker_simulation, tasks_args, cancel_event=self.cancel_event,
+                                                     boost_event=self.boost_event)
+            else:
+                iterator = self.pool.imap_unordered(_worker_simulation, tasks_args, chunksize=chunk_size)
+            for res in tqdm(iterator, total=len(tasks_args), desc=desc, unit="sim"):
+                if self.cancel_event is not None and self.cancel_event.is_set():
+                    raise TaskCancelled()
+                results.append(res)
+                if progress_callback:
+                    progress_callback(len(results), len(tasks_args))
+            return results
+
+        with multiprocessing.Pool(processes=num_cores) as pool:
+            # Usamos chunksize para mejorar el paso de tareas
+            iterator = pool.imap_unordered(_worker_simulation, tasks_args, chunksize=chunk_size)
+            for res in tqdm(iterator, total=len(tasks_args), desc=desc, unit="sim"):
+                results.append(res)
+                if progress_callback:
+                    progress_callback(len(results), len(tasks_args))
+        return results
+
+    def run_batch_experiment(self, width, height, agents, pa, iterations, strategy_name,
+                             base_seed=None, replay_top=0, progress_callback=None, engine="simulation",
+                             prune=False):
         """
         Ejecuta un lote de simulaciones en paralelo y recopila estadísticas agregadas.
         Utiliza todos los núcleos de CPU disponibles para maximizar el rendimiento.
-        
+        Cada simulación recibe la semilla base_seed + id, por lo que cualquier corrida puede reproducirse.
+
         Parámetros:
             width (int): Ancho del grid de simulación
             height (int): Alto del grid de simulación
@@ -58,42 +260,86 @@ class SimulationManager:
             pa (int): Puntos de acción de cada agente
             iterations (int): Cantidad de simulaciones a ejecutar
             strategy_name (str): Nombre de la estrategia ('random' o 'intelligent')
-        
+            base_seed (int): Semilla de la primera simulación (None para elegir una aleatoria)
+            replay_top (int): Cantidad de mejores corridas cuyo replay se regenera en 'replay_data'
+            progress_callback (function): Función llamada como progress_callback(completadas, total) tras cada simulación
+            engine (str): Motor de ejecución ('simulation' o 'batched'). 'batched' solo admite la estrategia
+                          'random' y sin replays: sus partidas no se reproducen con Simulation para la misma semilla
+            prune (bool): Abandona las partidas que ya no pueden superar a la mejor terminada (requiere un
+                          WorkerPool y replay_top <= 1). Las abandonadas no cuentan en las estadísticas ni en
+                          'sorted_runs', así que solo conviene cuando interesa la mejor corrida
+
         Retorna:
-            dict: Diccionario con estadísticas globales y lista de simulaciones ordenadas por puntaje
-        """
-        print(f"Preparando {iterations} simulaciones en paralelo para: {strategy_name}...")
-        
-        # Prepara los argumentos para cada simulación con semillas únicas
-        tasks_args = []
-        for i in range(iterations):
-            tasks_args.append((width, height, agents, pa, strategy_name))
-        
-        # Ejecuta simulaciones en paralelo usando todos los núcleos disponibles
-        num_cores = multiprocessing.cpu_count()
-        results = []
-        
-        if iterations > 0:
-            # Enviamos tareas en grupos para reducir overhead de llamadas
-            chunk_size = max(1, iterations // (num_cores * 4))
-
-            with multiprocessing.Pool(processes=num_cores) as pool:
-                # Usamos chunksize para mejorar el paso de tareas
-                iterator = pool.imap_unordered(_worker_simulation, tasks_args, chunksize=chunk_size)
-                for res in tqdm(iterator, total=iterations, desc=f"🚀 Ejecutando ({strategy_name})", unit="sim"):
-                    results.append(res)
-                
-                # Asignar IDs post-procesamiento
-                for i, res in enumerate(results):
-                    res["id"] = i
-        
+            dict: Diccionario con estadísticas globales, lista de simulaciones ordenadas por puntaje y
+                  'games_pruned' con la cantidad de partidas abandonadas
+        """
+        if engine not in BATCH_ENGINES:
+            raise ValueError(f"engine inválido: {engine}")
+        if engine == "batched" and strategy_name != "random":
+            raise ValueError("El motor 'batched' solo admite la estrategia 'random'")
+        if engine == "batched" and replay_top > 0:
+            raise ValueError("El motor 'batched' no genera replays (usa engine='simulation')")
+        if engine == "batched" and prune:
+            raise ValueError("El motor 'batched' no admite prune (usa engine='simulation')")
+
+        if base_seed is None:
+            base_seed = random.randrange(2 ** 31)
+
+        if engine == "batched":
+            print(f"Preparando {iterations} simulaciones por lotes para: {strategy_name}...")
+            results = run_random_batch(width, height, agents, pa, range(base_seed, base_seed + iterations),
+                                       progress_callback=progress_callback)
+            for i, res in enumerate(results):
+                res["id"] = i
+        else:
+            print(f"Preparando {iterations} simulaciones en paralelo para: {strategy_name}...")
+
+            with self._score_threshold(self.pool, prune, replay_top) as threshold:
+                # Prepara los argumentos para cada simulación con semillas únicas
+                tasks_args = []
+                for i in range(iterations):
+                    task = (i, width, height, agents, pa, strategy_name, base_seed + i)
+                    tasks_args.append(task + (None, threshold) if threshold is not None else task)
+
+                # Ejecuta simulaciones en paralelo usando todos los núcleos disponibles
+                results = self._run_tasks(tasks_args, desc=f"🚀 Ejecutando ({strategy_name})",
+                                          progress_callback=progress_callback)
+
+        results, games_pruned = self._split_pruned(results)
+
         # Calcula estadísticas agregadas de todos los resultados
+        stats = self._batch_stats(results)
+
+        # Ordena resultados por puntaje descendente (mejores primero)
+        sorted_results = sorted(results, key=_ranking_key)
+
+        # Regenera únicamente los replays solicitados a partir de su semilla
+        for run in sorted_results[:replay_top]:
+            run["replay_data"] = self.replay_run(width, height, agents, pa, strategy_name, run)
+
+        return {
+            "stats": stats,
+            "sorted_runs": sorted_results,
+            "games_pruned": games_pruned
+        }
+
+    @staticmethod
+    def _batch_stats(results):
+        """
+        Cuenta victorias y derrotas por tipo en los resultados de un lote.
+
+        Parámetros:
+            results (list): Resultados de las simulaciones
+
+        Retorna:
+            dict: Conteos 'wins', 'loss_victims' y 'loss_collapse'
+        """
         stats = {
             "wins": 0,
             "loss_victims": 0,
             "loss_collapse": 0
         }
-        
+
         for res in results:
             if res["end_reason"] == "WIN":
                 stats["wins"] += 1
@@ -101,11 +347,352 @@ class SimulationManager:
                 stats["loss_victims"] += 1
             elif res["end_reason"] == "LOSS_COLLAPSE":
                 stats["loss_collapse"] += 1
-        
-        # Ordena resultados por puntaje descendente (mejores primero)
-        sorted_results = sorted(results, key=lambda x: x["score"], reverse=True)
-        
+        return stats
+
+    def run_sequential_batch(self, width, height, agents, pa, strategy_name, win_rate_width=None,
+                             score_width=None, confidence=DEFAULT_CONFIDENCE, max_iterations=DEFAULT_MAX_ITERATIONS,
+                             chunk_size=None, base_seed=None, progress_callback=None, engine="simulation"):
+        """
+        Ejecuta un lote con paro secuencial: juega bloques de semillas consecutivas hasta que los intervalos de
+        confianza de la tasa de victorias (Wilson) y del puntaje promedio (normal) son tan angostos como se pidió,
+        o hasta llegar a max_iterations. Los intervalos se recalculan después de cada bloque completo, así que el
+        lote siempre es el mismo para la misma semilla base y el mismo tamaño de bloque.
+
+        Parámetros:
+            width (int): Ancho del grid de simulación
+            height (int): Alto del grid de simulación
+            agents (int): Número de agentes por simulación
+            pa (int): Puntos de acción de cada agente
+            strategy_name (str): Nombre de la estrategia ('random' o 'intelligent')
+            win_rate_width (float): Ancho máximo del intervalo de la tasa de victorias (fracción entre 0 y 1)
+            score_width (float): Ancho máximo del intervalo del puntaje promedio (en puntos)
+            confidence (float): Nivel de confianza de ambos intervalos (entre 0 y 1)
+            max_iterations (int): Máximo de simulaciones aunque no se alcance la precisión
+            chunk_size (int): Simulaciones por bloque (por omisión según el motor, ver SEQUENTIAL_CHUNK_SIZES)
+            base_seed (int): Semilla de la primera simulación (None para elegir una aleatoria)
+            progress_callback (function): Función llamada como progress_callback(completadas, max_iterations)
+            engine (str): Motor de ejecución ('simulation' o 'batched', este último solo para 'random')
+
+        Retorna:
+            dict: 'stats' y 'sorted_runs' como run_batch_experiment, más 'sequential' con las simulaciones
+                  ejecutadas, si se alcanzó la precisión y los intervalos obtenidos
+        """
+        if engine not in BATCH_ENGINES:
+            raise ValueError(f"engine inválido: {engine}")
+        if engine == "batched" and strategy_name != "random":
+            raise ValueError("El motor 'batched' solo admite la estrategia 'random'")
+        if win_rate_width is None and score_width is None:
+            raise ValueError("Se requiere win_rate_width o score_width")
+        if (win_rate_width is not None and win_rate_width <= 0) or (score_width is not None and score_width <= 0):
+            raise ValueError("Los anchos de intervalo deben ser mayores a 0")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence debe estar entre 0 y 1")
+        if max_iterations < 2:
+            raise ValueError("max_iterations debe ser al menos 2")
+        if chunk_size is None:
+            chunk_size = SEQUENTIAL_CHUNK_SIZES[engine]
+        if chunk_size <= 0:
+            raise ValueError("chunk_size debe ser mayor a 0")
+
+        if base_seed is None:
+            base_seed = random.randrange(2 ** 31)
+
+        print(f"Preparando simulaciones con paro secuencial para: {strategy_name} "
+              f"(win_rate_width={win_rate_width}, score_width={score_width}, máximo {max_iterations})...")
+
+        results = []
+        scores = []
+        wins = 0
+        converged = False
+        while len(results) < max_iterations and not converged:
+            if self.cancel_event is not None and self.cancel_event.is_set():
+                raise TaskCancelled()
+            first = len(results)
+            count = min(chunk_size, max_iterations - first)
+            if engine == "batched":
+                chunk = run_random_batch(width, height, agents, pa, range(base_seed + first, base_seed + first + count))
+                for i, res in enumerate(chunk):
+                    res["id"] = first + i
+            else:
+                tasks_args = [(first + i, width, height, agents, pa, strategy_name, base_seed + first + i)
+                              for i in range(count)]
+                chunk = self._run_tasks(tasks_args, desc=f"📏 Bloque {first // chunk_size + 1} ({strategy_name})")
+
+            results.extend(chunk)
+            scores.extend(res["score"] for res in chunk)
+            wins += sum(1 for res in chunk if res["end_reason"] == "WIN")
+            if progress_callback:
+                progress_callback(len(results), max_iterations)
+
+            win_low, win_high = wilson_interval(wins, len(results), confidence)
+            score_mean, score_low, score_high = mean_interval(scores, confidence)
+            # Con una sola partida no hay varianza del puntaje: se exigen al menos dos
+            converged = (len(results) >= 2
+                         and (win_rate_width is None or win_high - win_low <= win_rate_width)
+                         and (score_width is None or score_high - score_low <= score_width))
+
+        print(f"📏 {len(results)} simulaciones; tasa de victorias [{win_low:.3f}, {win_high:.3f}], "
+              f"puntaje promedio [{score_low:.1f}, {score_high:.1f}]"
+              f"{'' if converged else ' (sin alcanzar la precisión pedida)'}")
+
         return {
-            "stats": stats,
-            "sorted_runs": sorted_results
-        }
\ No newline at end of file
+            "stats": self._batch_stats(results),
+            "sorted_runs": sorted(results, key=_ranking_key),
+            "sequential": {
+                "runs": len(results),
+                "converged": converged,
+                "confidence": confidence,
+                "win_rate": {
+                    "estimate": wins / len(results),
+                    "low": win_low,
+                    "high": win_high,
+                    "width": win_high - win_low,
+                    "target_width": win_rate_width
+                },
+                "score": {
+                    "estimate": score_mean,
+                    "low": score_low,
+                    "high": score_high,
+                    "width": score_high - score_low,
+                    "target_width": score_width
+                }
+            }
+        }
+
+    def run_successive_halving(self, width, height, agents, pa, iterations, strategy_name,
+                               keep_ratio=DEFAULT_KEEP_RATIO, min_rounds=DEFAULT_MIN_ROUNDS,
+                               base_seed=None, replay_top=0, progress_callback=None, prune=False):
+        """
+        Busca la mejor corrida entre 'iterations' semillas por mitades sucesivas (successive halving).
+        Todas las partidas juegan primero 'min_rounds' rondas; de las que no terminaron se conserva la
+        fracción 'keep_ratio' con mejor puntaje parcial (calculate_final_score sobre el estado a mitad de
+        partida: salvadas, perdidas, daño y pasos) y se vuelven a jugar desde su semilla con 1 / keep_ratio
+        veces más rondas. Cuando quedan pocas candidatas se juegan hasta el final. Las partidas que terminan
+        en cualquier etapa conservan su puntaje final.
+
+        Parámetros:
+            width (int): Ancho del grid de simulación
+            height (int): Alto del grid de simulación
+            agents (int): Número de agentes por simulación
+            pa (int): Puntos de acción de cada agente
+            iterations (int): Cantidad de semillas a evaluar
+            strategy_name (str): Nombre de la estrategia ('random' o 'intelligent')
+            keep_ratio (float): Fracción de candidatas que pasa a la siguiente etapa (mayor a 0 y hasta MAX_KEEP_RATIO)
+            min_rounds (int): Rondas de juego de la primera etapa
+            base_seed (int): Semilla de la primera simulación (None para elegir una aleatoria)
+            replay_top (int): Cantidad de mejores corridas cuyo replay se regenera en 'replay_data'
+            progress_callback (function): Función llamada como progress_callback(completadas, total) tras cada
+                                          partida de cada etapa
+            prune (bool): Abandona dentro de cada etapa las partidas que ya no pueden superar a la mejor
+                          terminada (requiere un WorkerPool y replay_top <= 1). Las abandonadas cuentan para el
+                          tamaño de la siguiente etapa, pero cuáles se abandonan depende de cuándo los workers
+                          suben el umbral, así que con poda el resultado deja de ser determinista (por eso no
+                          está activa por omisión y el servidor no la usa en esta búsqueda)
+
+        Retorna:
+            dict: 'sorted_runs' con las partidas terminadas ordenadas por puntaje, 'games_evaluated' con el total
+                  de partidas (completas o parciales) ejecutadas, 'games_pruned' con las abandonadas y 'rungs'
+                  con el detalle de cada etapa
+        """
+        if iterations <= 0:
+            raise ValueError("iterations debe ser mayor a 0")
+        if not 0 < keep_ratio <= MAX_KEEP_RATIO:
+            raise ValueError(f"keep_ratio debe ser mayor a 0 y a lo más {MAX_KEEP_RATIO}")
+        if min_rounds <= 0:
+            raise ValueError("min_rounds debe ser mayor a 0")
+
+        print(f"Buscando la mejor de {iterations} simulaciones por mitades sucesivas para: {strategy_name}...")
+
+        if base_seed is None:
+            base_seed = random.randrange(2 ** 31)
+
+        candidates = [(i, base_seed + i) for i in range(iterations)]
+        completed = []
+        rungs = []
+        games_evaluated = 0
+        games_pruned = 0
+        rounds = min_rounds
+        # Con esta cantidad de candidatas (o menos) ya no vale la pena otra eliminación
+        final_size = math.ceil(1 / keep_ratio)
+
+        # El umbral se conserva entre etapas: las partidas terminadas en una etapa podan a las siguientes
+        with self._score_threshold(self.pool, prune, replay_top) as threshold:
+            while candidates:
+                max_rounds = None if len(candidates) <= final_size else rounds
+                tasks_args = [(i, width, height, agents, pa, strategy_name, seed, max_rounds, threshold)
+                              for i, seed in candidates]
+                results = self._run_tasks(tasks_args, desc=f"🔎 Etapa {len(rungs) + 1} ({strategy_name})",
+                                          progress_callback=progress_callback)
+                games_evaluated += len(results)
+                results, pruned = self._split_pruned(results)
+                games_pruned += pruned
+
+                unfinished = [res for res in results if not res["finished"]]
+                completed.extend(res for res in results if res["finished"])
+                rungs.append({"rounds": max_rounds, "games": len(results) + pruned,
+                              "finished": len(results) - len(unfinished), "pruned": pruned})
+
+                # Conserva las partidas en curso con mejor puntaje parcial.
+                # Las abandonadas seguían en curso, así que cuentan para el tamaño de la siguiente etapa
+                unfinished.sort(key=_ranking_key)
+                keep = math.ceil((len(unfinished) + pruned) * keep_ratio)
+                candidates = [(res["id"], res["seed"]) for res in unfinished[:keep]]
+                rounds = math.ceil(rounds / keep_ratio)
+
+        sorted_results = sorted(completed, key=_ranking_key)
+
+        # Regenera únicamente los replays solicitados a partir de su semilla
+        for run in sorted_results[:replay_top]:
+            run["replay_data"] = self.replay_run(width, height, agents, pa, strategy_name, run)
+
+        return {
+            "sorted_runs": sorted_results,
+            "games_evaluated": games_evaluated,
+            "games_pruned": games_pruned,
+            "rungs": rungs
+        }
+
+    def run_anytime_search(self, width, height, agents, pa, strategy_name, budget_seconds,
+                           max_games=None, base_seed=None, replay_top=0, max_in_flight=None, prune=True):
+        """
+        Busca la mejor corrida durante un presupuesto de tiempo fijo (búsqueda anytime).
+        Envía semillas consecutivas al pool de una en una, con a lo sumo 'max_in_flight' partidas pendientes,
+        hasta que se cumple la fecha límite; los resultados que llegan después se descartan y, con prune, las
+        partidas pendientes se abandonan en su siguiente ronda (al liberar el umbral) para no retrasar al
+        siguiente lote. Siempre se espera al menos una partida terminada, aunque el presupuesto sea menor a lo
+        que dura una sola.
+        La regeneración del replay de las mejores corridas ocurre después de la fecha límite.
+
+        Parámetros:
+            width (int): Ancho del grid de simulación
+            height (int): Alto del grid de simulación
+            agents (int): Número de agentes por simulación
+            pa (int): Puntos de acción de cada agente
+            strategy_name (str): Nombre de la estrategia ('random' o 'intelligent')
+            budget_seconds (float): Tiempo máximo de búsqueda en segundos
+            max_games (int): Máximo de semillas a evaluar aunque sobre tiempo (None para no limitar)
+            base_seed (int): Semilla de la primera simulación (None para elegir una aleatoria)
+            replay_top (int): Cantidad de mejores corridas cuyo replay se regenera en 'replay_data'
+            max_in_flight (int): Partidas pendientes a la vez (por omisión, 2 por worker)
+            prune (bool): Abandona las partidas que ya no pueden superar a la mejor terminada (replay_top <= 1)
+
+        Retorna:
+            dict: 'sorted_runs' con las partidas terminadas ordenadas por puntaje, 'games_evaluated',
+                  'games_pruned' con las abandonadas y 'elapsed_seconds' con el tiempo real de búsqueda
+        """
+        if budget_seconds <= 0:
+            raise ValueError("budget_seconds debe ser mayor a 0")
+        if max_games is not None and max_games <= 0:
+            raise ValueError("max_games debe ser mayor a 0")
+
+        if base_seed is None:
+            base_seed = random.randrange(2 ** 31)
+
+        started = time.monotonic()
+        deadline = started + budget_seconds
+
+        # Sin pool persistente se usa uno temporal (su arranque cuenta dentro del presupuesto)
+        pool = self.pool if self.pool is not None else WorkerPool()
+        if max_in_flight is None:
+            max_in_flight = pool.processes * DEFAULT_IN_FLIGHT_PER_WORKER
+
+        print(f"Buscando la mejor simulación durante {budget_seconds:.3f} s para: {strategy_name}...")
+
+        # Los callbacks del pool depositan aquí resultados y errores; solo este hilo los consume
+        finished = queue.Queue()
+        results = []
+        in_flight = 0
+        submitted = 0
+        completed = 0
+        try:
+            with self._score_threshold(pool, prune, replay_top) as threshold:
+                while True:
+                    while (in_flight < max_in_flight and time.monotonic() < deadline
+                           and (max_games is None or submitted < max_games)):
+                        args = (submitted, width, height, agents, pa, strategy_name, base_seed + submitted,
+                                None, threshold)
+                        pool.apply_async(_worker_simulation, args, callback=finished.put,
+                                         error_callback=finished.put)
+                        in_flight += 1
+                        submitted += 1
+
+                    if in_flight == 0:
+                        break
+                    remaining = deadline - time.monotonic()
+                    # Una partida abandonada no cuenta como resultado: se sigue esperando una terminada
+                    if remaining <= 0 and completed:
+                        break
+                    try:
+                        res = finished.get(timeout=remaining if remaining > 0 and completed else None)
+                    except queue.Empty:
+                        continue
+                    in_flight -= 1
+                    if isinstance(res, BaseException):
+                        raise res
+                    results.append(res)
+                    if res["end_reason"] != "PRUNED":
+                        completed += 1
+        finally:
+            if pool is not self.pool:
+                pool.shutdown(wait=False)
+
+        games_evaluated = len(results)
+        results, games_pruned = self._split_pruned(results)
+
+        elapsed = time.monotonic() - started
+        sorted_results = sorted(results, key=_ranking_key)
+        print(f"⏱️ {games_evaluated} simulaciones evaluadas en {elapsed:.3f} s ({games_pruned} abandonadas)")
+
+        # Regenera únicamente los replays solicitados a partir de su semilla
+        for run in sorted_results[:replay_top]:
+            run["replay_data"] = self.replay_run(width, height, agents, pa, strategy_name, run)
+
+        return {
+            "sorted_runs": sorted_results,
+            "games_evaluated": games_evaluated,
+            "games_pruned": games_pruned,
+            "elapsed_seconds": elapsed
+        }
+
+    def replay_seed(self, width, height, agents, pa, strategy_name, seed, replay_mode="full"):
+        """
+        Vuelve a ejecutar una simulación a partir de su semilla para reconstruir su replay.
+
+        Parámetros:
+            width (int): Ancho del grid de simulación
+            height (int): Alto del grid de simulación
+            agents (int): Número de agentes
+            pa (int): Puntos de acción de cada agente
+            strategy_name (str): Nombre de la estrategia ('random' o 'intelligent')
+            seed (int): Semilla de la simulación a reproducir
+            replay_mode (str): Formato de los frames ('full' o 'delta')
+
+        Retorna:
+            Simulation: Simulación ejecutada con todos sus frames registrados
+        """
+        sim = Simulation(width, height, agents, pa, strategy=strategy_name, replay_mode=replay_mode, seed=seed)
+        sim.run()
+        return sim
+
+    def replay_run(self, width, height, agents, pa, strategy_name, run, replay_mode="full"):
+        """
+        Regenera los datos de reproducción de una corrida del lote usando su semilla.
+        Advierte si las métricas regeneradas no coinciden con las reportadas por el worker.
+
+        Parámetros:
+            width (int): Ancho del grid de simulación
+            height (int): Alto del grid de simulación
+            agents (int): Número de agentes
+            pa (int): Puntos de acción de cada agente
+            strategy_name (str): Nombre de la estrategia ('random' o 'intelligent')
+            run (dict): Métricas de la corrida (debe incluir 'seed' y 'score')
+            replay_mode (str): Formato de los frames ('full' o 'delta')
+
+        Retorna:
+            dict: Datos de reproducción en el formato de Simulation.get_results_json
+        """
+        sim = self.replay_seed(width, height, agents, pa, strategy_name, run["seed"], replay_mode=replay_mode)
+        if sim.calculate_final_score() != run["score"]:
+            print(f"⚠️ El replay de la semilla {run['seed']} no coincide con su puntaje original "
+                  f"({sim.calculate_final_score()} vs {run['score']})")
+        return sim.get_results_json()
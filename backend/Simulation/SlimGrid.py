@@ -0,0 +1,207 @@
+"""
+Almacén ligero de posiciones de agentes para corridas sin visualización.
+
+Implementa el subconjunto de mesa.space.MultiGrid que usa ExplorerModel (place_agent, move_agent,
+remove_agent, get_cell_list_contents, is_cell_empty, width/height) sin la maquinaria genérica de Mesa:
+las posiciones viven en un arreglo (N, 2) y la ocupación de cada celda es un bitset (un entero de
+Python con un bit por agente). Cada agente guarda además el momento en que llegó a su celda, de modo
+que get_cell_list_contents regresa a los agentes en el mismo orden que MultiGrid (orden de llegada)
+y una semilla produce exactamente la misma partida con cualquiera de los dos grids.
+
+MultiGrid sigue siendo el grid por omisión para compatibilidad con las herramientas de Mesa y la
+visualización; 'slim' se elige para lotes headless.
+"""
+import numpy as np
+from mesa.space import MultiGrid
+
+GRID_BACKENDS = ("mesa", "slim")
+DEFAULT_GRID = "mesa"
+
+
+class SlimGrid:
+    """
+    Grid no toroidal con varias posibles ocupaciones por celda, respaldado por arreglos y bitsets.
+    """
+
+    def __init__(self, width, height):
+        """
+        Crea un grid vacío.
+
+        Parámetros:
+            width (int): Ancho del grid
+            height (int): Alto del grid
+        """
+        self.width = width
+        self.height = height
+        self.torus = False
+        # Bitset de agentes por celda, indexado por y * width + x
+        self._occupancy = [0] * (width * height)
+        # Agentes registrados: índice de bit, agente por índice y momento de llegada a su celda
+        self._slots = {}
+        self._agents = []
+        self._arrival = []
+        self._clock = 0
+        # Posición (x, y) de cada agente por índice de bit; (-1, -1) si no está en el grid.
+        # La capacidad se duplica al llenarse; positions expone solo las filas de agentes registrados
+        self._positions = np.full((8, 2), -1, dtype=np.int64)
+
+    @property
+    def positions(self):
+        """
+        Posiciones de los agentes registrados en el orden en que se colocaron por primera vez.
+
+        Retorna:
+            numpy.ndarray: Arreglo (N, 2) de coordenadas (x, y); (-1, -1) para agentes retirados
+        """
+        return self._positions[:len(self._agents)]
+
+    def out_of_bounds(self, pos):
+        """
+        Indica si una posición está fuera del grid.
+
+        Parámetros:
+            pos (tuple): Posición en formato (x, y)
+
+        Retorna:
+            bool: True si la posición no pertenece al grid
+        """
+        x, y = pos
+        return not (0 <= x < self.width and 0 <= y < self.height)
+
+    def _slot(self, agent):
+        """
+        Obtiene el índice de bit de un agente, registrándolo la primera vez.
+
+        Parámetros:
+            agent (Agent): Agente
+
+        Retorna:
+            int: Índice del agente en positions y en los bitsets
+        """
+        slot = self._slots.get(agent)
+        if slot is None:
+            slot = self._slots[agent] = len(self._agents)
+            self._agents.append(agent)
+            self._arrival.append(0)
+            if slot == len(self._positions):
+                self._positions = np.concatenate((self._positions, np.full_like(self._positions, -1)))
+        return slot
+
+    def place_agent(self, agent, pos):
+        """
+        Coloca un agente en una celda y actualiza su atributo pos.
+
+        Parámetros:
+            agent (Agent): Agente a colocar
+            pos (tuple): Celda en formato (x, y)
+        """
+        if self.out_of_bounds(pos):
+            raise Exception(f"Posición {pos} fuera del grid")
+        x, y = pos
+        slot = self._slot(agent)
+        self._occupancy[y * self.width + x] |= 1 << slot
+        self._clock += 1
+        self._arrival[slot] = self._clock
+        self._positions[slot] = pos
+        agent.pos = pos
+
+    def remove_agent(self, agent):
+        """
+        Retira un agente de su celda y deja su atributo pos en None.
+
+        Parámetros:
+            agent (Agent): Agente a retirar
+        """
+        slot = self._slots[agent]
+        x, y = agent.pos
+        self._occupancy[y * self.width + x] &= ~(1 << slot)
+        self._positions[slot] = (-1, -1)
+        agent.pos = None
+
+    def move_agent(self, agent, pos):
+        """
+        Mueve un agente a otra celda. Como en MultiGrid, el agente pasa al final del orden de
+        llegada de la celda destino aunque sea la misma en la que ya estaba.
+
+        Parámetros:
+            agent (Agent): Agente a mover
+            pos (tuple): Celda destino en formato (x, y)
+        """
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise Exception(f"Posición {pos} fuera del grid")
+        slot = self._slots[agent]
+        bit = 1 << slot
+        occupancy = self._occupancy
+        ox, oy = agent.pos
+        occupancy[oy * self.width + ox] &= ~bit
+        occupancy[y * self.width + x] |= bit
+        self._clock += 1
+        self._arrival[slot] = self._clock
+        self._positions[slot] = pos
+        agent.pos = pos
+
+    def occupancy(self, pos):
+        """
+        Obtiene el bitset de agentes de una celda.
+
+        Parámetros:
+            pos (tuple): Celda en formato (x, y)
+
+        Retorna:
+            int: Bitset con un bit por índice de agente
+        """
+        return self._occupancy[pos[1] * self.width + pos[0]]
+
+    def is_cell_empty(self, pos):
+        """
+        Indica si una celda no tiene agentes.
+
+        Parámetros:
+            pos (tuple): Celda en formato (x, y)
+
+        Retorna:
+            bool: True si la celda está vacía
+        """
+        return not self.occupancy(pos)
+
+    def get_cell_list_contents(self, pos):
+        """
+        Obtiene los agentes de una celda en orden de llegada (igual que MultiGrid).
+
+        Parámetros:
+            pos (tuple): Celda en formato (x, y)
+
+        Retorna:
+            list: Agentes en la celda
+        """
+        bits = self.occupancy(pos)
+        if not bits:
+            return []
+        slots = []
+        while bits:
+            low = bits & -bits
+            slots.append(low.bit_length() - 1)
+            bits ^= low
+        if len(slots) > 1:
+            slots.sort(key=self._arrival.__getitem__)
+        return [self._agents[s] for s in slots]
+
+
+def create_grid(name, width, height):
+    """
+    Crea el grid de posiciones indicado.
+
+    Parámetros:
+        name (str): Nombre del grid ('mesa' para MultiGrid o 'slim' para SlimGrid)
+        width (int): Ancho del grid
+        height (int): Alto del grid
+
+    Retorna:
+        MultiGrid | SlimGrid: Grid vacío
+    """
+    if name not in GRID_BACKENDS:
+        raise ValueError(f"grid inválido: {name}")
+    if name == "slim":
+        return SlimGrid(width, height)
+    return MultiGrid(width, height, torus=False)
@@ -0,0 +1,133 @@
+"""
+Tablas geométricas estáticas de un mapa: vecinos, índices de dirección, perímetro y entradas.
+
+La geometría no cambia durante una partida (solo cambian paredes, puertas y fuego), así que
+se calcula una vez por combinación de tamaño de grid y puntos de entrada y se comparte entre
+todos los modelos del proceso en lugar de reconstruir listas en cada consulta.
+"""
+
+# Topologías ya construidas, indexadas por (width, height, entradas)
+_TOPOLOGIES = {}
+
+
+def _agent_direction(cx, cy, tx, ty):
+    """
+    Índice de dirección con la convención de AgentBaseModel._get_direction_index y dijkstra_search.
+
+    Parámetros:
+        cx (int): X actual.
+        cy (int): Y actual.
+        tx (int): X objetivo.
+        ty (int): Y objetivo.
+    Retorna:
+        int: 0 si baja en y, 1 si avanza en x, 2 si sube en y, 3 si retrocede en x (-1 si es la misma celda).
+    """
+    if ty > cy: return 0
+    elif tx > cx: return 1
+    elif ty < cy: return 2
+    elif tx < cx: return 3
+    return -1
+
+
+def _edge_direction(cx, cy, tx, ty):
+    """
+    Índice de dirección con la convención de las paredes del mapa (ExplorerModel.has_wall / can_move).
+
+    Parámetros:
+        cx (int): X actual.
+        cy (int): Y actual.
+        tx (int): X objetivo.
+        ty (int): Y objetivo.
+    Retorna:
+        int: 0=Arriba (y-1), 1=Izquierda, 2=Abajo (y+1), 3=Derecha (-1 si no son adyacentes).
+    """
+    dx, dy = tx - cx, ty - cy
+    if dx == 0 and dy == -1: return 0
+    if dx == -1 and dy == 0: return 1
+    if dx == 0 and dy == 1: return 2
+    if dx == 1 and dy == 0: return 3
+    return -1
+
+
+class Topology:
+    """
+    Geometría estática de un grid sin toroide con vecindad de Von Neumann.
+    Todas las tablas son inmutables (tuplas/frozenset) para poder compartirse entre modelos.
+    """
+
+    def __init__(self, width, height, entry_points):
+        """
+        Construye las tablas del grid.
+
+        Parámetros:
+            width (int): Ancho del grid
+            height (int): Alto del grid
+            entry_points (list): Puntos de entrada en formato [y, x]
+        """
+        self.width = width
+        self.height = height
+
+        # Vecinos de cada celda en el mismo orden que MultiGrid.get_neighborhood(moore=False),
+        # de modo que random.choice sobre ellos da el mismo resultado que con Mesa
+        self.neighbors = {}
+        # Por celda: tuplas (vecino, dirección de agente, dirección de borde) del movimiento celda -> vecino
+        self.steps = {}
+        for x in range(width):
+            for y in range(height):
+                cells = tuple(
+                    (x + dx, y + dy)
+                    for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                    if abs(dx) + abs(dy) == 1 and 0 <= x + dx < width and 0 <= y + dy < height
+                )
+                self.neighbors[(x, y)] = cells
+                self.steps[(x, y)] = tuple(
+                    (n, _agent_direction(x, y, n[0], n[1]), _edge_direction(x, y, n[0], n[1]))
+                    for n in cells
+                )
+
+        # Por celda: tuplas (vecino, dirección de agente, dirección de borde) del movimiento vecino -> celda,
+        # usadas por las búsquedas inversas (campos de distancia)
+        self.reverse_steps = {
+            cell: tuple((n, _agent_direction(n[0], n[1], cell[0], cell[1]), _edge_direction(n[0], n[1], cell[0], cell[1]))
+                        for n in cells)
+            for cell, cells in self.neighbors.items()
+        }
+
+        # Perímetro en el orden usado al desplegar agentes aleatorios (fila superior, inferior, columnas)
+        spawn = [(x, 0) for x in range(width)]
+        spawn += [(x, height - 1) for x in range(width)]
+        spawn += [(0, y) for y in range(1, height - 1)]
+        spawn += [(width - 1, y) for y in range(1, height - 1)]
+        self.spawn_perimeter = tuple(spawn)
+
+        # Perímetro en el orden usado al reaparecer un agente herido (intercalando lados opuestos)
+        respawn = []
+        for x in range(width):
+            respawn.append((x, 0))
+            respawn.append((x, height - 1))
+        for y in range(1, height - 1):
+            respawn.append((0, y))
+            respawn.append((width - 1, y))
+        self.respawn_perimeter = tuple(respawn)
+
+        # Puertas exteriores (ambulancias) en formato (x, y), en el orden del mapa
+        self.outside_doors = tuple((ep[1], ep[0]) for ep in entry_points)
+        self.entry_set = frozenset(self.outside_doors)
+
+
+def get_topology(width, height, entry_points):
+    """
+    Obtiene la topología de un mapa, construyéndola solo la primera vez que se solicita.
+
+    Parámetros:
+        width (int): Ancho del grid
+        height (int): Alto del grid
+        entry_points (list): Puntos de entrada en formato [y, x]
+    Retorna:
+        Topology: Tablas geométricas compartidas del mapa
+    """
+    key = (width, height, tuple((ep[0], ep[1]) for ep in entry_points))
+    topology = _TOPOLOGIES.get(key)
+    if topology is None:
+        topology = _TOPOLOGIES[key] = Topology(width, height, entry_points)
+    return topology
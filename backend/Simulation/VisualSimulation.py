@@ -6,6 +6,7 @@ from matplotlib.colors import ListedColormap
 from multiprocessing import Pool, cpu_count
 
 from Simulation.SimulationManager import SimulationManager
+from Simulation.ReplayEncoding import decode_frames
 from Simulation.SimulationAnalysis import calculate_summary_stats, print_comparison_table, plot_simulation_results
 
 # CONFIGURACIÓN
@@ -21,7 +22,7 @@ def generate_gif(sim_data, filename, title_suffix=""):
     Generador de GIF visual mejorado para coincidir con el tablero real.
     """
     print(f"🎬 Iniciando renderizado de: {filename}...")
-    frames = sim_data["data"]["frames"]
+    frames = list(decode_frames(sim_data["data"]))
     
     ROLE_COLORS = {
         "Firefighter": "red",     
@@ -240,14 +241,18 @@ def analyze_strategy(manager, strategy_name):
     best_run = ranked_runs[0]
     worst_run = ranked_runs[-1]
 
+    # Los workers solo reportan métricas: se regeneran los replays de la mejor y la peor corrida
+    best_replay = manager.replay_run(WIDTH, HEIGHT, AGENTS, PA, strategy_name, best_run)
+    worst_replay = manager.replay_run(WIDTH, HEIGHT, AGENTS, PA, strategy_name, worst_run)
+
     tasks = []
     
     title_best = f"{strategy_name.upper()} - MEJOR " \
                 f"(Salvados: {best_run['saved']}, Daño: {best_run['damage']})"
-    tasks.append((best_run['replay_data'], f"{strategy_name}_Mejor.gif", title_best))
+    tasks.append((best_replay, f"{strategy_name}_Mejor.gif", title_best))
 
     title_worst = f"{strategy_name.upper()} - PEOR ({worst_run['end_reason']})"
-    tasks.append((worst_run['replay_data'], f"{strategy_name}_Peor.gif", title_worst))
+    tasks.append((worst_replay, f"{strategy_name}_Peor.gif", title_worst))
 
     return tasks, ranked_runs
 
@@ -0,0 +1,395 @@
+import os
+import queue
+import signal
+import threading
+import time
+import multiprocessing
+from contextlib import contextmanager
+from Simulation.AuxFunctions import load_map_template
+
+# Número de tareas (chunks) que procesa cada worker antes de ser reemplazado por uno nuevo
+DEFAULT_MAX_TASKS_PER_CHILD = 200
+
+# Umbrales de puntaje compartidos con los workers: uno por búsqueda en curso (peticiones simultáneas)
+THRESHOLD_SLOTS = 16
+
+# Cada cuánto revisa un lote en segundo plano, mientras espera, si fue cancelado (segundos)
+BACKGROUND_POLL_SECONDS = 0.2
+
+# Duración objetivo de cada envío de un lote en segundo plano (segundos): se agrupan tantas tareas como
+# quepan para no pagar un viaje al pool por partida corta, y una petición interactiva espera a lo más
+# un envío por worker. Con prioridad subida (boost_event) los envíos son más largos
+BACKGROUND_CHUNK_SECONDS = 0.05
+BOOSTED_CHUNK_SECONDS = 0.5
+MAX_BACKGROUND_CHUNK = 256
+
+# Umbrales compartidos (puntaje y generación de cada espacio) recibidos en _init_worker
+_thresholds = None
+_threshold_generations = None
+
+
+class TaskCancelled(Exception):
+    """
+    Se lanza cuando se cancela un lote (cancel_event de SimulationManager o de imap_background).
+    """
+
+
+def _init_worker(thresholds=None, generations=None):
+    """
+    Inicializador de cada proceso worker.
+    Ignora SIGINT para que el apagado lo coordine el proceso padre (Ctrl+C en el servidor)
+    en lugar de que cada worker imprima su propio traceback.
+    Deja lista la plantilla del mapa (heredada del padre con fork, o parseada aquí con spawn) e importa
+    los módulos de simulación antes de aceptar tareas, para que un worker nuevo o reciclado no cobre
+    la importación (Mesa, NumPy) dentro de la primera partida que recibe.
+
+    Parámetros:
+        thresholds (multiprocessing.Array): Umbral de puntaje de cada espacio
+        generations (multiprocessing.Array): Generación de cada espacio (cambia al liberarlo)
+    """
+    global _thresholds, _threshold_generations
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _thresholds = thresholds
+    _threshold_generations = generations
+    load_map_template()
+    import Simulation.SimulationManager  # noqa: F401
+
+
+def read_threshold(token):
+    """
+    Lee desde un worker el umbral de puntaje de una búsqueda.
+
+    Parámetros:
+        token (tuple): (espacio, generación) entregado por WorkerPool.score_threshold
+
+    Retorna:
+        float: Puntaje a superar, None si todavía no hay umbral, o infinito si la búsqueda ya terminó (sus
+               tareas pendientes, p. ej. las de 'anytime' al vencer el plazo, se abandonan en la siguiente ronda)
+    """
+    slot, generation = token
+    with _thresholds.get_lock():
+        if _threshold_generations.get_obj()[slot] != generation:
+            return float("inf")
+        threshold = _thresholds.get_obj()[slot]
+    return None if threshold == float("-inf") else threshold
+
+
+def raise_threshold(token, score):
+    """
+    Sube desde un worker el umbral de una búsqueda al puntaje de una partida terminada, si es mayor.
+    No hace nada si la búsqueda ya terminó (el espacio pudo reasignarse a otra).
+
+    Parámetros:
+        token (tuple): (espacio, generación) entregado por WorkerPool.score_threshold
+        score (float): Puntaje final de la partida
+    """
+    slot, generation = token
+    with _thresholds.get_lock():
+        thresholds = _thresholds.get_obj()
+        if _threshold_generations.get_obj()[slot] == generation and score > thresholds[slot]:
+            thresholds[slot] = score
+
+
+class WorkerPool:
+    """
+    Pool de procesos de larga duración compartido entre peticiones.
+    Se crea una sola vez (al iniciar el servidor) y se reutiliza en cada lote de simulaciones,
+    evitando pagar en cada petición el arranque de procesos y la importación de Mesa.
+    """
+
+    def __init__(self, processes=None, max_tasks_per_child=DEFAULT_MAX_TASKS_PER_CHILD):
+        """
+        Configura el pool sin arrancar todavía los procesos.
+
+        Parámetros:
+            processes (int): Número de procesos worker (por defecto, todos los núcleos disponibles)
+            max_tasks_per_child (int): Tareas (chunks) tras las cuales se recicla cada worker (None = nunca)
+        """
+        self.processes = processes or multiprocessing.cpu_count()
+        self.max_tasks_per_child = max_tasks_per_child
+        self._pool = None
+        self._lock = threading.Lock()
+        # Umbrales compartidos con los workers; ambos arreglos usan el mismo lock entre procesos
+        threshold_lock = multiprocessing.RLock()
+        self._thresholds = multiprocessing.Array("d", [float("-inf")] * THRESHOLD_SLOTS, lock=threshold_lock)
+        self._threshold_generations = multiprocessing.Array("q", THRESHOLD_SLOTS, lock=threshold_lock)
+        self._free_threshold_slots = list(range(THRESHOLD_SLOTS))
+        self._started_at = None
+        self.tasks_submitted = 0
+        self.tasks_completed = 0
+        self.batches_running = 0
+        # Trabajo interactivo en curso: peticiones marcadas con foreground() y tareas de apply_async pendientes.
+        # Mientras haya trabajo interactivo (o lotes de imap_unordered) imap_background no envía tareas
+        self._foreground = 0
+        self._activity = threading.Condition(self._lock)
+
+    def start(self):
+        """
+        Arranca los procesos worker si aún no están corriendo.
+
+        Retorna:
+            multiprocessing.pool.Pool: Pool de procesos activo
+        """
+        with self._lock:
+            if self._pool is None:
+                # Se parsea el mapa antes de crear los workers para que lo hereden ya listo
+                load_map_template()
+                self._pool = multiprocessing.Pool(
+                    processes=self.processes,
+                    initializer=_init_worker,
+                    initargs=(self._thresholds, self._threshold_generations),
+                    maxtasksperchild=self.max_tasks_per_child
+                )
+                self._started_at = time.time()
+                print(f"🏊 Pool de simulación iniciado con {self.processes} workers (PID {os.getpid()})")
+            return self._pool
+
+    @property
+    def is_running(self):
+        """
+        Indica si el pool tiene procesos activos.
+
+        Retorna:
+            bool: True si el pool fue iniciado y no se ha apagado
+        """
+        return self._pool is not None
+
+    def imap_unordered(self, func, iterable, chunksize=1):
+        """
+        Distribuye tareas entre los workers y entrega los resultados conforme terminan.
+        Arranca el pool si todavía no estaba iniciado.
+
+        Parámetros:
+            func (function): Función a ejecutar en los workers (debe ser importable a nivel de módulo)
+            iterable (list): Argumentos de cada tarea
+            chunksize (int): Número de tareas que se envían juntas a cada worker
+
+        Retorna:
+            generator: Resultados en el orden en que terminan
+        """
+        tasks = list(iterable)
+        pool = self.start()
+
+        with self._lock:
+            self.tasks_submitted += len(tasks)
+            self.batches_running += 1
+        try:
+            for result in pool.imap_unordered(func, tasks, chunksize=chunksize):
+                with self._lock:
+                    self.tasks_completed += 1
+                yield result
+        finally:
+            with self._lock:
+                self.batches_running -= 1
+                self._activity.notify_all()
+
+    def apply_async(self, func, args, callback=None, error_callback=None):
+        """
+        Envía una sola tarea al pool sin esperar su resultado (para búsquedas que deciden cuántas
+        tareas enviar sobre la marcha). Arranca el pool si todavía no estaba iniciado.
+
+        Parámetros:
+            func (function): Función a ejecutar en los workers (debe ser importable a nivel de módulo)
+            args (tuple): Argumentos de la tarea (se pasan como un solo argumento, igual que en imap_unordered)
+            callback (function): Función llamada con el resultado en el hilo de resultados del pool
+            error_callback (function): Función llamada con la excepción si la tarea falla
+
+        Retorna:
+            multiprocessing.pool.AsyncResult: Resultado pendiente de la tarea
+        """
+        pool = self.start()
+
+        def on_done(result):
+            with self._lock:
+                self.tasks_completed += 1
+                self._foreground -= 1
+                self._activity.notify_all()
+            if callback:
+                callback(result)
+
+        def on_error(error):
+            with self._lock:
+                self._foreground -= 1
+                self._activity.notify_all()
+            if error_callback:
+                error_callback(error)
+
+        with self._lock:
+            self.tasks_submitted += 1
+            self._foreground += 1
+        return pool.apply_async(func, (args,), callback=on_done, error_callback=on_error)
+
+    @contextmanager
+    def foreground(self):
+        """
+        Marca trabajo interactivo (p. ej. una petición HTTP completa, incluida la parte que corre fuera del
+        pool) para que los lotes en segundo plano dejen de enviar tareas mientras dura.
+        """
+        with self._lock:
+            self._foreground += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._foreground -= 1
+                self._activity.notify_all()
+
+    def _wait_for_idle(self, cancel_event, boost_event=None):
+        """
+        Espera a que no haya trabajo interactivo en el pool (requiere el candado tomado mediante _activity).
+
+        Parámetros:
+            cancel_event (threading.Event): Evento de cancelación del lote en segundo plano (o None)
+            boost_event (threading.Event): Si se activa, el lote deja de ceder el pool y ya no espera (o None)
+        """
+        while ((self._foreground or self.batches_running)
+               and not (boost_event is not None and boost_event.is_set())):
+            if cancel_event is not None and cancel_event.is_set():
+                raise TaskCancelled()
+            self._activity.wait(BACKGROUND_POLL_SECONDS)
+
+    def imap_background(self, func, iterable, cancel_event=None, boost_event=None):
+        """
+        Distribuye tareas con prioridad baja y entrega los resultados conforme terminan.
+        Mantiene a lo sumo un envío pendiente por worker y no envía más mientras haya trabajo interactivo
+        (foreground, imap_unordered o apply_async), así que una petición interactiva espera a lo más los
+        envíos que ya estaban corriendo. Cada envío agrupa las tareas que caben en BACKGROUND_CHUNK_SECONDS
+        según la duración medida de las anteriores. Arranca el pool si todavía no estaba iniciado.
+
+        Parámetros:
+            func (function): Función a ejecutar en los workers (debe ser importable a nivel de módulo)
+            iterable (list): Argumentos de cada tarea
+            cancel_event (threading.Event): Si se activa, deja de enviar tareas y lanza TaskCancelled
+                                            (los resultados pendientes se descartan)
+            boost_event (threading.Event): Si se activa (p. ej. porque una petición interactiva espera este
+                                           resultado), sigue enviando tareas aunque haya trabajo interactivo,
+                                           con envíos más largos y dos pendientes por worker
+
+        Retorna:
+            generator: Resultados en el orden en que terminan
+        """
+        tasks = iter(iterable)
+        pool = self.start()
+        finished = queue.Queue()
+        in_flight = 0
+        exhausted = False
+        # Duración estimada de una tarea (None hasta recibir el primer envío: se empieza con una por envío)
+        task_seconds = None
+
+        def on_done(results, submitted_at):
+            finished.put((results, time.monotonic() - submitted_at))
+
+        while True:
+            while not exhausted:
+                boosted = boost_event is not None and boost_event.is_set()
+                if in_flight >= (2 * self.processes if boosted else self.processes):
+                    break
+                with self._activity:
+                    self._wait_for_idle(cancel_event, boost_event)
+                if cancel_event is not None and cancel_event.is_set():
+                    raise TaskCancelled()
+                target = BOOSTED_CHUNK_SECONDS if boosted else BACKGROUND_CHUNK_SECONDS
+                size = 1 if task_seconds is None else max(1, min(MAX_BACKGROUND_CHUNK, int(target / task_seconds)))
+                chunk = [args for _, args in zip(range(size), tasks)]
+                if len(chunk) < size:
+                    exhausted = True
+                if not chunk:
+                    break
+                with self._lock:
+                    self.tasks_submitted += len(chunk)
+                submitted_at = time.monotonic()
+                pool.map_async(func, chunk, chunksize=len(chunk),
+                               callback=lambda results, submitted_at=submitted_at: on_done(results, submitted_at),
+                               error_callback=finished.put)
+                in_flight += 1
+
+            if in_flight == 0:
+                return
+            # Espera por intervalos para atender una cancelación sin esperar a las partidas en curso
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise TaskCancelled()
+                try:
+                    item = finished.get(timeout=BACKGROUND_POLL_SECONDS)
+                    break
+                except queue.Empty:
+                    pass
+            in_flight -= 1
+            if isinstance(item, BaseException):
+                raise item
+            results, elapsed = item
+            task_seconds = elapsed / len(results)
+            with self._lock:
+                self.tasks_completed += len(results)
+            yield from results
+
+    @contextmanager
+    def score_threshold(self):
+        """
+        Reserva un umbral de puntaje compartido con los workers durante una búsqueda de la mejor corrida.
+        Inicia sin umbral; los workers lo suben con raise_threshold al terminar partidas y lo consultan con
+        read_threshold para abandonar las que ya no pueden superarlo. Al salir se libera y cambia de
+        generación: las tareas que sigan corriendo (resultados que ya nadie espera) ya no lo escriben y se
+        abandonan en su siguiente ronda, liberando a los workers.
+
+        Retorna:
+            tuple: (espacio, generación) para pasar a las tareas, o None si no hay espacios libres
+        """
+        with self._lock:
+            slot = self._free_threshold_slots.pop() if self._free_threshold_slots else None
+        if slot is None:
+            yield None
+            return
+        try:
+            with self._thresholds.get_lock():
+                generation = self._threshold_generations[slot]
+            yield (slot, generation)
+        finally:
+            with self._thresholds.get_lock():
+                self._thresholds[slot] = float("-inf")
+                self._threshold_generations[slot] += 1
+            with self._lock:
+                self._free_threshold_slots.append(slot)
+
+    def health(self):
+        """
+        Reporta el estado del pool para monitoreo.
+
+        Retorna:
+            dict: Estado, workers vivos, reciclaje configurado, tareas procesadas y tiempo activo
+        """
+        with self._lock:
+            if self._pool is None:
+                return {"status": "stopped", "processes": self.processes, "alive_workers": 0}
+
+            # Pool no expone sus procesos públicamente; se consultan para detectar workers caídos
+            alive = sum(1 for p in self._pool._pool if p.is_alive())
+            return {
+                "status": "ok" if alive > 0 else "degraded",
+                "processes": self.processes,
+                "alive_workers": alive,
+                "max_tasks_per_child": self.max_tasks_per_child,
+                "tasks_submitted": self.tasks_submitted,
+                "tasks_completed": self.tasks_completed,
+                "batches_running": self.batches_running,
+                "foreground": self._foreground,
+                "uptime_seconds": round(time.time() - self._started_at, 1)
+            }
+
+    def shutdown(self, wait=True):
+        """
+        Apaga el pool de forma ordenada.
+
+        Parámetros:
+            wait (bool): Si es True espera a que terminen las tareas en curso; si es False las cancela
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        if wait:
+            pool.close()
+        else:
+            pool.terminate()
+        pool.join()
+        print("🏊 Pool de simulación detenido")